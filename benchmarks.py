@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Benchmarks reproducibles para miParser, tokenizar y parsear_oracion
+# ------------------------------------------------------------
+"""
+Mide operaciones por segundo, percentiles de latencia y memoria pico
+de ambos parsers sobre entradas generadas con `generadores.py`.
+
+Uso:
+    python benchmarks.py                              # solo medir
+    python benchmarks.py --guardar-base base.json     # guardar línea base
+    python benchmarks.py --comparar base.json         # detectar regresiones
+    python benchmarks.py --pdf                        # ahorro del registro de estilos
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from correccion import CorrectorOrtografico
+from earley import ParserEarley, analizar_con_respaldo
+from generadores import generar_lote
+from parser import miParser
+from parser_natural import parsear_oracion, tokenizar, ParseError
+
+
+def _parsear_natural(texto):
+    """parsear_oracion sin propagar ParseError (las inválidas también cuentan)"""
+    try:
+        return parsear_oracion(texto)
+    except ParseError:
+        return None
+
+
+def _parsear_earley(texto):
+    """Earley directo (sin el camino rápido LL(1)) sobre los tokens de `texto`"""
+    try:
+        return ParserEarley(tokenizar(texto)).parse()
+    except ParseError:
+        return None
+
+
+def _analizar_con_respaldo(texto):
+    try:
+        return analizar_con_respaldo(texto)
+    except ParseError:
+        return None
+
+
+def _con_errores(textos, semilla):
+    """Cambia una letra de una palabra de cada texto (errores de tipeo reproducibles)"""
+    rng = random.Random(semilla)
+    resultado = []
+    for texto in textos:
+        palabras = texto.split()
+        k = rng.randrange(len(palabras))
+        palabra = palabras[k]
+        i = rng.randrange(len(palabra))
+        palabras[k] = palabra[:i] + rng.choice('abcdeilmnorstu') + palabra[i + 1:]
+        resultado.append(' '.join(palabras))
+    return resultado
+
+
+def _casos(cantidad, tamano, semilla):
+    """Arma la lista de casos a medir: (nombre, función, entradas)"""
+    corrector = CorrectorOrtografico()
+    return [
+        ('miParser/validas', miParser,
+         generar_lote('formal', cantidad, tamano, True, semilla)),
+        ('miParser/invalidas', miParser,
+         generar_lote('formal', cantidad, tamano, False, semilla + 1)),
+        ('tokenizar', tokenizar,
+         generar_lote('natural', cantidad, validas=True, semilla=semilla + 2)),
+        ('tokenizar/corrector', lambda texto: tokenizar(texto, corrector),
+         _con_errores(generar_lote('natural', cantidad, validas=True, semilla=semilla + 2), semilla)),
+        ('parsear_oracion/validas', _parsear_natural,
+         generar_lote('natural', cantidad, validas=True, semilla=semilla + 2)),
+        ('parsear_oracion/invalidas', _parsear_natural,
+         generar_lote('natural', cantidad, validas=False, semilla=semilla + 3)),
+        ('parsear_oracion/extendidas', _parsear_natural,
+         generar_lote('natural', cantidad, validas=True, semilla=semilla + 4, extendida=True)),
+        ('earley/validas', _parsear_earley,
+         generar_lote('natural', cantidad, validas=True, semilla=semilla + 2)),
+        ('respaldo/invalidas', _analizar_con_respaldo,
+         generar_lote('natural', cantidad, validas=False, semilla=semilla + 3)),
+    ]
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0
+    indice = max(0, min(len(valores_ordenados) - 1,
+                        int(round(p / 100 * len(valores_ordenados))) - 1))
+    return valores_ordenados[indice]
+
+
+def medir(funcion, entradas, repeticiones=3):
+    """
+    Ejecuta `funcion` sobre cada entrada y devuelve las estadísticas.
+    La memoria pico se mide en una pasada aparte porque tracemalloc
+    vuelve más lenta la ejecución.
+    """
+    # miParser imprime su resultado; se descarta para no medir la terminal
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        for entrada in entradas[:50]:  # calentamiento
+            funcion(entrada)
+
+        latencias = []
+        inicio_total = time.perf_counter_ns()
+        for _ in range(repeticiones):
+            for entrada in entradas:
+                inicio = time.perf_counter_ns()
+                funcion(entrada)
+                latencias.append(time.perf_counter_ns() - inicio)
+        total_ns = time.perf_counter_ns() - inicio_total
+
+        tracemalloc.start()
+        for entrada in entradas:
+            funcion(entrada)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencias.sort()
+    return {
+        'operaciones': len(latencias),
+        'ops_por_segundo': len(latencias) / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_us': percentil(latencias, 50) / 1000,
+        'p90_us': percentil(latencias, 90) / 1000,
+        'p99_us': percentil(latencias, 99) / 1000,
+        'max_us': latencias[-1] / 1000 if latencias else 0.0,
+        'memoria_pico_kb': pico / 1024,
+    }
+
+
+def ejecutar(cantidad=1000, tamano=50, semilla=42, repeticiones=3, filtro=None):
+    """Ejecuta todos los benchmarks y devuelve un diccionario con resultados"""
+    resultados = {}
+    for nombre, funcion, entradas in _casos(cantidad, tamano, semilla):
+        if filtro and filtro not in nombre:
+            continue
+        resultados[nombre] = medir(funcion, entradas, repeticiones)
+    return {
+        'parametros': {
+            'cantidad': cantidad,
+            'tamano': tamano,
+            'semilla': semilla,
+            'repeticiones': repeticiones,
+        },
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+        },
+        'resultados': resultados,
+    }
+
+
+def _medir_alternado(funciones, repeticiones):
+    """
+    Latencias (ns) de varias funciones ejecutadas de forma intercalada,
+    para que el ruido de la máquina afecte a todas por igual.
+    """
+    latencias = [[] for _ in funciones]
+    for _ in range(repeticiones):
+        for funcion, lista in zip(funciones, latencias):
+            inicio = time.perf_counter_ns()
+            funcion()
+            lista.append(time.perf_counter_ns() - inicio)
+    for lista in latencias:
+        lista.sort()
+    return latencias
+
+
+def ejecutar_pdf(repeticiones=200, ruta_markdown='README.md'):
+    """
+    Mide el ahorro del registro de estilos de generar_pdf: cada caso se
+    ejecuta con los estilos ya creados y reconstruyéndolos en cada
+    llamada (como se hacía antes por tabla y por documento).
+    """
+    import generar_pdf
+
+    with open(ruta_markdown, 'r', encoding='utf-8') as f:
+        markdown = f.read()
+    tabla_md = "| Entrada | Resultado | Tiempo |\n|---|---|---|\n" + \
+        "\n".join(f"| caso {i} | **ACEPTADA** | {i} ms |" for i in range(10))
+
+    def sin_registro(funcion):
+        def envoltura():
+            generar_pdf._STYLES = None
+            generar_pdf._TABLE_STYLE = None
+            return funcion()
+        return envoltura
+
+    casos = {
+        'pdf/tabla': lambda: generar_pdf.parse_table(tabla_md),
+        'pdf/documento': lambda: generar_pdf.parse_markdown_to_elements(markdown),
+    }
+    resultados = {}
+    for nombre, funcion in casos.items():
+        funcion()  # crea el registro antes de medir
+        con, sin = _medir_alternado([funcion, sin_registro(funcion)], repeticiones)
+        resultados[nombre] = {
+            'p50_us_con_registro': percentil(con, 50) / 1000,
+            'p50_us_sin_registro': percentil(sin, 50) / 1000,
+            'ahorro_us': (percentil(sin, 50) - percentil(con, 50)) / 1000,
+        }
+    return resultados
+
+
+def comparar(actual, base, tolerancia=0.10):
+    """
+    Compara contra una línea base. Devuelve la lista de regresiones:
+    caídas de ops/s o aumentos de p99 mayores que `tolerancia`.
+    """
+    regresiones = []
+    for nombre, medidas in actual['resultados'].items():
+        anterior = base.get('resultados', {}).get(nombre)
+        if anterior is None:
+            continue
+        if medidas['ops_por_segundo'] < anterior['ops_por_segundo'] * (1 - tolerancia):
+            regresiones.append(
+                f"{nombre}: ops/s {anterior['ops_por_segundo']:.0f} -> {medidas['ops_por_segundo']:.0f}"
+            )
+        if medidas['p99_us'] > anterior['p99_us'] * (1 + tolerancia):
+            regresiones.append(
+                f"{nombre}: p99 {anterior['p99_us']:.1f}us -> {medidas['p99_us']:.1f}us"
+            )
+    return regresiones
+
+
+def mostrar(resultado):
+    """Imprime los resultados en forma de tabla"""
+    print(f"{'Benchmark':<28} {'ops/s':>10} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'mem KB':>9}")
+    print("-" * 78)
+    for nombre, m in resultado['resultados'].items():
+        print(
+            f"{nombre:<28} {m['ops_por_segundo']:>10.0f} {m['p50_us']:>9.1f} "
+            f"{m['p90_us']:>9.1f} {m['p99_us']:>9.1f} {m['memoria_pico_kb']:>9.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de los parsers TLP")
+    parser.add_argument('--cantidad', type=int, default=1000, help="entradas por benchmark")
+    parser.add_argument('--tamano', type=int, default=50, help="tokens aproximados por cadena formal")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--filtro', help="ejecutar solo benchmarks cuyo nombre contenga este texto")
+    parser.add_argument('--guardar-base', metavar='RUTA', help="guardar resultados como línea base JSON")
+    parser.add_argument('--comparar', metavar='RUTA', help="comparar contra una línea base JSON")
+    parser.add_argument('--tolerancia', type=float, default=0.10, help="regresión tolerada (0.10 = 10%%)")
+    parser.add_argument('--pdf', action='store_true', help="medir el registro de estilos de generar_pdf")
+    args = parser.parse_args(argv)
+
+    if args.pdf:
+        print(f"{'Benchmark':<16} {'con registro us':>16} {'sin registro us':>16} {'ahorro us':>10}")
+        print("-" * 62)
+        for nombre, m in ejecutar_pdf().items():
+            print(
+                f"{nombre:<16} {m['p50_us_con_registro']:>16.1f} "
+                f"{m['p50_us_sin_registro']:>16.1f} {m['ahorro_us']:>10.1f}"
+            )
+        return 0
+
+    resultado = ejecutar(args.cantidad, args.tamano, args.semilla, args.repeticiones, args.filtro)
+    mostrar(resultado)
+
+    if args.guardar_base:
+        with open(args.guardar_base, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nLínea base guardada en {args.guardar_base}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        if base.get('parametros') != resultado['parametros']:
+            print("\nAdvertencia: la línea base se midió con otros parámetros")
+        regresiones = comparar(resultado, base, args.tolerancia)
+        if regresiones:
+            print("\nREGRESIONES DETECTADAS:")
+            for r in regresiones:
+                print(f"  - {r}")
+            return 1
+        print("\nSin regresiones respecto a la línea base")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
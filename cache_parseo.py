@@ -0,0 +1,204 @@
+# ------------------------------------------------------------
+# Caché persistente (SQLite) de resultados de parseo
+# ------------------------------------------------------------
+"""
+Guarda en disco el resultado de `evaluacion.evaluar` para cada entrada,
+así las corridas repetidas sobre el mismo corpus no vuelven a parsear.
+
+La clave es el hash de la entrada junto con una huella de la gramática:
+`tabla` y `tokens` para Fase 1, `VOCABULARIO` y el código del
+tokenizador (`tokenizar`, `buscar_palabra` y el índice del léxico) para
+Fase 2, y además `GRAMATICA_EXTENDIDA` para la gramática extendida. Si
+alguno cambia, la huella cambia y los resultados viejos se descartan al abrir
+la caché. Varios procesos pueden compartir el mismo archivo.
+
+Ejemplo:
+    cache = CacheParseo('.cache_parseo.sqlite3')
+    resultado = cache.evaluar('natural', 'El perro come carne.')
+"""
+
+import hashlib
+import inspect
+import json
+import sqlite3
+
+import earley
+import parser as parser_formal
+import parser_natural
+from evaluacion import evaluar
+
+# Subir este número cuando cambie la lógica de los parsers sin que
+# cambien la tabla, el vocabulario ni el tokenizador
+VERSION_CACHE = 4
+
+# Funciones de las que depende qué tokens salen de un texto en Fase 2
+FUNCIONES_TOKENIZADOR = (
+    parser_natural.sin_acentos,
+    parser_natural.construir_indice_lexico,
+    parser_natural.buscar_palabra,
+    parser_natural._largo_sin_signos,
+    parser_natural._tokens_signos,
+    parser_natural.tokenizar,
+)
+
+RUTA_PREDETERMINADA = '.cache_parseo.sqlite3'
+
+
+def _hash(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def fuente_tokenizador():
+    """Código fuente del tokenizador de Fase 2 (entra en las huellas)"""
+    return '\n'.join(inspect.getsource(funcion) for funcion in FUNCIONES_TOKENIZADOR)
+
+
+def huella_formal():
+    """Huella de la gramática de Fase 1 (tabla LL(1) y tokens)"""
+    return _hash(
+        str(VERSION_CACHE),
+        json.dumps(parser_formal.tabla, ensure_ascii=False),
+        json.dumps(list(parser_formal.tokens)),
+    )
+
+
+def huella_natural():
+    """Huella del vocabulario de Fase 2, sus rasgos de concordancia y el tokenizador"""
+    return _hash(
+        str(VERSION_CACHE),
+        json.dumps(parser_natural.VOCABULARIO, sort_keys=True, ensure_ascii=False),
+        json.dumps(parser_natural.RASGOS, sort_keys=True, ensure_ascii=False),
+        fuente_tokenizador(),
+    )
+
+
+def huella_extendida():
+    """Huella del vocabulario, los rasgos, el tokenizador y la gramática del parser Earley"""
+    return _hash(
+        str(VERSION_CACHE),
+        json.dumps(parser_natural.VOCABULARIO, sort_keys=True, ensure_ascii=False),
+        json.dumps(parser_natural.RASGOS, sort_keys=True, ensure_ascii=False),
+        fuente_tokenizador(),
+        json.dumps(earley.GRAMATICA_EXTENDIDA, sort_keys=True),
+    )
+
+
+def huellas():
+    """Huella vigente de cada gramática"""
+    return {'formal': huella_formal(), 'natural': huella_natural(), 'extendida': huella_extendida()}
+
+
+class CacheParseo:
+    """Caché de resultados de parseo respaldada por SQLite"""
+
+    def __init__(self, ruta=RUTA_PREDETERMINADA):
+        self.ruta = ruta
+        self.huellas = huellas()
+        self.aciertos = 0
+        self.fallos = 0
+
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        # WAL permite lectores concurrentes mientras otro proceso escribe
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.execute('PRAGMA synchronous=NORMAL')
+        self.conexion.execute(
+            'CREATE TABLE IF NOT EXISTS resultados ('
+            ' clave TEXT PRIMARY KEY,'
+            ' gramatica TEXT NOT NULL,'
+            ' huella TEXT NOT NULL,'
+            ' resultado TEXT NOT NULL)'
+        )
+        self._invalidar_obsoletos()
+
+    def _invalidar_obsoletos(self):
+        """Borra los resultados calculados con otra versión de la gramática"""
+        with self.conexion:
+            for gramatica, huella in self.huellas.items():
+                self.conexion.execute(
+                    'DELETE FROM resultados WHERE gramatica = ? AND huella != ?',
+                    (gramatica, huella),
+                )
+
+    def clave(self, gramatica, entrada):
+        """Clave de una entrada: hash de gramática, huella y contenido"""
+        return _hash(gramatica, self.huellas[gramatica], entrada)
+
+    def obtener(self, gramatica, entrada):
+        """Devuelve el resultado guardado o None"""
+        fila = self.conexion.execute(
+            'SELECT resultado FROM resultados WHERE clave = ?',
+            (self.clave(gramatica, entrada),),
+        ).fetchone()
+        if fila is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return json.loads(fila[0])
+
+    def guardar(self, gramatica, entrada, resultado):
+        """Guarda un resultado (reemplaza si ya existía)"""
+        with self.conexion:
+            self.conexion.execute(
+                'INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)',
+                (self.clave(gramatica, entrada), gramatica, self.huellas[gramatica],
+                 json.dumps(resultado, ensure_ascii=False)),
+            )
+
+    def evaluar(self, gramatica, entrada):
+        """Como evaluacion.evaluar, pero reutilizando resultados guardados"""
+        resultado = self.obtener(gramatica, entrada)
+        if resultado is None:
+            resultado = evaluar(gramatica, entrada)
+            self.guardar(gramatica, entrada, resultado)
+        return resultado
+
+    def evaluar_muchos(self, gramatica, entradas, tamano_consulta=500):
+        """
+        Evalúa una lista de entradas consultando la caché por bloques y
+        guardando los resultados nuevos en una sola transacción.
+        """
+        claves = [self.clave(gramatica, e) for e in entradas]
+        guardados = {}
+        for i in range(0, len(claves), tamano_consulta):
+            bloque = claves[i:i + tamano_consulta]
+            marcas = ','.join('?' * len(bloque))
+            for clave, resultado in self.conexion.execute(
+                f'SELECT clave, resultado FROM resultados WHERE clave IN ({marcas})', bloque
+            ):
+                guardados[clave] = resultado
+
+        resultados = []
+        nuevos = []
+        for clave, entrada in zip(claves, entradas):
+            if clave in guardados:
+                self.aciertos += 1
+                resultados.append(json.loads(guardados[clave]))
+            else:
+                self.fallos += 1
+                resultado = evaluar(gramatica, entrada)
+                resultados.append(resultado)
+                nuevos.append((clave, gramatica, self.huellas[gramatica],
+                               json.dumps(resultado, ensure_ascii=False)))
+
+        if nuevos:
+            with self.conexion:
+                self.conexion.executemany('INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)', nuevos)
+        return resultados
+
+    def limpiar(self):
+        """Borra todos los resultados"""
+        with self.conexion:
+            self.conexion.execute('DELETE FROM resultados')
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
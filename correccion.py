@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Corrección ortográfica por diccionario de borrados (SymSpell)
+# ------------------------------------------------------------
+"""
+Sugiere la palabra conocida más cercana para una palabra fuera del
+vocabulario ("perrro" -> "perro", "cme" -> "come").
+
+El índice guarda, para cada palabra del léxico, todas las variantes que
+se obtienen borrando hasta `distancia_maxima` caracteres. Para buscar
+se generan los borrados de la palabra escrita y cada uno se busca en
+el índice: dos palabras a distancia k comparten algún borrado de a lo
+sumo k caracteres, así que los candidatos salen de unos pocos accesos a
+un diccionario, sin recorrer el léxico. Los candidatos se confirman con
+la distancia de edición (con transposiciones) y gana el más cercano.
+
+Solo se borra dentro de los primeros `largo_prefijo` caracteres de
+cada palabra: el índice crece poco con palabras largas y la búsqueda no
+depende del tamaño del léxico. El índice se puede construir una vez y
+guardar en disco; lleva una huella de su léxico y al cargarlo se
+rechaza si no coincide con la del léxico vigente (por ejemplo, si
+cambió VOCABULARIO), como hace cache_parseo con sus resultados.
+
+Uso:
+    python correccion.py perrro cme nino
+    python correccion.py --guardar .indice_correccion.pkl
+    python correccion.py --indice .indice_correccion.pkl perrro
+"""
+
+import argparse
+import contextlib
+import gc
+import hashlib
+import json
+import pickle
+import sys
+import time
+
+from parser_natural import VOCABULARIO
+
+VERSION_INDICE = 2
+RUTA_PREDETERMINADA = '.indice_correccion.pkl'
+
+
+def distancia_edicion(a, b, maximo):
+    """
+    Distancia de Damerau-Levenshtein restringida (inserción, borrado,
+    sustitución y transposición de vecinos) entre `a` y `b`. Si supera
+    `maximo` devuelve maximo + 1 sin terminar la tabla.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    # El prefijo y el sufijo comunes no cambian la distancia
+    inicio = 0
+    while inicio < len(a) and inicio < len(b) and a[inicio] == b[inicio]:
+        inicio += 1
+    fin = 0
+    while fin < len(a) - inicio and fin < len(b) - inicio and a[-1 - fin] == b[-1 - fin]:
+        fin += 1
+    a, b = a[inicio:len(a) - fin], b[inicio:len(b) - fin]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= maximo else maximo + 1
+    anterior2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        minimo_fila = i
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            valor = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo)
+            if (anterior2 is not None and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                valor = min(valor, anterior2[j - 2] + 1)
+            actual[j] = valor
+            minimo_fila = min(minimo_fila, valor)
+        if minimo_fila > maximo:
+            return maximo + 1
+        anterior2, anterior = anterior, actual
+    return anterior[-1] if anterior[-1] <= maximo else maximo + 1
+
+
+def borrados(palabra, distancia):
+    """Variantes de `palabra` con hasta `distancia` caracteres borrados (incluida ella)"""
+    variantes = {palabra}
+    frontera = [palabra]
+    for _ in range(distancia):
+        siguiente = []
+        for variante in frontera:
+            for i in range(len(variante)):
+                borrada = variante[:i] + variante[i + 1:]
+                if borrada not in variantes:
+                    variantes.add(borrada)
+                    siguiente.append(borrada)
+        frontera = siguiente
+    return variantes
+
+
+def lexico_predeterminado():
+    """Palabras de VOCABULARIO que entran al índice"""
+    return [p for p in VOCABULARIO if p.isalpha()]
+
+
+def huella_lexico(palabras):
+    """Huella de un léxico, sin importar el orden ni las repetidas"""
+    contenido = json.dumps(sorted(set(palabras)), ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+@contextlib.contextmanager
+def _sin_recolector():
+    """Desactiva el recolector de ciclos mientras se crean muchos objetos"""
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+class CorrectorOrtografico:
+    """Índice de borrados sobre un léxico (por defecto, las palabras de VOCABULARIO)"""
+
+    def __init__(self, palabras=None, distancia_maxima=2, largo_prefijo=7):
+        if palabras is None:
+            palabras = lexico_predeterminado()
+        self.distancia_maxima = distancia_maxima
+        self.largo_prefijo = largo_prefijo
+        self.palabras = set()
+        self.indice = {}
+        # Millones de listas chicas: el recolector de ciclos solo demora
+        with _sin_recolector():
+            for palabra in palabras:
+                self.agregar(palabra)
+
+    def agregar(self, palabra):
+        """Agrega una palabra al léxico y sus borrados al índice"""
+        if palabra in self.palabras:
+            return
+        self.palabras.add(palabra)
+        for variante in borrados(palabra[:self.largo_prefijo], self.distancia_maxima):
+            self.indice.setdefault(variante, []).append(palabra)
+
+    def limite(self, palabra):
+        """Distancia permitida para `palabra`: 1 hasta 5 letras, después distancia_maxima"""
+        return min(self.distancia_maxima, 1 if len(palabra) <= 5 else 2)
+
+    def sugerencias(self, palabra, distancia=None):
+        """
+        Palabras del léxico a distancia <= `distancia` (por defecto
+        limite(palabra)), como lista de (palabra, distancia) ordenada de
+        la más cercana a la más lejana.
+        """
+        if distancia is None:
+            distancia = self.limite(palabra)
+        distancia = min(distancia, self.distancia_maxima)
+        if palabra in self.palabras:
+            return [(palabra, 0)]
+
+        prefijo = palabra[:self.largo_prefijo]
+        largo = len(palabra)
+        vistas = set()
+        encontradas = []
+        for variante in borrados(prefijo, distancia):
+            for candidata in self.indice.get(variante, ()):
+                if candidata in vistas:
+                    continue
+                # Descartes baratos antes de calcular la distancia: la
+                # candidata no puede haber perdido más de `distancia`
+                # letras de su prefijo ni diferir en largo en más que eso
+                largo_candidata = len(candidata)
+                if (min(largo_candidata, self.largo_prefijo) - len(variante) > distancia
+                        or abs(largo_candidata - largo) > distancia):
+                    continue
+                vistas.add(candidata)
+                d = distancia_edicion(palabra, candidata, distancia)
+                if d <= distancia:
+                    encontradas.append((candidata, d))
+        encontradas.sort(key=lambda par: (par[1], par[0]))
+        return encontradas
+
+    def corregir(self, palabra):
+        """La palabra conocida más cercana, o None si no hay ninguna dentro del límite"""
+        if palabra in self.palabras:
+            return palabra
+        encontradas = self.sugerencias(palabra)
+        return encontradas[0][0] if encontradas else None
+
+    def guardar(self, ruta=RUTA_PREDETERMINADA):
+        """Guarda el índice ya construido (se carga sin recalcular borrados)"""
+        datos = {
+            'version': VERSION_INDICE,
+            'huella': huella_lexico(self.palabras),
+            'distancia_maxima': self.distancia_maxima,
+            'largo_prefijo': self.largo_prefijo,
+            'palabras': sorted(self.palabras),
+            'indice': self.indice,
+        }
+        with open(ruta, 'wb') as archivo:
+            pickle.dump(datos, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_PREDETERMINADA, palabras=None):
+        """
+        Carga un índice guardado con guardar(). `palabras` es el léxico
+        con el que se espera que se haya construido (por defecto el de
+        VOCABULARIO); ValueError si el índice es de otra versión o de
+        otro léxico.
+        """
+        with open(ruta, 'rb') as archivo, _sin_recolector():
+            datos = pickle.load(archivo)
+        if datos.get('version') != VERSION_INDICE:
+            raise ValueError(f"Índice de corrección con versión {datos.get('version')}, "
+                             f"se esperaba {VERSION_INDICE}")
+        if palabras is None:
+            palabras = lexico_predeterminado()
+        if datos['huella'] != huella_lexico(palabras):
+            raise ValueError(f"El índice de corrección {ruta} se construyó con otro léxico; "
+                             f"hay que volver a generarlo con --guardar")
+        corrector = cls(palabras=(), distancia_maxima=datos['distancia_maxima'],
+                        largo_prefijo=datos['largo_prefijo'])
+        corrector.palabras = set(datos['palabras'])
+        corrector.indice = datos['indice']
+        return corrector
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corrección ortográfica sobre VOCABULARIO")
+    parser.add_argument('palabras', nargs='*', help="palabras a corregir")
+    parser.add_argument('--indice', help="cargar un índice guardado en lugar de construirlo")
+    parser.add_argument('--guardar', metavar='RUTA', help="construir el índice y guardarlo")
+    parser.add_argument('--distancia', type=int, default=2, help="distancia máxima del índice")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    if args.indice:
+        corrector = CorrectorOrtografico.cargar(args.indice)
+    else:
+        corrector = CorrectorOrtografico(distancia_maxima=args.distancia)
+    duracion = time.perf_counter() - inicio
+    print(f"Índice: {len(corrector.palabras)} palabras, {len(corrector.indice)} borrados "
+          f"({duracion * 1000:.1f} ms)", file=sys.stderr)
+
+    if args.guardar:
+        corrector.guardar(args.guardar)
+        print(f"Guardado en {args.guardar}", file=sys.stderr)
+
+    for palabra in args.palabras:
+        palabra = palabra.lower()
+        sugeridas = ', '.join(f"{p} ({d})" for p, d in corrector.sugerencias(palabra)) or '-'
+        print(f"{palabra}: {sugeridas}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Ubicación de tokens y errores: línea, columna y rango
+# ------------------------------------------------------------
+"""
+Convierte posiciones de carácter (lexpos de ply, Token.inicio de
+parser_natural) en línea y columna, y arma el diagnóstico de un error
+con el fragmento de la entrada señalado con ^~~~. `ubicar_tokens` da
+la misma ubicación para cada token de la entrada, no solo para el que
+produjo el error.
+
+`MapaLineas` guarda el inicio de cada línea una sola vez por entrada;
+ubicar una posición es una búsqueda binaria en esa tabla, así que no
+hace falta volver a parsear ni recorrer el texto para cada error.
+
+Uso:
+    python diagnosticos.py --gramatica formal "int x = ;$"
+    python diagnosticos.py --gramatica natural "El perro come la carne rojo."
+    python diagnosticos.py --gramatica formal --tokens "int x = 5;
+    float y;$"
+    cat programa.c | python diagnosticos.py --gramatica formal -
+"""
+
+import argparse
+import bisect
+import sys
+
+
+class MapaLineas:
+    """Tabla de inicios de línea de un texto (líneas y columnas desde 1)"""
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.inicios = [0]
+        i = texto.find('\n')
+        while i >= 0:
+            self.inicios.append(i + 1)
+            i = texto.find('\n', i + 1)
+
+    def ubicar(self, posicion):
+        """(línea, columna) del carácter `posicion`"""
+        linea = bisect.bisect_right(self.inicios, posicion) - 1
+        return linea + 1, posicion - self.inicios[linea] + 1
+
+    def linea(self, numero):
+        """Texto de la línea `numero` sin el salto de línea"""
+        inicio = self.inicios[numero - 1]
+        fin = self.inicios[numero] - 1 if numero < len(self.inicios) else len(self.texto)
+        return self.texto[inicio:fin]
+
+    def rango(self, inicio, fin):
+        """Diagnóstico serializable del rango de caracteres [inicio, fin)"""
+        linea, columna = self.ubicar(inicio)
+        linea_fin, columna_fin = self.ubicar(max(inicio, fin - 1))
+        return {
+            'linea': linea,
+            'columna': columna,
+            'linea_fin': linea_fin,
+            'columna_fin': columna_fin + (1 if fin > inicio else 0),
+            'inicio': inicio,
+            'fin': fin,
+        }
+
+
+def diagnostico(texto, inicio, fin, mapa=None):
+    """Diagnóstico de [inicio, fin) en `texto`, o None si no hay posición"""
+    if inicio is None:
+        return None
+    mapa = mapa or MapaLineas(texto)
+    return mapa.rango(inicio, fin if fin is not None else inicio)
+
+
+def ubicar_tokens(gramatica, texto, mapa=None, llamadas=None):
+    """
+    Tokens de `texto` con su ubicación: para cada uno, un diccionario
+    con `tipo`, `valor` y el rango de MapaLineas.rango (línea, columna,
+    línea y columna de fin, inicio y fin en caracteres). La tabla de
+    líneas se arma una sola vez para todos los tokens. En Fase 1 los
+    rangos salen de parser.lexear; si ya se tienen sus `llamadas` (las
+    mismas que usa evaluar_formal) no se vuelve a lexear.
+    """
+    mapa = mapa or MapaLineas(texto)
+    if gramatica == 'formal':
+        from parser import lexear
+        llamadas = llamadas if llamadas is not None else lexear(texto)
+        # El valor de un token de error es todo el resto de la entrada
+        tokens = [(tipo, texto[inicio:fin] if tipo == 'error' else valor, inicio, fin)
+                  for (tipo, valor, inicio, fin), _ in llamadas[:-1]]
+    else:
+        from parser_natural import tokenizar
+        tokens = [(t.tipo, t.valor, t.inicio, t.fin) for t in tokenizar(texto)]
+    return [{'tipo': tipo, 'valor': valor, **mapa.rango(inicio, fin)}
+            for tipo, valor, inicio, fin in tokens]
+
+
+def formatear(texto, mensaje, diagnostico, mapa=None):
+    """
+    Mensaje con su ubicación y la línea de la entrada marcada:
+
+        línea 2, columna 9: Se esperaba ...
+            int y = ;
+                    ^
+    Si el rango sigue en otras líneas solo se marca hasta el final de
+    la primera.
+    """
+    if diagnostico is None:
+        return mensaje
+    mapa = mapa or MapaLineas(texto)
+    linea = mapa.linea(diagnostico['linea'])
+    columna = diagnostico['columna']
+    if diagnostico['linea_fin'] == diagnostico['linea']:
+        ancho = max(1, diagnostico['columna_fin'] - columna)
+    else:
+        ancho = max(1, len(linea) - columna + 1)
+    # Las tabulaciones se copian para que la marca quede alineada
+    relleno = ''.join(c if c == '\t' else ' ' for c in linea[:columna - 1])
+    return (f"línea {diagnostico['linea']}, columna {columna}: {mensaje}\n"
+            f"    {linea}\n"
+            f"    {relleno}^{'~' * (ancho - 1)}")
+
+
+def main(argv=None):
+    from evaluacion import GRAMATICAS, evaluar, evaluar_formal
+    from parser import lexear
+
+    parser = argparse.ArgumentParser(description="Muestra dónde está el error de una entrada")
+    parser.add_argument('entrada', help="texto a analizar (- = stdin)")
+    parser.add_argument('--gramatica', required=True, choices=GRAMATICAS)
+    parser.add_argument('--tokens', action='store_true',
+                        help="listar también la línea y columna de cada token")
+    args = parser.parse_args(argv)
+
+    texto = sys.stdin.read() if args.entrada == '-' else args.entrada
+    mapa = MapaLineas(texto)
+    # En Fase 1 se lexea una sola vez para los tokens y el veredicto
+    llamadas = lexear(texto) if args.gramatica == 'formal' and args.tokens else None
+    if args.tokens:
+        for token in ubicar_tokens(args.gramatica, texto, mapa, llamadas):
+            print(f"{token['linea']}:{token['columna']}-{token['linea_fin']}:{token['columna_fin']}"
+                  f"  {token['tipo']} {token['valor']!r}")
+    if llamadas is not None:
+        resultado = evaluar_formal(texto, llamadas)
+    else:
+        resultado = evaluar(args.gramatica, texto)
+    if resultado['valido']:
+        print("Entrada válida")
+        return 0
+    mensaje = resultado['error'].splitlines()[0] if resultado['error'] else "Entrada inválida"
+    print(formatear(texto, mensaje, resultado.get('diagnostico'), mapa))
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Parser Earley de respaldo para una gramática de español extendida
+# ------------------------------------------------------------
+"""
+Reconoce oraciones que ParserNatural (LL(1)) rechaza: cláusulas
+coordinadas, cláusulas relativas y cualquier combinación de complementos
+con preposición, coordinación, adverbios y negación. Usa los mismos
+tokens de `tokenizar`.
+
+Las oraciones ambiguas ("El niño come carne con el perro": ¿el perro
+acompaña al niño o a la carne?) no se expanden en todos sus árboles:
+el resultado es un bosque compartido en el que cada nodo (símbolo,
+inicio, fin) existe una sola vez y guarda sus alternativas (familias).
+De ahí se cuentan los árboles o se sacan los que hagan falta.
+
+`analizar_con_respaldo` prueba primero ParserNatural, que da una sola
+lectura (cada complemento va al sustantivo más cercano), y solo si falla
+recurre al Earley; si este también falla se propaga el ParseError
+(ahí corresponde un analizador estadístico como spaCy). Los errores de
+concordancia de ParserNatural no pasan al Earley. Aunque ParserNatural
+acepte la oración, si tiene preposiciones o conjunciones (las únicas
+fuentes de ambigüedad de la gramática) los árboles se cuentan con el
+Earley: "El niño come carne con el perro." da la lectura de
+ParserNatural y 2 árboles.
+
+Uso:
+    python earley.py "El niño come carne con el perro."
+    python earley.py --arboles 2 "El niño come carne con el perro."
+    python earley.py --arboles 5 "el perro y el gato come la carne que el niño lee en la mesa"
+"""
+
+import argparse
+import itertools
+import json
+import sys
+
+from parser_natural import (ErrorConcordancia, ParseError, ParserNatural, error_en_token,
+                            error_fin_entrada, tokenizar, verificar_concordancia)
+
+# ============================================================
+# GRAMÁTICA EXTENDIDA (contiene a la de ParserNatural)
+# ============================================================
+# Cada alternativa es una lista de símbolos; los que no son claves del
+# diccionario son categorías de VOCABULARIO. No hay reglas vacías ni
+# ciclos de reglas unitarias, así que el bosque no tiene ciclos.
+GRAMATICA_EXTENDIDA = {
+    'ORACION': [['CLAUSULA'], ['CLAUSULA', 'PUNTUACION']],
+    'CLAUSULA': [['SN', 'SV'], ['CLAUSULA', 'CONJUNCION', 'CLAUSULA']],
+    'SN': [
+        ['NOMINAL'],
+        ['DETERMINANTE', 'NOMINAL'],
+        ['SN', 'SP'],
+        ['SN', 'RELATIVA'],
+        ['SN', 'CONJUNCION', 'SN'],
+    ],
+    'NOMINAL': [['NUCLEO'], ['ADJETIVOS', 'NUCLEO']],
+    'NUCLEO': [['SUSTANTIVO'], ['SUSTANTIVO', 'ADJETIVOS']],
+    'ADJETIVOS': [['ADJETIVO'], ['ADJETIVOS', 'ADJETIVO']],
+    'SV': [
+        ['VERBAL'],
+        ['VERBAL', 'SN'],
+        ['VERBAL', 'ADVERBIOS', 'SN'],
+        ['SV', 'SP'],
+        ['SV', 'ADVERBIO'],
+        ['SV', 'CONJUNCION', 'SV'],
+    ],
+    'VERBAL': [['VERBO'], ['NEGACION', 'VERBO']],
+    'ADVERBIOS': [['ADVERBIO'], ['ADVERBIOS', 'ADVERBIO']],
+    'SP': [['PREPOSICION', 'SN']],
+    'RELATIVA': [['RELATIVO', 'SV'], ['RELATIVO', 'SN', 'VERBAL']],
+    'PUNTUACION': [['PUNTO'], ['INTERROGACION'], ['EXCLAMACION']],
+}
+
+
+class Gramatica:
+    """Reglas numeradas y tablas de predicción de una gramática sin reglas vacías"""
+
+    def __init__(self, reglas, inicial='ORACION'):
+        self.inicial = inicial
+        self.izquierda = []
+        self.derecha = []
+        self.por_simbolo = {}
+        for simbolo, alternativas in reglas.items():
+            for alternativa in alternativas:
+                if not alternativa:
+                    raise ValueError(f"Regla vacía para {simbolo}: no está soportada")
+                self.por_simbolo.setdefault(simbolo, []).append(len(self.izquierda))
+                self.izquierda.append(simbolo)
+                self.derecha.append(tuple(alternativa))
+
+        # Reglas predichas por cada no terminal, con la clausura ya hecha
+        self.predicciones = {}
+        for simbolo in self.por_simbolo:
+            vistos = [simbolo]
+            reglas_predichas = []
+            for actual in vistos:
+                for r in self.por_simbolo[actual]:
+                    reglas_predichas.append(r)
+                    primero = self.derecha[r][0]
+                    if primero in self.por_simbolo and primero not in vistos:
+                        vistos.append(primero)
+            self.predicciones[simbolo] = reglas_predichas
+
+    def es_no_terminal(self, simbolo):
+        return simbolo in self.por_simbolo
+
+
+EXTENDIDA = Gramatica(GRAMATICA_EXTENDIDA)
+
+
+class NodoBosque:
+    """
+    Nodo del bosque compartido: `simbolo` reconocido entre los tokens
+    [inicio, fin). Cada familia es una forma de derivarlo: (regla, hijos),
+    donde los hijos son NodoBosque (no terminales) o Token (terminales).
+    """
+    __slots__ = ('simbolo', 'inicio', 'fin', 'familias')
+
+    def __init__(self, simbolo, inicio, fin):
+        self.simbolo = simbolo
+        self.inicio = inicio
+        self.fin = fin
+        self.familias = []
+
+    def __repr__(self):
+        return f"NodoBosque({self.simbolo}, {self.inicio}, {self.fin}, {len(self.familias)} familias)"
+
+
+class ParserEarley:
+    """Parser Earley sobre una lista de Token (misma interfaz que ParserNatural)"""
+
+    def __init__(self, tokens, gramatica=EXTENDIDA):
+        self.tokens = tokens
+        self.gramatica = gramatica
+        self.terminados = []  # por posición: {(regla, origen)} completos
+        self.fines = {}       # (símbolo, inicio) -> {fin}
+        self.nodos = {}
+        self._items_finales = []  # ítems de la última posición alcanzada
+
+    def reconocer(self):
+        """
+        Llena la tabla de Earley. Devuelve la última posición alcanzada
+        (len(tokens) si se leyó toda la entrada).
+        """
+        g = self.gramatica
+        izquierda, derecha, predicciones = g.izquierda, g.derecha, g.predicciones
+        tokens = self.tokens
+        n = len(tokens)
+
+        esperando = []  # por posición: símbolo -> ítems con ese símbolo después del punto
+        actual = [(r, 0, 0) for r in predicciones[g.inicial]]
+        for j in range(n + 1):
+            items = actual
+            vistos = set(items)
+            espera_j = {}
+            esperando.append(espera_j)
+            terminados_j = set()
+            self.terminados.append(terminados_j)
+            predichos = set()
+            siguiente = []
+            tipo = tokens[j].tipo if j < n else None
+
+            k = 0
+            while k < len(items):
+                r, p, o = items[k]
+                k += 1
+                der = derecha[r]
+                if p == len(der):
+                    # Completar: avanzar los ítems de `o` que esperaban este símbolo
+                    simbolo = izquierda[r]
+                    terminados_j.add((r, o))
+                    self.fines.setdefault((simbolo, o), set()).add(j)
+                    for r2, p2, o2 in esperando[o].get(simbolo, ()):
+                        item = (r2, p2 + 1, o2)
+                        if item not in vistos:
+                            vistos.add(item)
+                            items.append(item)
+                    continue
+                simbolo = der[p]
+                if simbolo in predicciones:
+                    espera_j.setdefault(simbolo, []).append((r, p, o))
+                    if simbolo not in predichos:
+                        predichos.add(simbolo)
+                        for r2 in predicciones[simbolo]:
+                            item = (r2, 0, j)
+                            if item not in vistos:
+                                vistos.add(item)
+                                items.append(item)
+                elif simbolo == tipo:
+                    siguiente.append((r, p + 1, o))
+
+            self._items_finales = items
+            if not siguiente:
+                return j
+            actual = siguiente
+        return n
+
+    def _error(self, alcanzado):
+        """ParseError con los terminales que se esperaban donde se cortó el análisis"""
+        g = self.gramatica
+        esperados = sorted({
+            g.derecha[r][p] for r, p, _ in self._items_finales
+            if p < len(g.derecha[r]) and not g.es_no_terminal(g.derecha[r][p])
+        })
+        esperado = ' o '.join(esperados) if esperados else 'fin de la oración'
+        if alcanzado >= len(self.tokens):
+            return error_fin_entrada(f"Se esperaba {esperado} pero se terminó la entrada",
+                                     self.tokens)
+        token = self.tokens[alcanzado]
+        return error_en_token(
+            f"Se esperaba {esperado} pero se encontró {token.tipo} ('{token.valor}')",
+            token,
+        )
+
+    def parse(self):
+        """
+        Reconoce la entrada y devuelve la raíz del bosque (o lanza
+        ParseError). La concordancia se verifica después sobre los tokens:
+        no depende de cuál de los árboles se elija.
+        """
+        n = len(self.tokens)
+        alcanzado = self.reconocer()
+        if alcanzado < n or n not in self.fines.get((self.gramatica.inicial, 0), ()):
+            raise self._error(alcanzado)
+        verificar_concordancia(self.tokens)
+        return self.nodo(self.gramatica.inicial, 0, n)
+
+    # ---------- Bosque compartido ----------
+
+    def _obtener_nodo(self, simbolo, inicio, fin, pendientes):
+        clave = (simbolo, inicio, fin)
+        nodo = self.nodos.get(clave)
+        if nodo is None:
+            nodo = self.nodos[clave] = NodoBosque(simbolo, inicio, fin)
+            pendientes.append(nodo)
+        return nodo
+
+    def nodo(self, simbolo, inicio, fin):
+        """
+        Nodo (simbolo, inicio, fin) del bosque con todos sus descendientes.
+        Cada nodo se construye una sola vez; se usa una lista de pendientes
+        en lugar de recursión para no depender del largo de la oración.
+        """
+        g = self.gramatica
+        pendientes = []
+        raiz = self._obtener_nodo(simbolo, inicio, fin, pendientes)
+        while pendientes:
+            nodo = pendientes.pop()
+            terminados = self.terminados[nodo.fin]
+            for r in g.por_simbolo[nodo.simbolo]:
+                if (r, nodo.inicio) not in terminados:
+                    continue
+                for partes in self._divisiones(g.derecha[r], 0, nodo.inicio, nodo.fin):
+                    hijos = tuple(
+                        self._obtener_nodo(s, i, f, pendientes) if g.es_no_terminal(s) else self.tokens[i]
+                        for s, i, f in partes
+                    )
+                    nodo.familias.append((r, hijos))
+        return raiz
+
+    def _divisiones(self, derecha, k, inicio, fin):
+        """Formas de repartir [inicio, fin) entre los símbolos derecha[k:]"""
+        simbolo = derecha[k]
+        ultimo = k == len(derecha) - 1
+        if not self.gramatica.es_no_terminal(simbolo):
+            if inicio < fin and self.tokens[inicio].tipo == simbolo:
+                if ultimo:
+                    if inicio + 1 == fin:
+                        yield ((simbolo, inicio, fin),)
+                else:
+                    for resto in self._divisiones(derecha, k + 1, inicio + 1, fin):
+                        yield ((simbolo, inicio, inicio + 1),) + resto
+            return
+        fines = self.fines.get((simbolo, inicio), ())
+        if ultimo:
+            if fin in fines:
+                yield ((simbolo, inicio, fin),)
+            return
+        for medio in sorted(fines):
+            if medio < fin:
+                for resto in self._divisiones(derecha, k + 1, medio, fin):
+                    yield ((simbolo, inicio, medio),) + resto
+
+
+def contar_arboles(raiz):
+    """Cantidad de árboles del bosque, sin enumerarlos"""
+    cuentas = {}
+    pila = [raiz]
+    while pila:
+        nodo = pila[-1]
+        if id(nodo) in cuentas:
+            pila.pop()
+            continue
+        faltan = [hijo for _, hijos in nodo.familias for hijo in hijos
+                  if isinstance(hijo, NodoBosque) and id(hijo) not in cuentas]
+        if faltan:
+            pila.extend(faltan)
+            continue
+        total = 0
+        for _, hijos in nodo.familias:
+            producto = 1
+            for hijo in hijos:
+                if isinstance(hijo, NodoBosque):
+                    producto *= cuentas[id(hijo)]
+            total += producto
+        cuentas[id(nodo)] = total
+        pila.pop()
+    return cuentas[id(raiz)]
+
+
+def arboles(nodo):
+    """
+    Genera los árboles del bosque de a uno (usar con islice si hay
+    muchos). Es perezoso: el primer árbol sale sin recorrer las demás
+    alternativas, aunque el bosque tenga muchísimos.
+    """
+    if not isinstance(nodo, NodoBosque):
+        yield {'tipo': nodo.tipo, 'valor': nodo.valor}
+        return
+    for _, hijos in nodo.familias:
+        for combinacion in _combinaciones(hijos, 0):
+            yield {'tipo': nodo.simbolo, 'hijos': list(combinacion)}
+
+
+def _combinaciones(hijos, k):
+    """
+    Producto cartesiano perezoso de los árboles de hijos[k:]. A diferencia
+    de itertools.product, que consume entero cada generador antes de dar
+    la primera combinación, los árboles de los hijos siguientes se vuelven
+    a generar por cada árbol de hijos[k].
+    """
+    if k == len(hijos):
+        yield ()
+        return
+    for arbol in arboles(hijos[k]):
+        for resto in _combinaciones(hijos, k + 1):
+            yield (arbol,) + resto
+
+
+def primer_arbol(raiz):
+    """El primer árbol del bosque (primera familia de cada nodo)"""
+    arbol = {'tipo': raiz.simbolo, 'hijos': []}
+    pila = [(raiz, arbol)]
+    while pila:
+        nodo, destino = pila.pop()
+        _, hijos = nodo.familias[0]
+        for hijo in hijos:
+            if isinstance(hijo, NodoBosque):
+                subarbol = {'tipo': hijo.simbolo, 'hijos': []}
+                pila.append((hijo, subarbol))
+            else:
+                subarbol = {'tipo': hijo.tipo, 'valor': hijo.valor}
+            destino['hijos'].append(subarbol)
+    return arbol
+
+
+# Sin estos tokens la gramática extendida da un solo árbol
+TIPOS_AMBIGUOS = frozenset(('PREPOSICION', 'CONJUNCION'))
+
+
+def analizar_con_respaldo(texto):
+    """
+    Analiza con ParserNatural y, si lo rechaza, con el Earley extendido
+    sobre los mismos tokens. Devuelve un diccionario con el analizador
+    que dio el árbol ('ll1' o 'earley'), ese árbol (una sola lectura),
+    la cantidad de árboles de la gramática extendida y el bosque (None
+    si la oración no puede ser ambigua). Lanza ParseError si ninguno la
+    acepta.
+    """
+    tokens = tokenizar(texto)
+    try:
+        arbol = ParserNatural(tokens).parse()
+    except ErrorConcordancia:
+        # La estructura se aceptó: el Earley no cambiaría el veredicto
+        raise
+    except ParseError:
+        bosque = ParserEarley(tokens).parse()
+        return {
+            'analizador': 'earley',
+            'arbol': primer_arbol(bosque),
+            'arboles': contar_arboles(bosque),
+            'bosque': bosque,
+        }
+
+    if not any(token.tipo in TIPOS_AMBIGUOS for token in tokens):
+        return {'analizador': 'll1', 'arbol': arbol, 'arboles': 1, 'bosque': None}
+    # La lectura de ParserNatural es una de varias posibles: contarlas.
+    # Si el Earley no la aceptara, el veredicto sigue siendo el de LL(1)
+    try:
+        bosque = ParserEarley(tokens).parse()
+    except ParseError:
+        return {'analizador': 'll1', 'arbol': arbol, 'arboles': 1, 'bosque': None}
+    return {'analizador': 'll1', 'arbol': arbol, 'arboles': contar_arboles(bosque), 'bosque': bosque}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analiza oraciones con ParserNatural y respaldo Earley")
+    parser.add_argument('oraciones', nargs='+')
+    parser.add_argument('--arboles', type=int, default=1, help="cuántos árboles mostrar")
+    args = parser.parse_args(argv)
+
+    codigo = 0
+    for texto in args.oraciones:
+        print(f"Oración: {texto}")
+        try:
+            resultado = analizar_con_respaldo(texto)
+        except ParseError as e:
+            print(f"  Error: {e.mensaje}")
+            codigo = 1
+            continue
+        print(f"  Analizador: {resultado['analizador']} ({resultado['arboles']} árboles)")
+        if resultado['analizador'] == 'll1':
+            # La lectura de ParserNatural y, si se piden más, las del bosque
+            print('  ' + json.dumps(resultado['arbol'], ensure_ascii=False))
+            if resultado['bosque'] is None or args.arboles == 1:
+                continue
+            print("  Árboles de la gramática extendida:")
+            mostrar = itertools.islice(arboles(resultado['bosque']), args.arboles)
+        elif args.arboles == 1:
+            mostrar = [resultado['arbol']]
+        else:
+            mostrar = itertools.islice(arboles(resultado['bosque']), args.arboles)
+        for arbol in mostrar:
+            print('  ' + json.dumps(arbol, ensure_ascii=False))
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Ejecutor de pruebas con aserciones para ambos parsers
+# ------------------------------------------------------------
+"""
+Lee casos de prueba desde archivos JSONL (uno por línea) y verifica
+el veredicto de cada uno. Formato de un caso:
+
+    {"id": "natural-01", "gramatica": "natural", "entrada": "El perro come.",
+     "valido": true, "arbol": {...}, "error": "texto esperado en el error"}
+
+`arbol`, `error` y `arboles` son opcionales: si están, el árbol debe
+ser igual, el mensaje de error debe contener el texto indicado y la
+cantidad de árboles (gramática extendida) debe coincidir.
+
+Los casos con "gramatica": "markdown" prueban el formato inline de
+generar_pdf.py: `html` es la salida esperada de process_markdown_inline.
+
+Los casos se reparten entre varios procesos. El programa termina con
+código 1 si algún caso falla.
+
+Uso:
+    python ejecutar_pruebas.py                        # casos_prueba.jsonl
+    python ejecutar_pruebas.py otro.jsonl --workers 8
+    python ejecutar_pruebas.py grande.jsonl --cache .cache_parseo.sqlite3
+    python ejecutar_pruebas.py --generar-corpus grande.jsonl --cantidad 100000
+    python ejecutar_pruebas.py --resultados resultados.jsonl   # ver informe_pruebas.py
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from evaluacion import GRAMATICAS, evaluar
+
+CORPUS_PREDETERMINADO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'casos_prueba.jsonl')
+
+
+def cargar_casos(rutas):
+    """Lee los casos de uno o más archivos JSONL (ignora líneas vacías y #)"""
+    casos = []
+    for ruta in rutas:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for numero, linea in enumerate(f, 1):
+                linea = linea.strip()
+                if not linea or linea.startswith('#'):
+                    continue
+                caso = json.loads(linea)
+                caso.setdefault('id', f"{os.path.basename(ruta)}:{numero}")
+                casos.append(caso)
+    return casos
+
+
+def verificar(caso):
+    """
+    Evalúa un caso y compara con lo esperado.
+    Devuelve (id, lista de fallas, resultado con duración).
+    """
+    inicio = time.perf_counter_ns()
+    if caso['gramatica'] == 'markdown':
+        resultado = evaluar_markdown(caso['entrada'])
+    else:
+        resultado = evaluar(caso['gramatica'], caso['entrada'])
+    resultado['duracion_us'] = (time.perf_counter_ns() - inicio) / 1000
+    return comparar(caso, resultado)
+
+
+def evaluar_markdown(texto):
+    """Resultado de un caso de formato inline (generar_pdf.process_markdown_inline)"""
+    from generar_pdf import process_markdown_inline
+    return {'gramatica': 'markdown', 'entrada': texto, 'valido': True,
+            'html': process_markdown_inline(texto), 'error': None}
+
+
+def comparar(caso, resultado):
+    """Compara un resultado con lo esperado por el caso"""
+    resultado['id'] = caso['id']
+
+    fallas = []
+    if resultado['valido'] != caso['valido']:
+        fallas.append(
+            f"se esperaba {'ACEPTADA' if caso['valido'] else 'ERROR'} "
+            f"pero fue {'ACEPTADA' if resultado['valido'] else 'ERROR'}"
+        )
+    if 'arbol' in caso and resultado.get('arbol') != caso['arbol']:
+        fallas.append(f"árbol distinto: {resultado.get('arbol')!r}")
+    if 'html' in caso and resultado.get('html') != caso['html']:
+        fallas.append(f"html distinto: {resultado.get('html')!r}")
+    if 'error' in caso and caso['error'] not in (resultado['error'] or ''):
+        fallas.append(f"error esperado {caso['error']!r}, obtenido {resultado['error']!r}")
+    if 'arboles' in caso and resultado.get('arboles') != caso['arboles']:
+        fallas.append(f"se esperaban {caso['arboles']} árboles, hubo {resultado.get('arboles')}")
+    if 'diagnostico' in caso:
+        # Solo se comparan las claves que el caso indica (p. ej. línea y columna)
+        obtenido = resultado.get('diagnostico') or {}
+        if any(obtenido.get(clave) != valor for clave, valor in caso['diagnostico'].items()):
+            fallas.append(f"diagnóstico esperado {caso['diagnostico']!r}, obtenido {obtenido!r}")
+    return caso['id'], fallas, resultado
+
+
+# Caché de resultados del proceso actual (ver cache_parseo.py)
+_cache = None
+
+
+def _abrir_cache(ruta):
+    """Abre la caché en el proceso actual (también usado como initializer del pool)"""
+    global _cache
+    if ruta:
+        from cache_parseo import CacheParseo
+        _cache = CacheParseo(ruta)
+
+
+def _verificar_lote(casos):
+    """Trabajo de un proceso: verifica un bloque de casos"""
+    if _cache is None:
+        return [verificar(caso) for caso in casos]
+
+    # Con caché se consulta y se guarda por bloque, no caso por caso
+    resultados = {}
+    for gramatica in GRAMATICAS:
+        entradas = [c['entrada'] for c in casos if c['gramatica'] == gramatica]
+        if entradas:
+            for entrada, resultado in zip(entradas, _cache.evaluar_muchos(gramatica, entradas)):
+                resultados[(gramatica, entrada)] = resultado
+    # Los casos de markdown no pasan por la caché de los parsers
+    return [comparar(caso, dict(resultados[(caso['gramatica'], caso['entrada'])]))
+            if caso['gramatica'] in GRAMATICAS else verificar(caso)
+            for caso in casos]
+
+
+def ejecutar(casos, workers=None, tamano_bloque=None, cache=None):
+    """
+    Verifica todos los casos (en paralelo si workers > 1).
+    Devuelve la lista de (id, fallas, resultado) en el orden original.
+    `cache` es la ruta de una caché persistente (opcional).
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(casos) < 200:
+        _abrir_cache(cache)
+        return _verificar_lote(casos)
+
+    # Bloques grandes: menos mensajes entre procesos
+    tamano_bloque = tamano_bloque or max(50, len(casos) // (workers * 8))
+    bloques = [casos[i:i + tamano_bloque] for i in range(0, len(casos), tamano_bloque)]
+    with multiprocessing.Pool(workers, initializer=_abrir_cache, initargs=(cache,)) as pool:
+        salida = []
+        for parcial in pool.imap(_verificar_lote, bloques):
+            salida.extend(parcial)
+    return salida
+
+
+def generar_corpus(ruta, cantidad, semilla=0, tamano=20):
+    """Escribe un corpus sintético con veredictos conocidos (ver generadores.py)"""
+    from generadores import (
+        generar_formal, generar_formal_invalida, generar_natural, generar_natural_invalida,
+    )
+
+    rng = random.Random(semilla)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for i in range(cantidad):
+            gramatica = 'formal' if i % 2 == 0 else 'natural'
+            valido = rng.random() < 0.5
+            if gramatica == 'formal':
+                entrada = (generar_formal if valido else generar_formal_invalida)(rng, tamano)
+            else:
+                entrada = (generar_natural if valido else generar_natural_invalida)(rng)
+            caso = {'id': f'sintetico-{i}', 'gramatica': gramatica, 'entrada': entrada, 'valido': valido}
+            f.write(json.dumps(caso, ensure_ascii=False) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta los casos de prueba de los parsers")
+    parser.add_argument('corpus', nargs='*', default=[CORPUS_PREDETERMINADO], help="archivos JSONL")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--resultados', metavar='RUTA', help="guardar cada resultado en JSONL")
+    parser.add_argument('--cache', metavar='RUTA', help="reutilizar resultados de una caché SQLite")
+    parser.add_argument('--generar-corpus', metavar='RUTA', help="crear un corpus sintético y salir")
+    parser.add_argument('--cantidad', type=int, default=100000)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.generar_corpus:
+        generar_corpus(args.generar_corpus, args.cantidad, args.semilla)
+        print(f"Corpus generado: {args.generar_corpus} ({args.cantidad} casos)")
+        return 0
+
+    casos = cargar_casos(args.corpus)
+    inicio = time.perf_counter()
+    salida = ejecutar(casos, args.workers, cache=args.cache)
+    duracion = time.perf_counter() - inicio
+
+    fallidos = [(id_caso, fallas) for id_caso, fallas, _ in salida if fallas]
+    for id_caso, fallas in fallidos:
+        print(f"FALLA {id_caso}")
+        for falla in fallas:
+            print(f"    {falla}")
+
+    if args.resultados:
+        with open(args.resultados, 'w', encoding='utf-8') as f:
+            for _, fallas, resultado in salida:
+                resultado['fallas'] = fallas
+                f.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+
+    print(f"\n{len(casos) - len(fallidos)}/{len(casos)} casos correctos en {duracion:.2f}s")
+    return 1 if fallidos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# ------------------------------------------------------------
+# Evaluación estructurada de entradas para ambos parsers
+# Devuelve diccionarios serializables (JSON) en lugar de imprimir
+# ------------------------------------------------------------
+import contextlib
+import io
+
+from diagnosticos import diagnostico
+from earley import analizar_con_respaldo
+from parser import analizar_cadena, parsear_lexeado
+from parser_natural import ParserNatural, ParseError, tokenizar
+
+GRAMATICAS = ('formal', 'natural', 'extendida')
+
+
+def evaluar_formal(cadena, llamadas=None):
+    """
+    Ejecuta miParser y devuelve su veredicto.
+    Los mensajes que miParser imprime se capturan como texto de error y
+    `diagnostico` ubica el token donde se cortó el análisis. Con
+    `llamadas` (lo que devuelve parser.lexear) no se vuelve a lexear.
+    """
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        if llamadas is None:
+            resultado, rango = analizar_cadena(cadena)
+        else:
+            resultado, rango = parsear_lexeado(cadena, llamadas)
+    if resultado == 1:
+        return {'gramatica': 'formal', 'entrada': cadena, 'valido': True, 'error': None}
+    return {
+        'gramatica': 'formal',
+        'entrada': cadena,
+        'valido': False,
+        'error': salida.getvalue().strip(),
+        'diagnostico': diagnostico(cadena, *rango),
+    }
+
+
+def evaluar_natural(texto):
+    """Ejecuta tokenizar + ParserNatural y devuelve veredicto y árbol"""
+    tokens = tokenizar(texto)
+    try:
+        arbol = ParserNatural(tokens).parse()
+        return {
+            'gramatica': 'natural',
+            'entrada': texto,
+            'valido': True,
+            'arbol': arbol,
+            'error': None,
+        }
+    except ParseError as e:
+        return {
+            'gramatica': 'natural',
+            'entrada': texto,
+            'valido': False,
+            'arbol': None,
+            'error': e.mensaje,
+            'posicion': e.posicion,
+            'diagnostico': diagnostico(texto, e.inicio, e.fin),
+        }
+
+
+def evaluar_extendida(texto):
+    """
+    ParserNatural con respaldo Earley para la gramática extendida.
+    `analizador` indica cuál dio el árbol y `arbol` es una sola lectura
+    (con 'll1', la de ParserNatural: cada complemento va al sustantivo
+    más cercano). `arboles` cuenta todas las lecturas de la gramática
+    extendida (más de uno si es ambigua), también cuando acepta 'll1'.
+    """
+    try:
+        resultado = analizar_con_respaldo(texto)
+    except ParseError as e:
+        return {
+            'gramatica': 'extendida',
+            'entrada': texto,
+            'valido': False,
+            'analizador': None,
+            'arbol': None,
+            'arboles': 0,
+            'error': e.mensaje,
+            'posicion': e.posicion,
+            'diagnostico': diagnostico(texto, e.inicio, e.fin),
+        }
+    return {
+        'gramatica': 'extendida',
+        'entrada': texto,
+        'valido': True,
+        'analizador': resultado['analizador'],
+        'arbol': resultado['arbol'],
+        'arboles': resultado['arboles'],
+        'error': None,
+    }
+
+
+def evaluar(gramatica, entrada):
+    """Evalúa una entrada con el parser de la gramática indicada"""
+    if gramatica == 'formal':
+        return evaluar_formal(entrada)
+    if gramatica == 'natural':
+        return evaluar_natural(entrada)
+    if gramatica == 'extendida':
+        return evaluar_extendida(entrada)
+    raise ValueError(f"Gramática desconocida: {gramatica}")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Fuzzer y prueba de carga para miParser y ParserNatural
+# ------------------------------------------------------------
+"""
+Deriva entradas al azar desde las gramáticas (ver `generadores.py`),
+las muta y las ejecuta en un pool de procesos. Reporta:
+
+  - fallos: excepciones inesperadas dentro de los parsers
+  - clasificaciones erróneas: el parser acepta o rechaza distinto que
+    el reconocedor de referencia
+  - tiempo superlineal: fragmentos cuyo tiempo de parseo (o de lexing
+    completo, porque miParser se detiene en el primer error) crece más
+    rápido que el tamaño de la entrada (p. ej. un regex que vuelve a
+    recorrer el resto de la entrada desde cada posición)
+
+Cada hallazgo se minimiza (delta debugging) antes de reportarlo.
+
+Uso:
+    python fuzzer.py --iteraciones 5000 --workers 4 --salida hallazgos.json
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from generadores import (
+    GRAMATICA_NATURAL, GRAMATICA_NATURAL_EXTENDIDA, IDENTIFICADORES, LEXEMAS,
+    acepta_tipos_formales, derivar_formal, derivar_natural, lexemas_formales, mutar,
+    palabras_naturales, unir_palabras,
+)
+from parser import miParser, lexer
+from parser_natural import (FEM, MASC, PLUR, RASGOS, SING, TODOS, VOCABULARIO, ParserNatural,
+                            ParseError, tokenizar)
+
+
+# Caracteres que se insertan para ejercitar el lexer (cadenas y
+# comentarios sin cerrar, saltos de línea, caracteres ilegales)
+FRAGMENTOS_LEXER = ['"', '/*', '*/', '//', '\n', '@', '#', 'ñ', '  ', '0x']
+
+# Palabras fuera del vocabulario para las mutaciones en español
+PALABRAS_EXTRA = ['elefante', 'hierba', ',', '..', '¿', 'y', 'PERRO']
+
+# Exponente a partir del cual el crecimiento se considera superlineal
+# (tiempo ~ tamaño ** exponente)
+EXPONENTE_SUPERLINEAL = 1.5
+
+# Por debajo de este tiempo (segundos) la medición es puro ruido
+TIEMPO_MINIMO = 1e-3
+
+
+# ============================================================
+# RECONOCEDORES DE REFERENCIA
+# ============================================================
+
+# La gramática natural es regular, así que se puede reconocer con una
+# expresión regular sobre las categorías (una letra por categoría).
+_LETRAS = {
+    'DETERMINANTE': 'D', 'SUSTANTIVO': 'S', 'ADJETIVO': 'A', 'VERBO': 'V',
+    'PUNTO': 'P', 'INTERROGACION': 'P', 'EXCLAMACION': 'P',
+    'PREPOSICION': 'R', 'CONJUNCION': 'C', 'ADVERBIO': 'B', 'NEGACION': 'N',
+}
+_SIMPLE = r'D?A*SA*'
+_SN = rf'{_SIMPLE}(?:[RC]{_SIMPLE})*'
+_ORACION_NATURAL = re.compile(rf'{_SN}N?VB*(?:{_SN})?(?:B|R{_SN})*P?')
+
+
+def referencia_natural(palabras):
+    """Veredicto esperado para una lista de palabras (sin usar tokenizar)"""
+    # Los signos de apertura sueltos no cuentan como palabras
+    palabras = [p for p in palabras if p.strip('¿¡')]
+    letras = ''.join(_LETRAS.get(VOCABULARIO.get(p.lower()), '?') for p in palabras)
+    if _ORACION_NATURAL.fullmatch(letras) is None:
+        return False
+    # Cada tira de D, A y S es un sintagma: todas sus palabras deben
+    # compartir algún género y algún número
+    for tira in re.finditer(r'[DAS]+', letras):
+        rasgos = [RASGOS.get(p.lower(), TODOS) for p in palabras[tira.start():tira.end()]]
+        if not any(all(r & bit for r in rasgos) for bit in (MASC, FEM)):
+            return False
+        if not any(all(r & bit for r in rasgos) for bit in (SING, PLUR)):
+            return False
+    return True
+
+
+# ============================================================
+# EJECUCIÓN DE LOS PARSERS
+# ============================================================
+
+def ejecutar_formal(cadena):
+    """Devuelve (aceptada, error) para miParser sin mostrar su salida"""
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        try:
+            return miParser(cadena) == 1, None
+        except Exception:
+            return None, traceback.format_exc(limit=3)
+
+
+def lexear_formal(cadena):
+    """Pasa toda la cadena por el lexer (miParser se detiene en el primer error)"""
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        lexer.input(cadena)
+        cantidad = 0
+        while lexer.token():
+            cantidad += 1
+    return cantidad
+
+
+def ejecutar_natural(texto):
+    """Devuelve (aceptada, error) para tokenizar + ParserNatural"""
+    try:
+        ParserNatural(tokenizar(texto)).parse()
+        return True, None
+    except ParseError:
+        return False, None
+    except Exception:
+        return None, traceback.format_exc(limit=3)
+
+
+# ============================================================
+# MINIMIZACIÓN
+# ============================================================
+
+def minimizar(elementos, sigue_fallando):
+    """
+    Delta debugging (ddmin): reduce la lista `elementos` mientras
+    `sigue_fallando(lista)` siga siendo verdadero.
+    """
+    elementos = list(elementos)
+    partes = 2
+    while len(elementos) >= 2:
+        tamano = math.ceil(len(elementos) / partes)
+        reducido = False
+        for inicio in range(0, len(elementos), tamano):
+            complemento = elementos[:inicio] + elementos[inicio + tamano:]
+            if complemento and sigue_fallando(complemento):
+                elementos = complemento
+                partes = max(partes - 1, 2)
+                reducido = True
+                break
+        if not reducido:
+            if partes >= len(elementos):
+                break
+            partes = min(partes * 2, len(elementos))
+    return elementos
+
+
+# ============================================================
+# CASOS DE FUZZING
+# ============================================================
+
+_TIPO_DE_LEXEMA = {lexema: tipo for tipo, lexema in LEXEMAS.items() if lexema}
+
+
+def esperado_formal(lexemas):
+    """
+    Veredicto esperado para una lista de lexemas según la tabla LL(1),
+    o None si contiene fragmentos que no son tokens de la gramática.
+    """
+    tipos = []
+    for lexema in lexemas:
+        if lexema in _TIPO_DE_LEXEMA:
+            tipos.append(_TIPO_DE_LEXEMA[lexema])
+        elif lexema.isdigit():
+            tipos.append('NUMBER')
+        elif lexema in IDENTIFICADORES:
+            tipos.append('identificador')
+        else:
+            return None
+    return acepta_tipos_formales(tipos)
+
+
+def _esperado(gramatica, elementos):
+    if gramatica == 'formal':
+        return esperado_formal(elementos)
+    return referencia_natural(elementos)
+
+
+def _caso_formal(rng, tamano):
+    """Genera un caso formal como lista de lexemas"""
+    tipos = derivar_formal(rng, rng.randint(1, tamano))
+    if rng.random() < 0.2:
+        return lexemas_formales(tipos, rng)
+    if rng.random() < 0.7:
+        return lexemas_formales(mutar(tipos, list(LEXEMAS), rng), rng)
+    # Mutación a nivel de caracteres: solo se verifica que no falle
+    return mutar(lexemas_formales(tipos, rng), FRAGMENTOS_LEXER, rng)
+
+
+def _caso_natural(rng):
+    """Genera un caso natural como lista de palabras"""
+    gramatica = rng.choice((GRAMATICA_NATURAL, GRAMATICA_NATURAL_EXTENDIDA))
+    palabras = palabras_naturales(derivar_natural(rng, gramatica=gramatica), rng)
+    for _ in range(rng.randint(0, 3)):
+        palabras = mutar(palabras, list(VOCABULARIO) + PALABRAS_EXTRA, rng)
+    return palabras
+
+
+def _clasificar(gramatica, elementos):
+    """Ejecuta un caso y devuelve (tipo de hallazgo o None, detalle)"""
+    if gramatica == 'formal':
+        aceptada, error = ejecutar_formal(' '.join(elementos))
+    else:
+        aceptada, error = ejecutar_natural(unir_palabras(elementos))
+    if error is not None:
+        return 'fallo', error
+    esperado = _esperado(gramatica, elementos)
+    if esperado is not None and aceptada != esperado:
+        return 'clasificacion', f"esperado={esperado} obtenido={aceptada}"
+    return None, None
+
+
+def _reportar(gramatica, elementos, tipo, detalle):
+    """Minimiza un hallazgo y lo deja listo para el reporte"""
+    minimo = minimizar(elementos, lambda c: _clasificar(gramatica, c)[0] == tipo)
+    unir = ' '.join if gramatica == 'formal' else unir_palabras
+    return {
+        'gramatica': gramatica,
+        'tipo': tipo,
+        'detalle': detalle,
+        'entrada': unir(elementos),
+        'minimizada': unir(minimo),
+    }
+
+
+def fuzzear_lote(semilla, iteraciones, tamano=30):
+    """Trabajo de un proceso: ejecuta `iteraciones` casos por gramática"""
+    rng = random.Random(semilla)
+    hallazgos = []
+    vistos = set()
+    for _ in range(iteraciones):
+        for gramatica in ('formal', 'natural'):
+            if gramatica == 'formal':
+                elementos = _caso_formal(rng, tamano)
+            else:
+                elementos = _caso_natural(rng)
+            tipo, detalle = _clasificar(gramatica, elementos)
+            if tipo is None:
+                continue
+            hallazgo = _reportar(gramatica, elementos, tipo, detalle)
+            clave = (gramatica, tipo, hallazgo['minimizada'])
+            if clave not in vistos:
+                vistos.add(clave)
+                hallazgos.append(hallazgo)
+    return hallazgos
+
+
+# ============================================================
+# DETECCIÓN DE TIEMPO SUPERLINEAL
+# ============================================================
+
+def _tiempo(funcion, entrada, repeticiones=3):
+    """Mejor tiempo (en segundos) de varias ejecuciones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(entrada)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def exponente_crecimiento(funcion, fragmento, tamanos=(200, 400, 800)):
+    """
+    Estima k en tiempo ~ n**k repitiendo `fragmento` n veces.
+    Se usa la pendiente entre el tamaño menor y el mayor (escala log).
+    """
+    tiempos = [_tiempo(funcion, fragmento * n) for n in tamanos]
+    if tiempos[0] <= 0:
+        return 0.0, tiempos
+    k = math.log(tiempos[-1] / tiempos[0]) / math.log(tamanos[-1] / tamanos[0])
+    return k, tiempos
+
+
+def fragmentos_candidatos(rng, cantidad):
+    """Fragmentos a repetir: los conocidos del lexer y otros al azar"""
+    candidatos = [
+        ('lexico', '" x '),      # cadena sin cerrar (t_cadena)
+        ('lexico', '/* x '),     # comentario sin cerrar (t_comentario_bloque)
+        ('lexico', 'x + '),      # expresión larga (caso lineal de control)
+        ('formal', 'x + '),
+        ('natural', 'perro '),
+        ('natural', 'el perro grande de la casa y '),   # sintagmas y complementos largos
+    ]
+    for _ in range(cantidad):
+        tipos = mutar(derivar_formal(rng, 6)[:-1], list(LEXEMAS), rng)
+        lexemas = mutar(lexemas_formales(tipos, rng), FRAGMENTOS_LEXER, rng)
+        candidatos.append((rng.choice(('formal', 'lexico')), ' '.join(lexemas) + ' '))
+    for _ in range(cantidad // 2):
+        palabras = mutar(palabras_naturales(derivar_natural(rng), rng), PALABRAS_EXTRA, rng)
+        candidatos.append(('natural', unir_palabras(palabras) + ' '))
+    return candidatos
+
+
+def medir_fragmento(gramatica, fragmento, umbral=EXPONENTE_SUPERLINEAL):
+    """Trabajo de un proceso: mide el crecimiento de un fragmento"""
+    funcion = {
+        'formal': ejecutar_formal,
+        'lexico': lexear_formal,
+        'natural': ejecutar_natural,
+    }[gramatica]
+    k, tiempos = exponente_crecimiento(funcion, fragmento)
+    if k < umbral or tiempos[-1] < TIEMPO_MINIMO:
+        return None
+    return {
+        'gramatica': gramatica,
+        'tipo': 'superlineal',
+        'fragmento': fragmento,
+        'exponente': round(k, 2),
+        'tiempos_s': [round(t, 6) for t in tiempos],
+    }
+
+
+# ============================================================
+# PROGRAMA PRINCIPAL
+# ============================================================
+
+def fuzzear(iteraciones=2000, workers=None, semilla=0, tamano=30, fragmentos=20):
+    """Ejecuta el fuzzing y la búsqueda de tiempo superlineal en paralelo"""
+    workers = workers or os.cpu_count() or 1
+    por_worker = math.ceil(iteraciones / workers)
+    rng = random.Random(semilla)
+    candidatos = fragmentos_candidatos(rng, fragmentos)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        lotes = [
+            pool.submit(fuzzear_lote, semilla * 1000 + i, por_worker, tamano)
+            for i in range(workers)
+        ]
+        # Primera pasada en paralelo con un umbral más permisivo
+        medidas = [
+            pool.submit(medir_fragmento, g, f, EXPONENTE_SUPERLINEAL * 0.75)
+            for g, f in candidatos
+        ]
+
+        hallazgos = []
+        vistos = set()
+        for futuro in lotes:
+            for h in futuro.result():
+                clave = (h['gramatica'], h['tipo'], h['minimizada'])
+                if clave not in vistos:
+                    vistos.add(clave)
+                    hallazgos.append(h)
+        sospechosos = [m.result() for m in medidas]
+
+    # Con otros procesos compitiendo por la CPU los tiempos son ruidosos:
+    # los sospechosos se vuelven a medir aquí, uno a la vez
+    lentos = [medir_fragmento(m['gramatica'], m['fragmento']) for m in sospechosos if m]
+
+    return {
+        'parametros': {'iteraciones': iteraciones, 'workers': workers, 'semilla': semilla},
+        'hallazgos': hallazgos,
+        'superlineales': [m for m in lentos if m],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzzer para los parsers TLP")
+    parser.add_argument('--iteraciones', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--tamano', type=int, default=30, help="tokens máximos por cadena formal")
+    parser.add_argument('--fragmentos', type=int, default=20, help="fragmentos al azar para medir crecimiento")
+    parser.add_argument('--salida', help="guardar el reporte en JSON")
+    args = parser.parse_args(argv)
+
+    reporte = fuzzear(args.iteraciones, args.workers, args.semilla, args.tamano, args.fragmentos)
+
+    print(f"Hallazgos: {len(reporte['hallazgos'])}")
+    for h in reporte['hallazgos']:
+        print(f"  [{h['gramatica']}/{h['tipo']}] {h['minimizada']!r} ({h['detalle'].splitlines()[-1]})")
+    print(f"Entradas con tiempo superlineal: {len(reporte['superlineales'])}")
+    for s in reporte['superlineales']:
+        print(f"  [{s['gramatica']}] {s['fragmento']!r} * n -> n^{s['exponente']}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"Reporte guardado en {args.salida}")
+
+    return 1 if reporte['hallazgos'] or reporte['superlineales'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+# ------------------------------------------------------------
+# Generadores de entradas sintéticas para ambos parsers
+# Derivan cadenas al azar desde `tabla` (Fase 1) y desde la
+# gramática de `parser_natural` con su VOCABULARIO (Fase 2)
+# ------------------------------------------------------------
+import random
+
+from parser import tabla, tokens as TOKENS_FORMALES
+from parser_natural import RASGOS, TODOS, VOCABULARIO, concuerdan
+
+
+# ============================================================
+# FASE 1 - LENGUAJE FORMAL
+# ============================================================
+
+# Identificadores que el lexer no confunde con palabras reservadas
+# (t_int, t_for, t_if... se aplican antes que t_identificador y
+# cortan prefijos como "interes" o "forma")
+IDENTIFICADORES = ['x', 'y', 'z', 'a', 'b', 'c', 'total', 'suma', 'valor', 'resultado']
+
+# Lexema para cada terminal de la tabla. Los terminales sin lexema
+# (por ejemplo 'string', que no tiene regla en el lexer) no se derivan.
+LEXEMAS = {
+    'PLUS': '+',
+    'MINUS': '-',
+    'TIMES': '*',
+    'DIVIDE': '/',
+    'LPAREN': '(',
+    'RPAREN': ')',
+    'finInstruccion': ';',
+    'asignacion': '=',
+    'coma': ',',
+    'eof': '$',
+    'int': 'int',
+    'float': 'float',
+    'if': 'if',
+    'for': 'for',
+    'NUMBER': None,         # se genera al azar
+    'identificador': None,  # se elige de IDENTIFICADORES
+}
+
+
+def _producciones_formales():
+    """Agrupa las producciones de `tabla` por no terminal (sin repetir)"""
+    producciones = {}
+    for no_terminal, _, produccion in tabla:
+        if any(s in TOKENS_FORMALES and s not in LEXEMAS for s in produccion):
+            continue
+        cuerpo = tuple(s for s in produccion if s != 'vacia')
+        lista = producciones.setdefault(no_terminal, [])
+        if cuerpo not in lista:
+            lista.append(cuerpo)
+    return producciones
+
+
+def _longitudes_minimas(producciones):
+    """Longitud mínima (en terminales) que deriva cada no terminal"""
+    minimos = {}
+    cambio = True
+    while cambio:
+        cambio = False
+        for no_terminal, cuerpos in producciones.items():
+            for cuerpo in cuerpos:
+                if all(s in LEXEMAS or s in minimos for s in cuerpo):
+                    largo = sum(1 if s in LEXEMAS else minimos[s] for s in cuerpo)
+                    if largo < minimos.get(no_terminal, float('inf')):
+                        minimos[no_terminal] = largo
+                        cambio = True
+    return minimos
+
+
+PRODUCCIONES_FORMALES = _producciones_formales()
+MINIMOS_FORMALES = _longitudes_minimas(PRODUCCIONES_FORMALES)
+
+
+def _largo_minimo(simbolo):
+    return 1 if simbolo in LEXEMAS else MINIMOS_FORMALES[simbolo]
+
+
+def derivar_formal(rng, tamano=20):
+    """
+    Deriva al azar una secuencia de tipos de token desde 'S'.
+
+    La derivación es por la izquierda y con pila explícita, así que no
+    tiene límite de recursión. `tamano` es la cantidad aproximada de
+    tokens: mientras no se alcanza se elige una producción al azar y,
+    cuando ya no cabe, la de menor longitud.
+    """
+    tipos = []
+    pila = ['eof', 'S']
+    pendientes = 1 + MINIMOS_FORMALES['S']  # mínimo que falta por emitir
+
+    while pila:
+        simbolo = pila.pop()
+        if simbolo in LEXEMAS:
+            tipos.append(simbolo)
+            pendientes -= 1
+            continue
+
+        cuerpos = PRODUCCIONES_FORMALES[simbolo]
+        pendientes -= MINIMOS_FORMALES[simbolo]
+        caben = [
+            c for c in cuerpos
+            if len(tipos) + pendientes + sum(_largo_minimo(s) for s in c) <= tamano
+        ]
+        if caben:
+            cuerpo = rng.choice(caben)
+        else:
+            cuerpo = min(cuerpos, key=lambda c: sum(_largo_minimo(s) for s in c))
+
+        pendientes += sum(_largo_minimo(s) for s in cuerpo)
+        pila.extend(reversed(cuerpo))
+
+    return tipos
+
+
+def lexemas_formales(tipos, rng):
+    """Convierte una secuencia de tipos de token en lexemas concretos"""
+    lexemas = []
+    for tipo in tipos:
+        if tipo == 'NUMBER':
+            lexemas.append(str(rng.randint(0, 999)))
+        elif tipo == 'identificador':
+            lexemas.append(rng.choice(IDENTIFICADORES))
+        else:
+            lexemas.append(LEXEMAS[tipo])
+    return lexemas
+
+
+def acepta_tipos_formales(tipos):
+    """
+    Reconoce una secuencia de tipos de token con la tabla LL(1).
+    Es la misma lógica de miParser sin lexer ni mensajes; sirve para
+    clasificar las entradas generadas sin imprimir nada.
+    """
+    celdas = {(fila[0], fila[1]): fila[2] for fila in tabla}
+    pila = ['eof', 'S']
+    i = 0
+    while pila:
+        if i >= len(tipos):
+            return False
+        x = pila.pop()
+        if x in TOKENS_FORMALES:
+            if x != tipos[i]:
+                return False
+            i += 1
+            if x == 'eof':
+                return True
+        else:
+            celda = celdas.get((x, tipos[i]))
+            if celda is None:
+                return False
+            pila.extend(s for s in reversed(celda) if s != 'vacia')
+    return False
+
+
+def generar_formal(rng, tamano=20):
+    """Genera una cadena válida para miParser de unos `tamano` tokens"""
+    return ' '.join(lexemas_formales(derivar_formal(rng, tamano), rng))
+
+
+# ============================================================
+# FASE 2 - LENGUAJE NATURAL
+# ============================================================
+
+PALABRAS_POR_CATEGORIA = {}
+for _palabra, _categoria in VOCABULARIO.items():
+    PALABRAS_POR_CATEGORIA.setdefault(_categoria, []).append(_palabra)
+
+PUNTUACION = ['PUNTO', 'INTERROGACION', 'EXCLAMACION']
+NOMINALES = {'DETERMINANTE', 'ADJETIVO', 'SUSTANTIVO'}
+_CACHE_COMPATIBLES = {}
+SIGNOS = {p for p, c in VOCABULARIO.items() if c in PUNTUACION}
+
+# Subconjunto básico de la gramática de parser_natural (SVO con a lo
+# sumo un adjetivo). Cada alternativa es una lista de categorías; []
+# representa vacío.
+GRAMATICA_NATURAL = {
+    'ORACION': [['SUJETO', 'VERBO', 'OBJETO', 'FIN']],
+    'SUJETO': [
+        ['DETERMINANTE', 'SUSTANTIVO'],
+        ['DETERMINANTE', 'SUSTANTIVO', 'ADJETIVO'],
+        ['SUSTANTIVO'],
+        ['SUSTANTIVO', 'ADJETIVO'],
+        ['ADJETIVO', 'SUSTANTIVO'],
+    ],
+    'OBJETO': [
+        ['DETERMINANTE', 'SUSTANTIVO'],
+        ['DETERMINANTE', 'SUSTANTIVO', 'ADJETIVO'],
+        ['SUSTANTIVO'],
+        ['SUSTANTIVO', 'ADJETIVO'],
+        ['ADJETIVO', 'SUSTANTIVO'],
+        [],
+    ],
+    'FIN': [['PUNTO'], ['INTERROGACION'], ['EXCLAMACION'], []],
+}
+
+# Gramática completa de parser_natural: varios adjetivos, complementos
+# con preposición, coordinación, adverbios y negación. Las repeticiones
+# son recursiones con una alternativa vacía (o sin recursión) repetida
+# para que las oraciones no crezcan demasiado.
+GRAMATICA_NATURAL_EXTENDIDA = {
+    'ORACION': [['SN', 'NEGACION_OPC', 'VERBO', 'ADVERBIOS', 'OBJETO', 'COMPLEMENTOS', 'FIN']],
+    'SN': [['NOMINAL'], ['NOMINAL'], ['NOMINAL', 'CONJUNCION', 'SN']],
+    'NOMINAL': [['SIMPLE'], ['SIMPLE'], ['SIMPLE', 'PREPOSICION', 'NOMINAL']],
+    'SIMPLE': [['DETERMINANTE_OPC', 'ADJETIVOS', 'SUSTANTIVO', 'ADJETIVOS']],
+    'DETERMINANTE_OPC': [['DETERMINANTE'], []],
+    'ADJETIVOS': [[], [], ['ADJETIVO', 'ADJETIVOS']],
+    'NEGACION_OPC': [['NEGACION'], [], [], []],
+    'ADVERBIOS': [[], [], ['ADVERBIO', 'ADVERBIOS']],
+    'OBJETO': [['SN'], []],
+    'COMPLEMENTOS': [[], [], ['ADVERBIO', 'COMPLEMENTOS'], ['PREPOSICION', 'SN', 'COMPLEMENTOS']],
+    'FIN': [['PUNTO'], ['INTERROGACION'], ['EXCLAMACION'], []],
+}
+
+
+def derivar_natural(rng, simbolo='ORACION', gramatica=GRAMATICA_NATURAL):
+    """Deriva al azar una secuencia de categorías desde `simbolo`"""
+    categorias = []
+    pila = [simbolo]
+    while pila:
+        actual = pila.pop()
+        if actual in gramatica:
+            pila.extend(reversed(rng.choice(gramatica[actual])))
+        else:
+            categorias.append(actual)
+    return categorias
+
+
+def palabras_naturales(categorias, rng):
+    """
+    Elige una palabra del VOCABULARIO para cada categoría. Dentro de cada
+    tira de determinantes, adjetivos y sustantivos solo se eligen palabras
+    que mantienen la concordancia de género y número con las anteriores.
+    """
+    palabras = []
+    mascara = TODOS
+    for categoria in categorias:
+        if categoria not in NOMINALES:
+            palabras.append(rng.choice(PALABRAS_POR_CATEGORIA[categoria]))
+            mascara = TODOS
+            continue
+        opciones = _compatibles(categoria, mascara)
+        palabra = rng.choice(opciones)
+        palabras.append(palabra)
+        mascara &= RASGOS.get(palabra, TODOS)
+    return palabras
+
+
+def _compatibles(categoria, mascara):
+    """Palabras de `categoria` que concuerdan con `mascara` (con caché)"""
+    clave = (categoria, mascara)
+    if clave not in _CACHE_COMPATIBLES:
+        _CACHE_COMPATIBLES[clave] = [
+            p for p in PALABRAS_POR_CATEGORIA[categoria]
+            if concuerdan(mascara & RASGOS.get(p, TODOS))
+        ]
+    return _CACHE_COMPATIBLES[clave]
+
+
+def unir_palabras(palabras):
+    """Une palabras pegando la puntuación a la palabra anterior"""
+    texto = ''
+    for palabra in palabras:
+        if palabra in SIGNOS and texto:
+            texto += palabra
+        else:
+            texto += (' ' if texto else '') + palabra
+    return texto
+
+
+def _gramatica_natural(extendida):
+    return GRAMATICA_NATURAL_EXTENDIDA if extendida else GRAMATICA_NATURAL
+
+
+def generar_natural(rng, extendida=False):
+    """Genera una oración válida para parsear_oracion"""
+    palabras = palabras_naturales(derivar_natural(rng, gramatica=_gramatica_natural(extendida)), rng)
+    palabras[0] = palabras[0].capitalize()
+    return unir_palabras(palabras)
+
+
+# ============================================================
+# MUTACIONES (entradas inválidas)
+# ============================================================
+
+def mutar(elementos, alfabeto, rng):
+    """
+    Aplica una mutación al azar sobre una lista de tokens/palabras:
+    quitar uno, intercambiar dos vecinos o insertar uno del alfabeto.
+    """
+    elementos = list(elementos)
+    operacion = rng.choice(('quitar', 'intercambiar', 'insertar'))
+    if operacion == 'quitar' and len(elementos) > 1:
+        del elementos[rng.randrange(len(elementos))]
+    elif operacion == 'intercambiar' and len(elementos) > 1:
+        i = rng.randrange(len(elementos) - 1)
+        elementos[i], elementos[i + 1] = elementos[i + 1], elementos[i]
+    else:
+        elementos.insert(rng.randrange(len(elementos) + 1), rng.choice(alfabeto))
+    return elementos
+
+
+def generar_formal_invalida(rng, tamano=20, intentos=50):
+    """Genera una cadena que miParser debe rechazar (mutando una válida)"""
+    tipos = derivar_formal(rng, tamano)
+    alfabeto = list(LEXEMAS)
+    for _ in range(intentos):
+        mutados = mutar(tipos, alfabeto, rng)
+        if not acepta_tipos_formales(mutados):
+            return ' '.join(lexemas_formales(mutados, rng))
+    # Sin '$' final la cadena nunca se acepta
+    return ' '.join(lexemas_formales(tipos[:-1], rng))
+
+
+def generar_natural_invalida(rng, intentos=50, extendida=False):
+    """Genera una oración que parsear_oracion debe rechazar"""
+    from parser_natural import ParserNatural, ParseError, tokenizar
+
+    palabras = palabras_naturales(derivar_natural(rng, gramatica=_gramatica_natural(extendida)), rng)
+    alfabeto = list(VOCABULARIO)
+    for _ in range(intentos):
+        texto = unir_palabras(mutar(palabras, alfabeto, rng))
+        try:
+            ParserNatural(tokenizar(texto)).parse()
+        except ParseError:
+            return texto
+    # Un verbo al inicio nunca forma un SUJETO válido
+    return unir_palabras([rng.choice(PALABRAS_POR_CATEGORIA['VERBO'])] + palabras)
+
+
+def generar_lote(gramatica, cantidad, tamano=20, validas=True, semilla=0, extendida=False):
+    """
+    Genera `cantidad` entradas reproducibles para 'formal' o 'natural'.
+    Con la misma semilla se obtiene siempre el mismo lote. `extendida`
+    usa GRAMATICA_NATURAL_EXTENDIDA en lugar del subconjunto básico.
+    """
+    rng = random.Random(semilla)
+    if gramatica == 'formal':
+        generar = generar_formal if validas else generar_formal_invalida
+        return [generar(rng, tamano) for _ in range(cantidad)]
+    if gramatica == 'natural':
+        generar = generar_natural if validas else generar_natural_invalida
+        return [generar(rng, extendida=extendida) for _ in range(cantidad)]
+    raise ValueError(f"Gramática desconocida: {gramatica}")
@@ -14,19 +14,36 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from PIL import Image as PILImage
+import reportlab
+import argparse
+import hashlib
+import html
+import io
+import itertools
+import json
 import re
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 
 
-def parse_markdown_to_elements(markdown_text):
-    """Convierte texto markdown a elementos de ReportLab"""
-    elements = []
-    styles = getSampleStyleSheet()
+# ========== REGISTRO DE ESTILOS ==========
+# Los estilos se crean una sola vez por proceso y se comparten entre
+# documentos y tablas (ReportLab no modifica los estilos al usarlos)
+_STYLES = None
+_TABLE_STYLE = None
+_COVER_TABLE_STYLE = None
+
+def _build_styles():
+    """Crea todos los ParagraphStyle usados en el PDF"""
+    sample = getSampleStyleSheet()
+    styles = {}
     
-    # Crear estilos personalizados
-    title_style = ParagraphStyle(
+    # Contenido del informe
+    styles['title'] = ParagraphStyle(
         'CustomTitle',
-        parent=styles['Heading1'],
+        parent=sample['Heading1'],
         fontSize=16,
         textColor=colors.HexColor('#000000'),
         spaceAfter=12,
@@ -34,9 +51,9 @@ def parse_markdown_to_elements(markdown_text):
         alignment=TA_LEFT
     )
     
-    heading1_style = ParagraphStyle(
+    styles['heading1'] = ParagraphStyle(
         'CustomHeading1',
-        parent=styles['Heading1'],
+        parent=sample['Heading1'],
         fontSize=14,
         textColor=colors.HexColor('#000000'),
         spaceAfter=10,
@@ -45,9 +62,9 @@ def parse_markdown_to_elements(markdown_text):
         alignment=TA_LEFT
     )
     
-    heading2_style = ParagraphStyle(
+    styles['heading2'] = ParagraphStyle(
         'CustomHeading2',
-        parent=styles['Heading2'],
+        parent=sample['Heading2'],
         fontSize=12,
         textColor=colors.HexColor('#000000'),
         spaceAfter=8,
@@ -56,9 +73,9 @@ def parse_markdown_to_elements(markdown_text):
         alignment=TA_LEFT
     )
     
-    heading3_style = ParagraphStyle(
+    styles['heading3'] = ParagraphStyle(
         'CustomHeading3',
-        parent=styles['Heading3'],
+        parent=sample['Heading3'],
         fontSize=11,
         textColor=colors.HexColor('#000000'),
         spaceAfter=6,
@@ -67,9 +84,9 @@ def parse_markdown_to_elements(markdown_text):
         alignment=TA_LEFT
     )
     
-    normal_style = ParagraphStyle(
+    styles['normal'] = ParagraphStyle(
         'CustomNormal',
-        parent=styles['Normal'],
+        parent=sample['Normal'],
         fontSize=10,
         textColor=colors.HexColor('#000000'),
         spaceAfter=6,
@@ -77,9 +94,9 @@ def parse_markdown_to_elements(markdown_text):
         fontName='Helvetica'
     )
     
-    code_style = ParagraphStyle(
+    styles['code'] = ParagraphStyle(
         'Code',
-        parent=styles['Code'],
+        parent=sample['Code'],
         fontSize=9,
         textColor=colors.HexColor('#000000'),
         fontName='Courier',
@@ -88,257 +105,411 @@ def parse_markdown_to_elements(markdown_text):
         backColor=colors.HexColor('#F5F5F5')
     )
     
-    lines = markdown_text.split('\n')
-    in_code_block = False
-    code_block_lines = []
+    # Tablas
+    styles['table_header'] = ParagraphStyle(
+        'TableHeader',
+        fontSize=10,
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT,
+        textColor=colors.HexColor('#000000'),
+        spaceBefore=0,
+        spaceAfter=0
+    )
+    
+    styles['table_cell'] = ParagraphStyle(
+        'TableCell',
+        fontSize=9,
+        fontName='Helvetica',
+        alignment=TA_LEFT,
+        textColor=colors.HexColor('#000000'),
+        spaceBefore=0,
+        spaceAfter=0
+    )
+    
+    # Portada
+    styles['university_title'] = ParagraphStyle(
+        'UniversityTitle',
+        parent=sample['Heading1'],
+        fontSize=15,
+        textColor=colors.HexColor('#000000'),
+        spaceAfter=15,
+        fontName='Helvetica-Bold',
+        alignment=TA_CENTER
+    )
+    
+    styles['course'] = ParagraphStyle(
+        'CourseStyle',
+        parent=sample['Heading2'],
+        fontSize=11,
+        textColor=colors.HexColor('#000000'),
+        spaceAfter=8,
+        fontName='Helvetica',
+        alignment=TA_CENTER
+    )
+    
+    styles['theme'] = ParagraphStyle(
+        'ThemeStyle',
+        parent=sample['Heading1'],
+        fontSize=13,
+        textColor=colors.HexColor('#000000'),
+        spaceAfter=20,
+        fontName='Helvetica-Bold',
+        alignment=TA_CENTER
+    )
+    
+    styles['project_title'] = ParagraphStyle(
+        'ProjectTitle',
+        parent=sample['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#000000'),
+        spaceAfter=20,
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT
+    )
+    
+    return styles
+
+def _build_table_style():
+    """Estilo de las tablas del contenido del informe"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D0D0D0')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFFFF')),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#000000')),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#808080')),
+        ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#000000')),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#FFFFFF'), colors.HexColor('#F8F8F8')]),
+    ])
+
+def _build_cover_table_style():
+    """Estilo de la tabla de integrantes de la portada"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D0D0D0')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('TOPPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFFFF')),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#000000')),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#808080')),
+        ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#000000')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#FFFFFF'), colors.HexColor('#F8F8F8')]),
+    ])
+
+def get_styles():
+    """Devuelve el registro de ParagraphStyle (creado una vez por proceso)"""
+    global _STYLES
+    if _STYLES is None:
+        _STYLES = _build_styles()
+    return _STYLES
+
+def get_table_style():
+    """Devuelve el TableStyle compartido de las tablas del informe"""
+    global _TABLE_STYLE
+    if _TABLE_STYLE is None:
+        _TABLE_STYLE = _build_table_style()
+    return _TABLE_STYLE
+
+def get_cover_table_style():
+    """Devuelve el TableStyle compartido de la tabla de integrantes"""
+    global _COVER_TABLE_STYLE
+    if _COVER_TABLE_STYLE is None:
+        _COVER_TABLE_STYLE = _build_cover_table_style()
+    return _COVER_TABLE_STYLE
+
+
+def parse_markdown_to_elements(markdown_text, informe=False):
+    """Convierte texto markdown a elementos de ReportLab"""
+    return list(iter_markdown_elements(markdown_text.split('\n'), informe))
+
+def iter_markdown_elements(lines, informe=False):
+    """
+    Versión generadora de parse_markdown_to_elements: recibe cualquier
+    iterable de líneas y produce los elementos a medida que cierra cada
+    bloque, sin armar la lista completa.
+    Con `informe` se omiten los títulos "Informe Fase 2" (la portada ya
+    pone el título).
+    """
+    return iter_block_elements(scan_markdown_blocks(lines), informe)
+
+def iter_block_elements(blocks, informe=False):
+    """Flowables nuevos a partir de los bloques de scan_markdown_blocks"""
+    elements = []  # Elementos del bloque actual (se vacía en cada vuelta)
+    last = None    # Último elemento producido
+    styles = get_styles()
+    title_style = styles['title']
+    heading1_style = styles['heading1']
+    heading2_style = styles['heading2']
+    heading3_style = styles['heading3']
+    normal_style = styles['normal']
+    code_style = styles['code']
+    
+    heading_styles = {
+        1: (title_style, 12),
+        2: (heading1_style, 8),
+        3: (heading2_style, 6),
+        4: (heading3_style, 4),
+    }
+    
+    pending_title = None  # Título que espera ver si le sigue una tabla
+    pending_space = 0
+    
+    def flush_pending(space_after):
+        nonlocal pending_title
+        if pending_title:
+            elements.append(pending_title)
+            elements.append(Spacer(1, space_after))
+            pending_title = None
+    
+    for kind, value in blocks:
+        if elements:
+            last = elements[-1]
+            yield from elements
+            elements.clear()
+        
+        # Un solo bloque de lookahead: el título pendiente se agrupa con la
+        # tabla si es lo siguiente (sin contar líneas vacías)
+        if pending_title and kind != 'blank':
+            if kind == 'table':
+                table = parse_table('\n'.join(value))
+                if table:
+                    elements.append(KeepTogether([pending_title, Spacer(1, 4), table]))
+                    elements.append(Spacer(1, 12))
+                    pending_title = None
+                    continue
+            flush_pending(pending_space)
+        
+        if kind == 'blank':
+            if last is not None and not isinstance(last, Spacer) and not pending_title:
+                elements.append(Spacer(1, 6))
+        elif kind == 'code':
+            if value:
+                code_text = '\n'.join(value)
+                elements.append(Paragraph(f'<font face="Courier" size="9">{escape_html(code_text)}</font>', code_style))
+                elements.append(Spacer(1, 6))
+        elif kind == 'table':
+            table = parse_table('\n'.join(value))
+            if table:
+                elements.append(KeepTogether(table))
+                elements.append(Spacer(1, 12))
+        elif kind == 'heading':
+            level, text = value
+            # Saltar el título principal "Informe Fase 2" ya que se agrega manualmente
+            if informe and level == 1 and 'Informe Fase 2' in text:
+                continue
+            style, pending_space = heading_styles[level]
+            pending_title = Paragraph(escape_html(text), style)
+        elif kind == 'list_item':
+            elements.append(Paragraph(f'• {process_markdown_inline(value)}', normal_style))
+            elements.append(Spacer(1, 4))
+        elif kind == 'rule':
+            elements.append(Spacer(1, 12))
+        else:
+            para_text = process_markdown_inline(value)
+            if para_text.strip():
+                elements.append(Paragraph(para_text, normal_style))
+                elements.append(Spacer(1, 6))
+    
+    # Si queda un título pendiente sin tabla, agregarlo
+    flush_pending(pending_space)
+    
+    yield from elements
+
+# Encabezados de nivel 1 a 4 ('# ' ... '#### ')
+HEADING_RE = re.compile(r'(#{1,4}) ')
+
+def scan_markdown_blocks(lines):
+    """
+    Recorre las líneas una sola vez y produce bloques tipados:
+    ('heading', (nivel, texto)), ('list_item', texto), ('table', líneas),
+    ('code', líneas), ('rule', None), ('blank', None), ('paragraph', línea).
+    Acepta cualquier iterable de líneas (por ejemplo un archivo abierto).
+    """
+    code_lines = None  # None = fuera de un bloque de código
     table_lines = []
-    in_table = False
-    pending_title = None  # Para agrupar título con tabla
     
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    for line in lines:
+        line = line.rstrip('\r\n')
+        stripped = line.strip()
         
         # Manejar bloques de código
-        if line.strip().startswith('```'):
-            if in_code_block:
-                # Cerrar bloque de código
-                if code_block_lines:
-                    code_text = '\n'.join(code_block_lines)
-                    elements.append(Paragraph(f'<font face="Courier" size="9">{escape_html(code_text)}</font>', code_style))
-                    elements.append(Spacer(1, 6))
-                code_block_lines = []
-                in_code_block = False
+        if stripped.startswith('```'):
+            if code_lines is not None:
+                yield 'code', code_lines
+                code_lines = None
             else:
-                # Cerrar tabla si estaba abierta
-                if in_table:
-                    table = parse_table('\n'.join(table_lines))
-                    if table:
-                        # Si hay un título pendiente, agruparlo con la tabla
-                        if pending_title:
-                            elements.append(KeepTogether([pending_title, Spacer(1, 4), table]))
-                            pending_title = None
-                        else:
-                            elements.append(KeepTogether(table))
-                        elements.append(Spacer(1, 12))
+                if table_lines:
+                    yield 'table', table_lines
                     table_lines = []
-                    in_table = False
-                # Abrir bloque de código
-                in_code_block = True
-            i += 1
+                code_lines = []
             continue
         
-        if in_code_block:
-            code_block_lines.append(line)
-            i += 1
+        if code_lines is not None:
+            code_lines.append(line)
             continue
         
         # Detectar tablas (línea que contiene |)
-        if '|' in line and not line.strip().startswith('#'):
-            if not in_table:
-                in_table = True
+        if '|' in line and not stripped.startswith('#'):
             table_lines.append(line)
-            i += 1
             continue
-        else:
-            # Si estábamos en una tabla, procesarla
-            if in_table:
-                table = parse_table('\n'.join(table_lines))
-                if table:
-                    # Si hay un título pendiente, agruparlo con la tabla usando KeepTogether
-                    if pending_title:
-                        # Crear grupo con título y tabla para mantenerlos juntos
-                        group = KeepTogether([
-                            pending_title,
-                            Spacer(1, 4),
-                            table
-                        ])
-                        elements.append(group)
-                        pending_title = None
-                    else:
-                        elements.append(KeepTogether(table))
-                    elements.append(Spacer(1, 12))
-                table_lines = []
-                in_table = False
+        if table_lines:
+            yield 'table', table_lines
+            table_lines = []
         
-        # Saltar líneas vacías
-        if not line.strip():
-            # Si hay un título pendiente y viene una línea vacía, podría ser antes de una tabla
-            # Verificar si la siguiente línea no vacía es una tabla
-            if pending_title and i + 1 < len(lines):
-                next_non_empty = None
-                for j in range(i + 1, len(lines)):
-                    if lines[j].strip():
-                        next_non_empty = lines[j].strip()
-                        break
-                # Si la siguiente línea es una tabla, no agregar el título aún
-                if next_non_empty and '|' in next_non_empty:
-                    i += 1
-                    continue
-            
-            if elements and not isinstance(elements[-1], Spacer) and not pending_title:
-                elements.append(Spacer(1, 6))
-            i += 1
+        if not stripped:
+            yield 'blank', None
             continue
         
-        # Encabezados
-        if line.startswith('# '):
-            text = line[2:].strip()
-            # Saltar el título principal "Informe Fase 2" ya que se agrega manualmente
-            if 'Informe Fase 2' in text:
-                i += 1
-                continue
-            # Verificar si la siguiente línea no vacía es una tabla
-            next_is_table = False
-            for j in range(i + 1, len(lines)):
-                next_line = lines[j].strip()
-                if not next_line:
-                    continue
-                if '|' in next_line and not next_line.startswith('#'):
-                    next_is_table = True
-                break
-            
-            title_para = Paragraph(escape_html(text), title_style)
-            if next_is_table:
-                pending_title = title_para
-            else:
-                elements.append(title_para)
-                elements.append(Spacer(1, 12))
-        elif line.startswith('## '):
-            text = line[3:].strip()
-            # Verificar si la siguiente línea no vacía es una tabla
-            next_is_table = False
-            for j in range(i + 1, len(lines)):
-                next_line = lines[j].strip()
-                if not next_line:
-                    continue
-                if '|' in next_line and not next_line.startswith('#'):
-                    next_is_table = True
-                break
-            
-            title_para = Paragraph(escape_html(text), heading1_style)
-            if next_is_table:
-                pending_title = title_para
-            else:
-                elements.append(title_para)
-                elements.append(Spacer(1, 8))
-        elif line.startswith('### '):
-            text = line[4:].strip()
-            # Verificar si la siguiente línea no vacía es una tabla
-            next_is_table = False
-            for j in range(i + 1, len(lines)):
-                next_line = lines[j].strip()
-                if not next_line:
-                    continue
-                if '|' in next_line and not next_line.startswith('#'):
-                    next_is_table = True
-                break
-            
-            title_para = Paragraph(escape_html(text), heading2_style)
-            if next_is_table:
-                pending_title = title_para
-            else:
-                elements.append(title_para)
-                elements.append(Spacer(1, 6))
-        elif line.startswith('#### '):
-            text = line[5:].strip()
-            # Verificar si la siguiente línea no vacía es una tabla
-            next_is_table = False
-            for j in range(i + 1, len(lines)):
-                next_line = lines[j].strip()
-                if not next_line:
-                    continue
-                if '|' in next_line and not next_line.startswith('#'):
-                    next_is_table = True
-                break
-            
-            title_para = Paragraph(escape_html(text), heading3_style)
-            if next_is_table:
-                pending_title = title_para
-            else:
-                elements.append(title_para)
-                elements.append(Spacer(1, 4))
-        # Listas
-        elif line.strip().startswith('- ') or line.strip().startswith('* '):
-            # Si hay título pendiente, agregarlo primero
-            if pending_title:
-                elements.append(pending_title)
-                elements.append(Spacer(1, 6))
-                pending_title = None
-            text = line.strip()[2:].strip()
-            para_text = f'• {process_markdown_inline(text)}'
-            elements.append(Paragraph(para_text, normal_style))
-            elements.append(Spacer(1, 4))
-        # Líneas horizontales
-        elif line.strip() == '---':
-            # Si hay título pendiente, agregarlo primero
-            if pending_title:
-                elements.append(pending_title)
-                elements.append(Spacer(1, 6))
-                pending_title = None
-            elements.append(Spacer(1, 12))
-        # Texto normal
+        heading = HEADING_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            yield 'heading', (level, line[level + 1:].strip())
+        elif stripped.startswith('- ') or stripped.startswith('* '):
+            yield 'list_item', stripped[2:].strip()
+        elif stripped == '---':
+            yield 'rule', None
         else:
-            # Si hay título pendiente, agregarlo primero
-            if pending_title:
-                elements.append(pending_title)
-                elements.append(Spacer(1, 6))
-                pending_title = None
-            para_text = process_markdown_inline(line)
-            if para_text.strip():
-                elements.append(Paragraph(para_text, normal_style))
-                elements.append(Spacer(1, 6))
-        
-        i += 1
-    
-    # Procesar tabla al final si quedó abierta
-    if in_table and table_lines:
-        table = parse_table('\n'.join(table_lines))
-        if table:
-            # Si hay un título pendiente, agruparlo con la tabla usando KeepTogether
-            if pending_title:
-                # Crear grupo con título y tabla para mantenerlos juntos
-                group = KeepTogether([
-                    pending_title,
-                    Spacer(1, 4),
-                    table
-                ])
-                elements.append(group)
-                pending_title = None
-            else:
-                elements.append(KeepTogether(table))
-            elements.append(Spacer(1, 12))
+            yield 'paragraph', line
     
-    # Si queda un título pendiente sin tabla, agregarlo
-    if pending_title:
-        elements.append(pending_title)
-        elements.append(Spacer(1, 8))
-    
-    return elements
+    # Tabla al final si quedó abierta (un bloque de código sin cerrar se descarta)
+    if table_lines:
+        yield 'table', table_lines
+
+# Elementos inline en una sola expresión (se compila una vez). Los
+# guiones bajos solo cuentan en el borde de una palabra, así que
+# identificadores como es_core_news_sm quedan intactos. La cursiva con
+# asteriscos puede contener negritas completas (*a **b** c*): un '*'
+# seguido de otro no la cierra.
+INLINE_RE = re.compile(
+    r'`(?P<code>[^`]+)`'
+    r'|\*\*(?P<bold>.+?)\*\*'
+    r'|(?<!\w)__(?P<bold_u>.+?)__(?!\w)'
+    r'|\*(?P<italic>(?:\*\*.+?\*\*|[^*])+?)\*(?!\*)'
+    r'|(?<!\w)_(?P<italic_u>.+?)_(?!\w)'
+)
+
+HTML_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
 
 def process_markdown_inline(text):
     """Procesa elementos inline de markdown como bold, italic, code"""
-    text = escape_html(text)
-    
-    # Negrita **texto** o __texto__
-    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'__(.+?)__', r'<b>\1</b>', text)
-    
-    # Cursiva *texto* o _texto_
-    text = re.sub(r'\*(.+?)\*', r'<i>\1</i>', text)
-    text = re.sub(r'_(.+?)_', r'<i>\1</i>', text)
-    
-    # Código inline `código`
-    text = re.sub(r'`(.+?)`', r'<font face="Courier" size="9">\1</font>', text)
-    
-    return text
+    parts = []
+    last = 0
+    for match in INLINE_RE.finditer(text):
+        parts.append(text[last:match.start()].translate(HTML_ESCAPES))
+        kind = match.lastgroup
+        content = match.group(kind)
+        if kind == 'code':
+            # El contenido del código no se interpreta
+            parts.append(f'<font face="Courier" size="9">{content.translate(HTML_ESCAPES)}</font>')
+        elif kind in ('bold', 'bold_u'):
+            parts.append(f'<b>{process_markdown_inline(content)}</b>')
+        else:
+            parts.append(f'<i>{process_markdown_inline(content)}</i>')
+        last = match.end()
+    parts.append(text[last:].translate(HTML_ESCAPES))
+    return ''.join(parts)
 
 def escape_html(text):
     """Escapa caracteres HTML especiales"""
-    text = text.replace('&', '&amp;')
-    text = text.replace('<', '&lt;')
-    text = text.replace('>', '&gt;')
-    return text
+    return text.translate(HTML_ESCAPES)
+
+# ========== ANCHOS DE COLUMNA ==========
+# Ancho útil de la página: carta menos márgenes de una pulgada
+PAGE_MARGIN = 72
+FRAME_WIDTH = letter[0] - 2 * PAGE_MARGIN
+
+# Relleno horizontal de cada celda (LEFTPADDING + RIGHTPADDING del estilo)
+CELL_PADDING = 12
+
+# Fuente según (negrita, código) dentro de una celda
+CELL_FONTS = {
+    (False, False): 'Helvetica',
+    (True, False): 'Helvetica-Bold',
+    (False, True): 'Courier',
+    (True, True): 'Courier-Bold',
+}
+
+INLINE_TAG_RE = re.compile(r'(<[^>]+>)')
+SPACES_RE = re.compile(r'(\s+)')
+
+def measure_inline(html_text, font_name, font_size):
+    """
+    Mide un texto ya procesado por process_markdown_inline.
+    Devuelve (ancho en una sola línea, ancho de la palabra más larga),
+    respetando <b> y <font face="Courier">.
+    """
+    bold = font_name.endswith('-Bold')
+    code = False
+    total = longest = word = 0
+    for part in INLINE_TAG_RE.split(html_text):
+        if part.startswith('<'):
+            tag = part.lower()
+            if tag == '<b>':
+                bold = True
+            elif tag == '</b>':
+                bold = False
+            elif tag.startswith('<font face="courier"'):
+                code = True
+            elif tag == '</font>':
+                code = False
+            continue
+        font = CELL_FONTS[(bold, code)]
+        for piece in SPACES_RE.split(html.unescape(part)):
+            if not piece:
+                continue
+            width = pdfmetrics.stringWidth(piece, font, font_size)
+            total += width
+            if piece.isspace():
+                longest = max(longest, word)
+                word = 0
+            else:
+                word += width  # una palabra puede cruzar etiquetas (**ACEPTADA**)
+    return total, max(longest, word)
+
+def compute_col_widths(natural, minimum, available_width=FRAME_WIDTH):
+    """
+    Anchos de columna a partir del ancho natural (todo en una línea) y
+    mínimo (palabra más larga) de cada columna, ya con relleno.
+    Si todo entra, el sobrante se reparte en proporción al contenido;
+    si no, cada columna recibe su mínimo más una parte del resto según
+    cuánto le falta para su ancho natural.
+    """
+    total_natural = sum(natural)
+    if not total_natural:
+        return [available_width / len(natural)] * len(natural)
+    if total_natural <= available_width:
+        return [width * available_width / total_natural for width in natural]
+    
+    total_minimum = sum(minimum)
+    if total_minimum >= available_width:
+        # Ni las palabras más largas entran: se achica todo por igual
+        return [width * available_width / total_minimum for width in minimum]
+    
+    extra = available_width - total_minimum
+    wanted = [n - m for n, m in zip(natural, minimum)]
+    total_wanted = sum(wanted)
+    return [m + extra * w / total_wanted for m, w in zip(minimum, wanted)]
 
 def parse_table(text):
     """Parsea una tabla markdown a formato Table de ReportLab"""
@@ -378,33 +549,25 @@ def parse_table(text):
     
     num_cols = len(header_cells)
     
-    # Crear estilo para encabezados
-    header_style = ParagraphStyle(
-        'TableHeader',
-        fontSize=10,
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT,
-        textColor=colors.HexColor('#000000'),
-        spaceBefore=0,
-        spaceAfter=0
-    )
+    styles = get_styles()
+    header_style = styles['table_header']
+    cell_style = styles['table_cell']
     
-    # Crear estilo para celdas de datos
-    cell_style = ParagraphStyle(
-        'TableCell',
-        fontSize=9,
-        fontName='Helvetica',
-        alignment=TA_LEFT,
-        textColor=colors.HexColor('#000000'),
-        spaceBefore=0,
-        spaceAfter=0
-    )
+    # Ancho natural y mínimo de cada columna, medidos al armar las celdas
+    natural = [0] * num_cols
+    minimum = [0] * num_cols
+    
+    def measure(col, cell_html, style):
+        width, longest = measure_inline(cell_html, style.fontName, style.fontSize)
+        natural[col] = max(natural[col], width + CELL_PADDING)
+        minimum[col] = max(minimum[col], longest + CELL_PADDING)
     
     # Crear encabezados en negrita
     header_paragraphs = []
-    for cell_text in header_cells:
-        processed_text = process_markdown_inline(cell_text)
-        header_paragraphs.append(Paragraph(f'<b>{processed_text}</b>', header_style))
+    for i, cell_text in enumerate(header_cells):
+        processed_text = f'<b>{process_markdown_inline(cell_text)}</b>'
+        measure(i, processed_text, header_style)
+        header_paragraphs.append(Paragraph(processed_text, header_style))
     
     # Crear filas de datos
     table_data = [header_paragraphs]
@@ -413,6 +576,7 @@ def parse_table(text):
         for i, cell_text in enumerate(row):
             if i < num_cols:
                 processed_text = process_markdown_inline(cell_text)
+                measure(i, processed_text, cell_style)
                 row_paragraphs.append(Paragraph(processed_text, cell_style))
             else:
                 row_paragraphs.append(Paragraph('', cell_style))
@@ -421,117 +585,150 @@ def parse_table(text):
             row_paragraphs.append(Paragraph('', cell_style))
         table_data.append(row_paragraphs)
     
-    # Calcular ancho de columnas de manera más inteligente
-    # Ancho total disponible: 7.5 pulgadas (8.5 - 2 márgenes de 0.5)
-    total_width = 7.5 * inch
-    if num_cols == 2:
-        col_widths = [4.5*inch, 3.0*inch]
-    elif num_cols == 3:
-        col_widths = [2.8*inch, 2.5*inch, 2.2*inch]
-    elif num_cols == 4:
-        col_widths = [2.0*inch, 2.0*inch, 2.0*inch, 1.5*inch]
-    elif num_cols == 5:
-        col_widths = [1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch]
-    else:
-        col_width = total_width / num_cols
-        col_widths = [col_width] * num_cols
+    # Anchos según el contenido, sin pasarse del ancho útil de la página
+    col_widths = compute_col_widths(natural, minimum)
     
     table = Table(table_data, colWidths=col_widths, repeatRows=1)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D0D0D0')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('TOPPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFFFF')),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#000000')),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#808080')),
-        ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#000000')),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#FFFFFF'), colors.HexColor('#F8F8F8')]),
-    ]))
+    table.setStyle(get_table_style())
     
     return table
 
-def generate_pdf():
-    """Genera el PDF académico del proyecto"""
-    
-    # Leer el README.md
-    with open('README.md', 'r', encoding='utf-8') as f:
-        readme_content = f.read()
-    
-    # Separar la parte del informe (después del separador ---)
-    parts = readme_content.split('---')
-    intro_content = parts[0] if len(parts) > 0 else ''
-    # Tomar todo después del primer separador ---
-    if len(parts) > 1:
-        informe_content = '\n'.join(parts[1:])
-    else:
-        # Si no hay separador, usar todo el contenido desde la línea que dice "Informe Fase 2"
-        lines = readme_content.split('\n')
-        start_idx = 0
-        for i, line in enumerate(lines):
-            if 'Informe Fase 2' in line:
-                start_idx = i + 1  # Saltar la línea del título
-                break
-        informe_content = '\n'.join(lines[start_idx:])
-    
-    # Eliminar el título "Informe Fase 2" del contenido si está al inicio
-    informe_lines = informe_content.split('\n')
-    # Buscar y eliminar el título principal (línea que empiece con # y contenga "Informe Fase 2")
-    if informe_lines:
-        for i, line in enumerate(informe_lines):
-            # Si la línea es un título (# ) y contiene "Informe Fase 2"
-            stripped_line = line.strip()
-            if stripped_line.startswith('# ') and 'Informe Fase 2' in stripped_line:
-                # Eliminar esta línea y las líneas vacías siguientes
-                informe_lines = informe_lines[i+1:]
-                # Eliminar líneas vacías después del título
-                while informe_lines and not informe_lines[0].strip():
-                    informe_lines = informe_lines[1:]
-                break
-    informe_content = '\n'.join(informe_lines)
-    
-    # Crear el documento PDF
-    doc = SimpleDocTemplate(
-        "Proyecto Fase 2.pdf",
-        pagesize=letter,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=72
-    )
+# ========== CACHÉ DE IMÁGENES ==========
+# (ruta absoluta, mtime, ancho máx., alto máx.) -> (bytes, ancho, alto)
+_IMAGE_CACHE = {}
+
+# Resolución con la que se guardan las imágenes reducidas
+IMAGE_DPI = 300
+
+def load_image_asset(path, max_width, max_height):
+    """
+    Decodifica una imagen una sola vez por proceso: calcula el tamaño
+    de dibujo manteniendo el aspecto, la reduce a IMAGE_DPI para ese
+    tamaño y la guarda comprimida en memoria.
+    Devuelve (bytes, ancho, alto) con el tamaño de dibujo en puntos.
+    """
+    key = (os.path.abspath(path), os.path.getmtime(path), max_width, max_height)
+    asset = _IMAGE_CACHE.get(key)
+    if asset is None:
+        with PILImage.open(path) as img:
+            ratio = min(max_width / img.width, max_height / img.height)
+            width = img.width * ratio
+            height = img.height * ratio
+            
+            pixels = (max(1, round(width / 72 * IMAGE_DPI)), max(1, round(height / 72 * IMAGE_DPI)))
+            if pixels[0] < img.width:
+                img = img.resize(pixels, PILImage.LANCZOS)
+            
+            buffer = BytesIO()
+            # JPEG se incrusta tal cual en el PDF; PNG solo si hay transparencia
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img.save(buffer, 'PNG', optimize=True)
+            else:
+                img.convert('RGB').save(buffer, 'JPEG', quality=90, optimize=True)
+        asset = (buffer.getvalue(), width, height)
+        _IMAGE_CACHE[key] = asset
+    return asset
+
+def load_image(path, max_width, max_height):
+    """Flowable Image a partir de la caché (sin volver a leer el archivo)"""
+    data, width, height = load_image_asset(path, max_width, max_height)
+    return Image(BytesIO(data), width=width, height=height)
+
+# ========== METADATOS DE LA PORTADA ==========
+DEFAULT_METADATA = {
+    'universidad': 'Universidad Centroamericana José Simeón Cañas',
+    'curso': 'Teoría de lenguajes de programación',
+    'catedratico': 'Jaime Clímaco',
+    'tema': 'Mini-parser para Lenguaje Natural Limitado',
+    'titulo': 'Informe Fase 2 - Mini-parser para Lenguaje Natural Limitado',
+    'integrantes': [
+        ['Andres Felipe Cardona Duarte', '00037820'],
+        ['Axel Jared Hernández Servellón', '00145319'],
+        ['Moises Ezequiel Juárez Mejía', '00038221'],
+        ['Josue Alfredo Mejia Urias', '00000921'],
+    ],
+    'logo': 'logo_uca.jpg',
+}
+
+def load_metadata(input_path):
+    """
+    Datos de la portada para un markdown: DEFAULT_METADATA combinado con
+    el JSON del mismo nombre si existe (informe.md -> informe.json).
+    """
+    metadata = dict(DEFAULT_METADATA)
+    sidecar = os.path.splitext(input_path)[0] + '.json'
+    if os.path.exists(sidecar):
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            metadata.update(json.load(f))
+    return metadata
+
+class FlowableStream(list):
+    """
+    Lista de flowables que se rellena desde un iterador a medida que
+    doc.build la consume. build solo usa len(), [0], del e insert,
+    así que alcanza con reponer elementos cada vez que pregunta el
+    largo; nunca hay más de `buffer_size` flowables pendientes.
+    """
+    def __init__(self, iterable, buffer_size=64):
+        super().__init__()
+        self._source = iter(iterable)
+        self._buffer_size = buffer_size
     
-    # Lista de elementos para el PDF
+    def __len__(self):
+        while self._source is not None and list.__len__(self) < self._buffer_size:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return list.__len__(self)
+
+def find_report_start(lines):
+    """
+    Número de la línea donde empieza el informe, después del primer
+    separador --- o, si no hay, después de la línea que dice
+    "Informe Fase 2". Solo recorre las líneas (no las guarda).
+    """
+    title_start = None
+    for number, line in enumerate(lines):
+        if line.strip() == '---':
+            return number + 1
+        if title_start is None and 'Informe Fase 2' in line:
+            title_start = number + 1
+    return title_start or 0
+
+def skip_report_title(lines):
+    """Salta el título "Informe Fase 2" y las líneas vacías del principio"""
+    lines = iter(lines)
+    for line in lines:
+        stripped_line = line.strip()
+        if stripped_line and not (stripped_line.startswith('# ') and 'Informe Fase 2' in stripped_line):
+            yield line
+            break
+    yield from lines
+
+def iter_report_lines(input_path):
+    """
+    Líneas del informe leídas de a una: salta la introducción y el
+    título "Informe Fase 2" con las líneas vacías que lo siguen.
+    """
+    # Primera pasada para ubicar el inicio, segunda para leerlo
+    with open(input_path, 'r', encoding='utf-8') as f:
+        start = find_report_start(f)
+    with open(input_path, 'r', encoding='utf-8') as f:
+        yield from skip_report_title(itertools.islice(f, start, None))
+
+def build_cover(metadata):
+    """Elementos de la portada y del título de la segunda página"""
     story = []
-    styles = getSampleStyleSheet()
+    styles = get_styles()
     
     # ========== PORTADA ==========
     # Logo de la UCA
-    logo_path = 'logo_uca.jpg'
-    if os.path.exists(logo_path):
+    logo_path = metadata['logo']
+    if logo_path and os.path.exists(logo_path):
         try:
-            # Leer imagen y redimensionar
-            img = PILImage.open(logo_path)
-            # Calcular dimensiones manteniendo aspecto (más pequeño para que quepa todo)
-            max_width = 1.2 * inch
-            max_height = 1.5 * inch
-            width_ratio = max_width / img.width
-            height_ratio = max_height / img.height
-            ratio = min(width_ratio, height_ratio)
-            
-            new_width = img.width * ratio
-            new_height = img.height * ratio
-            
-            logo = Image(logo_path, width=new_width, height=new_height)
+            # Imagen ya decodificada y reducida (más pequeña para que quepa todo)
+            logo = load_image(logo_path, 1.2 * inch, 1.5 * inch)
             story.append(Spacer(1, 1.2*inch))
             story.append(logo)
             story.append(Spacer(1, 0.3*inch))
@@ -542,78 +739,31 @@ def generate_pdf():
         story.append(Spacer(1, 1.5*inch))
     
     # Título de la universidad
-    title_style = ParagraphStyle(
-        'UniversityTitle',
-        parent=styles['Heading1'],
-        fontSize=15,
-        textColor=colors.HexColor('#000000'),
-        spaceAfter=15,
-        fontName='Helvetica-Bold',
-        alignment=TA_CENTER
-    )
+    title_style = styles['university_title']
     
-    story.append(Paragraph('Universidad Centroamericana José Simeón Cañas', title_style))
+    story.append(Paragraph(escape_html(metadata['universidad']), title_style))
     story.append(Spacer(1, 0.4*inch))
     
     # Nombre del curso
-    course_style = ParagraphStyle(
-        'CourseStyle',
-        parent=styles['Heading2'],
-        fontSize=11,
-        textColor=colors.HexColor('#000000'),
-        spaceAfter=8,
-        fontName='Helvetica',
-        alignment=TA_CENTER
-    )
+    course_style = styles['course']
     
-    story.append(Paragraph('Teoría de lenguajes de programación<br/>Catedrático: Jaime Clímaco', course_style))
+    story.append(Paragraph(
+        f"{escape_html(metadata['curso'])}<br/>Catedrático: {escape_html(metadata['catedratico'])}",
+        course_style
+    ))
     story.append(Spacer(1, 0.4*inch))
     
     # Tema del proyecto
-    theme_style = ParagraphStyle(
-        'ThemeStyle',
-        parent=styles['Heading1'],
-        fontSize=13,
-        textColor=colors.HexColor('#000000'),
-        spaceAfter=20,
-        fontName='Helvetica-Bold',
-        alignment=TA_CENTER
-    )
+    theme_style = styles['theme']
     
-    story.append(Paragraph('Mini-parser para Lenguaje Natural Limitado', theme_style))
+    story.append(Paragraph(escape_html(metadata['tema']), theme_style))
     story.append(Spacer(1, 0.4*inch))
     
     # Integrantes - Usar KeepTogether para evitar que se parta
-    integrantes_data = [
-        ['Integrante', 'Carné'],
-        ['Andres Felipe Cardona Duarte', '00037820'],
-        ['Axel Jared Hernández Servellón', '00145319'],
-        ['Moises Ezequiel Juárez Mejía', '00038221'],
-        ['Josue Alfredo Mejia Urias', '00000921'],
-    ]
+    integrantes_data = [['Integrante', 'Carné']] + [list(fila) for fila in metadata['integrantes']]
     
     integrantes_table = Table(integrantes_data, colWidths=[4*inch, 1.5*inch])
-    integrantes_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D0D0D0')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#000000')),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('TOPPADDING', (0, 0), (-1, 0), 10),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#FFFFFF')),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#000000')),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#808080')),
-        ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#000000')),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 1), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#FFFFFF'), colors.HexColor('#F8F8F8')]),
-    ]))
+    integrantes_table.setStyle(get_cover_table_style())
     
     # Envolver la tabla en KeepTogether para evitar que se parta
     story.append(KeepTogether(integrantes_table))
@@ -621,28 +771,256 @@ def generate_pdf():
     
     # ========== SEGUNDA PÁGINA - TÍTULO DEL INFORME ==========
     # Título del proyecto en la segunda página
-    project_title_style = ParagraphStyle(
-        'ProjectTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#000000'),
-        spaceAfter=20,
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    )
+    project_title_style = styles['project_title']
     
-    story.append(Paragraph('Informe Fase 2 - Mini-parser para Lenguaje Natural Limitado', project_title_style))
+    story.append(Paragraph(escape_html(metadata['titulo']), project_title_style))
     story.append(Spacer(1, 0.5*inch))
+    return story
+
+# ========== RECONSTRUCCIÓN INCREMENTAL ==========
+# Se evita regenerar el PDF completo si no cambió ninguna entrada (ver
+# build_manifest). Dentro de una corrida no se guarda nada: separar el
+# markdown en bloques es lineal y barato, y los flowables no se pueden
+# compartir entre documentos porque ReportLab los anota en doc.build.
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def build_manifest(input_path, metadata):
+    """
+    Huellas de todo lo que influye en el PDF: markdown, datos de la
+    portada, imágenes, este script (estilos incluidos) y ReportLab.
+    """
+    logo = metadata.get('logo')
+    metadata_json = json.dumps(metadata, sort_keys=True, ensure_ascii=False)
+    return {
+        'markdown': _file_digest(input_path),
+        'metadatos': hashlib.sha256(metadata_json.encode('utf-8')).hexdigest(),
+        'imagenes': {logo: _file_digest(logo)} if logo and os.path.exists(logo) else {},
+        'script': _file_digest(os.path.abspath(__file__)),
+        'reportlab': reportlab.Version,
+    }
+
+def manifest_path(output_path):
+    """Manifiesto oculto junto al PDF: .<nombre>.pdf.json"""
+    folder, name = os.path.split(output_path)
+    return os.path.join(folder, f'.{name}.json')
+
+def is_up_to_date(output_path, manifest):
+    """True si el PDF existe y se generó a partir de las mismas entradas"""
+    if not os.path.exists(output_path):
+        return False
+    try:
+        with open(manifest_path(output_path), 'r', encoding='utf-8') as f:
+            return json.load(f) == manifest
+    except (OSError, ValueError):
+        return False
+
+def write_manifest(output_path, manifest):
+    with open(manifest_path(output_path), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+def create_document(output_path):
+    """Documento carta con márgenes de una pulgada"""
+    return SimpleDocTemplate(
+        output_path,
+        pagesize=letter,
+        rightMargin=PAGE_MARGIN,
+        leftMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN
+    )
+
+def generate_pdf(input_path='README.md', output_path='Proyecto Fase 2.pdf', metadata=None,
+                 streaming=False, force=False):
+    """
+    Genera el PDF académico del proyecto.
+    `metadata` reemplaza los datos de la portada (ver DEFAULT_METADATA);
+    si es None se buscan junto al markdown (ver load_metadata).
+    Con `streaming` el markdown se lee línea por línea y los flowables
+    se generan a medida que el documento los consume, para informes
+    muy grandes.
+    Si las entradas no cambiaron desde la última vez (ver build_manifest)
+    no se vuelve a generar, salvo con `force`.
+    """
+    if metadata is None:
+        metadata = load_metadata(input_path)
+    else:
+        metadata = {**DEFAULT_METADATA, **metadata}
     
-    # ========== CONTENIDO DEL INFORME ==========
-    # Procesar el contenido del informe
-    elements = parse_markdown_to_elements(informe_content)
-    story.extend(elements)
+    manifest = build_manifest(input_path, metadata)
+    if not force and is_up_to_date(output_path, manifest):
+        print(f"PDF sin cambios: {output_path}")
+        return output_path
+    
+    render_document(output_path, iter_report_lines(input_path), metadata, streaming, informe=True)
+    write_manifest(output_path, manifest)
+    print(f"PDF generado exitosamente: {output_path}")
+    return output_path
+
+def render_document(output, lines, metadata=None, streaming=False, informe=False):
+    """
+    Arma el PDF en `output` (ruta o archivo binario abierto) a partir de
+    las líneas del markdown. Con `metadata` se agrega la portada y con
+    `informe` se omiten los títulos "Informe Fase 2" del markdown.
+    Cada llamada arma sus propios flowables, así que se puede usar desde
+    varios hilos a la vez.
+    """
+    doc = create_document(output)
+    story = itertools.chain(
+        build_cover(metadata) if metadata is not None else [],
+        # ========== CONTENIDO DEL INFORME ==========
+        iter_markdown_elements(lines, informe),
+    )
     
     # Construir el PDF
-    doc.build(story)
-    print("PDF generado exitosamente: Proyecto Fase 2.pdf")
+    if streaming:
+        doc.build(FlowableStream(story))
+    else:
+        doc.build(list(story))
+
+# ========== API DE BIBLIOTECA ==========
+CONVERT_OPTIONS = {
+    'portada': True,      # agregar portada y título (ver DEFAULT_METADATA)
+    'metadatos': {},      # datos de la portada; reemplazan a DEFAULT_METADATA
+    'informe': False,     # saltar la introducción hasta --- y los títulos "Informe Fase 2"
+    'streaming': False,   # armar el documento por partes (ver FlowableStream)
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def convertir(markdown, salida=None, opciones=None):
+    """
+    Convierte markdown a PDF en memoria, sin archivos temporales ni
+    rutas relativas al directorio de trabajo.
+    `markdown` es un texto o un archivo de texto abierto; `salida` puede
+    ser una ruta, un archivo binario (por ejemplo BytesIO) o None.
+    `opciones` ajusta CONVERT_OPTIONS. Devuelve los bytes del PDF.
+    """
+    opciones = {**CONVERT_OPTIONS, **(opciones or {})}
+    lines = markdown.split('\n') if isinstance(markdown, str) else markdown
+    if opciones['informe']:
+        lines = list(lines)  # hacen falta dos pasadas
+        lines = skip_report_title(itertools.islice(lines, find_report_start(lines), None))
+    
+    metadata = None
+    if opciones['portada']:
+        metadata = {**DEFAULT_METADATA, **opciones['metadatos']}
+        # El logo predeterminado se busca junto al script, no en el cwd
+        logo = metadata['logo']
+        if logo and not os.path.isabs(logo) and not os.path.exists(logo):
+            metadata['logo'] = os.path.join(BASE_DIR, logo)
+    
+    buffer = BytesIO()
+    render_document(buffer, lines, metadata, opciones['streaming'], opciones['informe'])
+    data = buffer.getvalue()
+    if isinstance(salida, (str, os.PathLike)):
+        with open(salida, 'wb') as f:
+            f.write(data)
+    elif salida is not None:
+        salida.write(data)
+    return data
+
+def _entry_path(entry):
+    return entry[0] if isinstance(entry, (tuple, list)) else entry
+
+def output_paths(input_paths, output_dir):
+    """
+    PDF de salida de cada markdown del lote: se conserva la ruta relativa
+    a la carpeta común de las entradas (grupo1/informe.md ->
+    salida/grupo1/informe.pdf), así dos archivos con el mismo nombre en
+    carpetas distintas no se pisan. Si aun así dos entradas dan la misma
+    salida (el mismo markdown repetido) se lanza ValueError.
+    """
+    absolute = [os.path.abspath(path) for path in input_paths]
+    if not absolute:
+        return []
+    base = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    outputs = []
+    seen = {}
+    for path, input_path in zip(absolute, input_paths):
+        relative = os.path.splitext(os.path.relpath(path, base))[0] + '.pdf'
+        output = os.path.join(output_dir, relative)
+        if output in seen:
+            raise ValueError(f"{input_path} y {seen[output]} generarían el mismo PDF: {output}")
+        seen[output] = input_path
+        outputs.append(output)
+    return outputs
+
+def _render_entry(entry, output_path, streaming=False, force=False):
+    """Trabajo de un proceso del lote: genera un PDF"""
+    input_path, metadata = entry if isinstance(entry, (tuple, list)) else (entry, None)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    return generate_pdf(input_path, output_path, metadata, streaming, force)
+
+def generar_lote(entradas, salida_dir, workers=None, streaming=False, force=False):
+    """
+    Genera un PDF por entrada en paralelo (un proceso por documento).
+    Cada entrada es la ruta de un markdown o una tupla (ruta, metadatos).
+    Los nombres de salida salen de output_paths. Devuelve las rutas de
+    los PDF generados, en el mismo orden.
+    """
+    outputs = output_paths([_entry_path(entry) for entry in entradas], salida_dir)
+    os.makedirs(salida_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(entradas) == 1:
+        return [_render_entry(entry, output, streaming, force)
+                for entry, output in zip(entradas, outputs)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_entry, entradas, outputs,
+                             [streaming] * len(entradas), [force] * len(entradas)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera PDF académicos a partir de markdown')
+    parser.add_argument('entradas', nargs='*', default=['README.md'], help='archivos markdown')
+    parser.add_argument('-o', '--salida', default='Proyecto Fase 2.pdf',
+                        help='PDF de salida (con una sola entrada)')
+    parser.add_argument('--salida-dir', help='directorio de salida para generar un lote')
+    parser.add_argument('--workers', type=int, default=None, help='procesos para el lote')
+    parser.add_argument('--metadatos', help='JSON con los datos de la portada (con una sola entrada)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='leer el markdown y armar el PDF por partes (informes muy grandes)')
+    parser.add_argument('--forzar', action='store_true',
+                        help='generar aunque las entradas no hayan cambiado')
+    parser.add_argument('--sin-portada', action='store_true', help='solo el contenido del markdown')
+    args = parser.parse_args(argv)
+    
+    if args.salida_dir or len(args.entradas) > 1:
+        generar_lote(args.entradas, args.salida_dir or '.', args.workers, args.streaming, args.forzar)
+        return 0
+    
+    metadata = None
+    if args.metadatos:
+        with open(args.metadatos, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    
+    # '-' lee de stdin / escribe en stdout (sin manifiesto ni archivos)
+    entrada = args.entradas[0]
+    if entrada == '-' or args.salida == '-' or args.sin_portada:
+        if metadata is None:
+            metadata = load_metadata(entrada) if entrada != '-' else {}
+        opciones = {
+            'portada': not args.sin_portada,
+            'metadatos': metadata,
+            'informe': True,
+            'streaming': args.streaming,
+        }
+        salida = sys.stdout.buffer if args.salida == '-' else args.salida
+        if entrada == '-':
+            convertir(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8'), salida, opciones)
+        else:
+            with open(entrada, 'r', encoding='utf-8') as f:
+                convertir(f, salida, opciones)
+        if args.salida != '-':
+            print(f"PDF generado exitosamente: {args.salida}")
+        return 0
+    
+    generate_pdf(args.entradas[0], args.salida, metadata, args.streaming, args.forzar)
+    return 0
 
 if __name__ == '__main__':
-    generate_pdf()
+    sys.exit(main())
 
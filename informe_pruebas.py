@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Informe PDF con los resultados de las pruebas de los parsers
+# ------------------------------------------------------------
+"""
+Convierte el JSONL que escribe `ejecutar_pruebas.py --resultados` en
+un PDF: tabla resumen por gramática (veredictos, fallas y percentiles
+de tiempo), una sección por cada caso fallido (tokens, error y árbol)
+y la tabla completa de resultados.
+
+El archivo se recorre varias veces en lugar de cargarlo en memoria y
+la tabla completa se parte en tablas de `filas_por_tabla` filas con
+el encabezado repetido en cada página, así que sirve para decenas de
+miles de casos.
+
+Uso:
+    python ejecutar_pruebas.py grande.jsonl --resultados resultados.jsonl
+    python informe_pruebas.py resultados.jsonl -o informe_pruebas.pdf
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import sys
+from array import array
+
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer, Table, KeepTogether
+
+from benchmarks import percentil
+from generar_pdf import (
+    DEFAULT_METADATA, FlowableStream, build_cover, create_document, escape_html,
+    get_styles, get_table_style,
+)
+
+TITULO_PREDETERMINADO = 'Informe de Pruebas de los Parsers'
+
+# Columnas de la tabla de resultados (suman el ancho útil de 6.5in)
+COLUMNAS_RESULTADOS = ['Caso', 'Gramática', 'Entrada', 'Resultado', 'Tiempo (us)']
+ANCHOS_RESULTADOS = [1.3 * inch, 0.8 * inch, 2.5 * inch, 0.9 * inch, 1.0 * inch]
+LARGO_MAXIMO_ENTRADA = 45
+
+COLUMNAS_RESUMEN = ['Gramática', 'Casos', 'Aceptadas', 'Rechazadas', 'Fallas',
+                    'p50 us', 'p90 us', 'p99 us', 'máx us']
+
+COLOR_FALLA = colors.HexColor('#B00000')
+
+
+def leer_resultados(ruta):
+    """Recorre el JSONL de resultados de a una línea"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            linea = linea.strip()
+            if linea:
+                yield json.loads(linea)
+
+
+def _nuevo_resumen():
+    return {'casos': 0, 'aceptadas': 0, 'rechazadas': 0, 'fallas': 0, 'duraciones': array('d')}
+
+
+def resumir(resultados):
+    """
+    Cuenta veredictos y fallas por gramática en una sola pasada.
+    Las duraciones se guardan en arrays compactos para los percentiles.
+    """
+    resumen = {}
+    for resultado in resultados:
+        grupo = resumen.setdefault(resultado['gramatica'], _nuevo_resumen())
+        grupo['casos'] += 1
+        grupo['aceptadas' if resultado['valido'] else 'rechazadas'] += 1
+        if resultado.get('fallas'):
+            grupo['fallas'] += 1
+        if 'duracion_us' in resultado:
+            grupo['duraciones'].append(resultado['duracion_us'])
+
+    total = _nuevo_resumen()
+    for grupo in resumen.values():
+        for clave in ('casos', 'aceptadas', 'rechazadas', 'fallas'):
+            total[clave] += grupo[clave]
+        total['duraciones'].extend(grupo['duraciones'])
+    for grupo in itertools.chain(resumen.values(), [total]):
+        grupo['duraciones'] = sorted(grupo['duraciones'])
+    resumen['total'] = total
+    return resumen
+
+
+def _tiempo(duraciones, p):
+    return f"{percentil(duraciones, p):.1f}" if duraciones else '-'
+
+
+def tabla_resumen(resumen):
+    """Tabla con una fila por gramática y el total al final"""
+    filas = [COLUMNAS_RESUMEN]
+    for gramatica, grupo in resumen.items():
+        d = grupo['duraciones']
+        filas.append([
+            gramatica, grupo['casos'], grupo['aceptadas'], grupo['rechazadas'], grupo['fallas'],
+            _tiempo(d, 50), _tiempo(d, 90), _tiempo(d, 99), f"{d[-1]:.1f}" if d else '-',
+        ])
+    tabla = Table(filas, colWidths=[0.9 * inch] + [0.7 * inch] * 8, repeatRows=1)
+    tabla.setStyle(get_table_style())
+    tabla.setStyle([('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')])
+    return tabla
+
+
+def _recortar(texto, largo=LARGO_MAXIMO_ENTRADA):
+    texto = ' '.join(texto.split())
+    return texto if len(texto) <= largo else texto[:largo - 3] + '...'
+
+
+def iter_tablas_resultados(resultados, filas_por_tabla=500):
+    """
+    Produce la tabla de resultados en partes de `filas_por_tabla` filas,
+    cada una con el encabezado repetido al pasar de página.
+    """
+    resultados = iter(resultados)
+    while True:
+        bloque = list(itertools.islice(resultados, filas_por_tabla))
+        if not bloque:
+            return
+        filas = [COLUMNAS_RESULTADOS]
+        estilo_fallas = []
+        for numero, resultado in enumerate(bloque, 1):
+            filas.append([
+                resultado.get('id', ''),
+                resultado['gramatica'],
+                _recortar(resultado['entrada']),
+                'ACEPTADA' if resultado['valido'] else 'ERROR',
+                f"{resultado['duracion_us']:.1f}" if 'duracion_us' in resultado else '-',
+            ])
+            if resultado.get('fallas'):
+                estilo_fallas.append(('TEXTCOLOR', (0, numero), (-1, numero), COLOR_FALLA))
+        tabla = Table(filas, colWidths=ANCHOS_RESULTADOS, repeatRows=1)
+        tabla.setStyle(get_table_style())
+        # Filas más bajas que en el informe para que entren más por página
+        tabla.setStyle([('TOPPADDING', (0, 1), (-1, -1), 2),
+                        ('BOTTOMPADDING', (0, 1), (-1, -1), 2)] + estilo_fallas)
+        yield tabla
+
+
+def tokens_de(gramatica, entrada):
+    """Tokens de una entrada como texto 'tipo(valor)' (para las secciones de fallas)"""
+    if gramatica == 'markdown':
+        return []
+    if gramatica != 'formal':
+        from parser_natural import tokenizar
+        return [f"{t.tipo}({t.valor})" for t in tokenizar(entrada)]
+
+    from parser import lexer
+    tokens = []
+    # El lexer imprime los caracteres ilegales; no deben salir en consola
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        lexer.input(entrada)
+        for tok in iter(lexer.token, None):
+            tokens.append(f"{tok.type}({tok.value})")
+    return tokens
+
+
+def seccion_falla(resultado):
+    """Elementos de la sección de un caso fallido"""
+    styles = get_styles()
+    normal = styles['normal']
+
+    def codigo(texto):
+        return Paragraph(f'<font face="Courier" size="9">{escape_html(texto)}</font>', styles['code'])
+
+    elementos = [
+        Paragraph(escape_html(f"{resultado.get('id', '')} ({resultado['gramatica']})"), styles['heading2']),
+        Paragraph('<b>Entrada:</b>', normal),
+        codigo(resultado['entrada']),
+        Paragraph(f"<b>Veredicto:</b> {'ACEPTADA' if resultado['valido'] else 'ERROR'}", normal),
+    ]
+    for falla in resultado.get('fallas', []):
+        elementos.append(Paragraph(f"• {escape_html(falla)}", normal))
+    if resultado.get('error'):
+        elementos.append(Paragraph(f"<b>Error:</b> {escape_html(resultado['error'])}", normal))
+    diagnostico = resultado.get('diagnostico')
+    if diagnostico:
+        elementos.append(Paragraph(
+            f"<b>Ubicación:</b> línea {diagnostico['linea']}, columna {diagnostico['columna']}", normal))
+    elementos.append(Paragraph('<b>Tokens:</b>', normal))
+    elementos.append(codigo(' '.join(tokens_de(resultado['gramatica'], resultado['entrada'])) or '(ninguno)'))
+    if resultado.get('arbol') is not None:
+        elementos.append(Paragraph('<b>Árbol:</b>', normal))
+        elementos.append(codigo(json.dumps(resultado['arbol'], ensure_ascii=False)))
+    elementos.append(Spacer(1, 10))
+    return elementos
+
+
+def iter_informe(ruta, filas_por_tabla=500, max_detalles=200):
+    """Elementos del cuerpo del informe (resumen, fallas y resultados)"""
+    styles = get_styles()
+    resumen = resumir(leer_resultados(ruta))
+
+    yield Paragraph('1. Resumen', styles['heading1'])
+    yield KeepTogether(tabla_resumen(resumen))
+    yield Spacer(1, 12)
+
+    yield Paragraph('2. Casos fallidos', styles['heading1'])
+    fallidos = (r for r in leer_resultados(ruta) if r.get('fallas'))
+    for resultado in itertools.islice(fallidos, max_detalles):
+        yield KeepTogether(seccion_falla(resultado))
+    restantes = resumen['total']['fallas'] - max_detalles
+    if resumen['total']['fallas'] == 0:
+        yield Paragraph('Todos los casos dieron el resultado esperado.', styles['normal'])
+    elif restantes > 0:
+        yield Paragraph(f'... y {restantes} casos fallidos más (marcados en rojo en la tabla).',
+                        styles['normal'])
+    yield Spacer(1, 12)
+
+    yield Paragraph('3. Resultados por caso', styles['heading1'])
+    for tabla in iter_tablas_resultados(leer_resultados(ruta), filas_por_tabla):
+        yield tabla
+
+
+def generar_informe(ruta_resultados, salida='informe_pruebas.pdf', metadata=None,
+                    filas_por_tabla=500, max_detalles=200):
+    """Genera el PDF de resultados con la misma portada que generar_pdf.py"""
+    metadata = {**DEFAULT_METADATA, 'titulo': TITULO_PREDETERMINADO, **(metadata or {})}
+    doc = create_document(salida)
+    story = itertools.chain(build_cover(metadata),
+                            iter_informe(ruta_resultados, filas_por_tabla, max_detalles))
+    doc.build(FlowableStream(story))
+    print(f"PDF generado exitosamente: {salida}")
+    return salida
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un PDF con los resultados de las pruebas")
+    parser.add_argument('resultados', help="JSONL escrito por ejecutar_pruebas.py --resultados")
+    parser.add_argument('-o', '--salida', default='informe_pruebas.pdf')
+    parser.add_argument('--metadatos', help="JSON con los datos de la portada")
+    parser.add_argument('--filas-por-tabla', type=int, default=500)
+    parser.add_argument('--max-detalles', type=int, default=200,
+                        help="casos fallidos con sección propia")
+    args = parser.parse_args(argv)
+
+    metadata = None
+    if args.metadatos:
+        with open(args.metadatos, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    generar_informe(args.resultados, args.salida, metadata, args.filas_por_tabla, args.max_detalles)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# ------------------------------------------------------------
+# Instrumentación opcional para los parsers (Fase 1 y Fase 2)
+# Mide tiempos por fase con perf_counter_ns y lleva contadores
+# ------------------------------------------------------------
+import json
+import time
+from contextlib import contextmanager
+
+# Instrumentación activa. Mientras sea None los parsers siguen su
+# camino normal sin medir nada (un solo chequeo por llamada).
+actual = None
+
+
+class Instrumentacion:
+    """Acumula tiempos por fase, contadores y máximos de los parsers"""
+
+    def __init__(self):
+        self.tiempos_ns = {}    # fase -> nanosegundos acumulados
+        self.mediciones = {}    # fase -> cantidad de mediciones
+        self.contadores = {}    # nombre -> valor
+        self.maximos = {}       # nombre -> valor máximo observado
+
+    def sumar_tiempo(self, fase, nanosegundos):
+        """Acumula una medición de tiempo para una fase"""
+        self.tiempos_ns[fase] = self.tiempos_ns.get(fase, 0) + nanosegundos
+        self.mediciones[fase] = self.mediciones.get(fase, 0) + 1
+
+    def incrementar(self, nombre, cantidad=1):
+        """Incrementa un contador"""
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def registrar_maximo(self, nombre, valor):
+        """Guarda el valor si supera al máximo registrado"""
+        if valor > self.maximos.get(nombre, 0):
+            self.maximos[nombre] = valor
+
+    def medir(self, fase, funcion):
+        """Envuelve una función para medir el tiempo de cada llamada"""
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter_ns()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                self.sumar_tiempo(fase, time.perf_counter_ns() - inicio)
+        return envoltura
+
+    def reiniciar(self):
+        """Borra todas las mediciones"""
+        self.tiempos_ns.clear()
+        self.mediciones.clear()
+        self.contadores.clear()
+        self.maximos.clear()
+
+    def a_dict(self):
+        """Devuelve las mediciones como diccionario"""
+        return {
+            'tiempos_ns': dict(self.tiempos_ns),
+            'mediciones': dict(self.mediciones),
+            'contadores': dict(self.contadores),
+            'maximos': dict(self.maximos),
+        }
+
+    def a_json(self, indent=2):
+        """Exporta las mediciones en formato JSON"""
+        return json.dumps(self.a_dict(), indent=indent, ensure_ascii=False)
+
+    def a_prometheus(self, prefijo='tlp'):
+        """Exporta las mediciones en el formato de texto de Prometheus"""
+        lineas = []
+
+        lineas.append(f"# HELP {prefijo}_fase_duracion_ns_total Tiempo acumulado por fase en nanosegundos")
+        lineas.append(f"# TYPE {prefijo}_fase_duracion_ns_total counter")
+        for fase, valor in sorted(self.tiempos_ns.items()):
+            lineas.append(f'{prefijo}_fase_duracion_ns_total{{fase="{fase}"}} {valor}')
+
+        lineas.append(f"# HELP {prefijo}_fase_mediciones_total Cantidad de mediciones por fase")
+        lineas.append(f"# TYPE {prefijo}_fase_mediciones_total counter")
+        for fase, valor in sorted(self.mediciones.items()):
+            lineas.append(f'{prefijo}_fase_mediciones_total{{fase="{fase}"}} {valor}')
+
+        lineas.append(f"# HELP {prefijo}_eventos_total Contadores de los parsers")
+        lineas.append(f"# TYPE {prefijo}_eventos_total counter")
+        for nombre, valor in sorted(self.contadores.items()):
+            lineas.append(f'{prefijo}_eventos_total{{nombre="{nombre}"}} {valor}')
+
+        lineas.append(f"# HELP {prefijo}_maximo Valores máximos observados")
+        lineas.append(f"# TYPE {prefijo}_maximo gauge")
+        for nombre, valor in sorted(self.maximos.items()):
+            lineas.append(f'{prefijo}_maximo{{nombre="{nombre}"}} {valor}')
+
+        return '\n'.join(lineas) + '\n'
+
+
+def activar(instrumentacion=None):
+    """Activa la instrumentación global y la devuelve"""
+    global actual
+    actual = instrumentacion if instrumentacion is not None else Instrumentacion()
+    return actual
+
+
+def desactivar():
+    """Desactiva la instrumentación global"""
+    global actual
+    actual = None
+
+
+@contextmanager
+def instrumentar(instrumentacion=None):
+    """
+    Activa la instrumentación dentro de un bloque with.
+
+    Ejemplo:
+        with instrumentar() as instr:
+            miParser("int x = 5;$")
+        print(instr.a_prometheus())
+    """
+    global actual
+    anterior = actual
+    instr = activar(instrumentacion)
+    try:
+        yield instr
+    finally:
+        actual = anterior
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Tokens en memoria compartida para parsear con varios procesos
+# ------------------------------------------------------------
+"""
+Guarda un lote de oraciones y sus tokens en un solo bloque de
+`multiprocessing.shared_memory`, como arreglos planos: por cada token
+(id de tipo, inicio, longitud) dentro de su texto. Una etapa de
+procesos tokeniza y escribe los arreglos, otra los lee y parsea, y los
+resultados vuelven como registros de enteros (índices de token, o el
+código del error y los tokens que señala) en el mismo bloque. Entre
+procesos solo viajan el nombre del bloque y un rango de índices; no se
+serializan listas de Token ni diccionarios. Solo los árboles que no
+entran en un registro (complementos, coordinación, varios adjetivos)
+vuelven del worker como JSON compacto. El proceso principal arma cada
+resultado sin volver a tokenizar ni a parsear.
+
+Ejemplo:
+    resultados = analizar(["El perro come carne.", "perro perro"], workers=4)
+
+Uso:
+    python memoria_compartida.py --cantidad 200000 --workers 4   # compara con pickle
+"""
+
+import argparse
+import json
+import multiprocessing
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from diagnosticos import diagnostico
+from parser_natural import (
+    VOCABULARIO, ParseError, ParserNatural, Token, buscar_palabra, mensaje_error, tokenizar,
+)
+
+# Id de cada tipo de token (el índice en esta tupla)
+TIPOS = ('DESCONOCIDO',) + tuple(sorted(set(VOCABULARIO.values())))
+ID_TIPO = {tipo: i for i, tipo in enumerate(TIPOS)}
+
+# Hojas del árbol de ParserNatural: (componente, clave). Cada registro
+# de resultado guarda el índice del token de cada una (-1 si no está).
+CAMPOS_ARBOL = (
+    ('sujeto', 'determinante'),
+    ('sujeto', 'adjetivo'),
+    ('sujeto', 'sustantivo'),
+    ('verbo', 'valor'),
+    ('objeto', 'determinante'),
+    ('objeto', 'adjetivo'),
+    ('objeto', 'sustantivo'),
+    (None, 'puntuacion'),
+)
+COMPONENTES = (('sujeto', 'SUJETO'), ('verbo', 'VERBO'), ('objeto', 'OBJETO'))
+CLAVES_REGISTRO = {
+    componente: {'tipo'} | {clave for c, clave in CAMPOS_ARBOL if c == componente}
+    for componente, _ in COMPONENTES
+}
+
+# Estado de cada registro. Los árboles con claves que no entran en
+# CAMPOS_ARBOL (varios adjetivos, complementos, coordinación, negación)
+# se marcan EXTENDIDO: el worker los devuelve serializados en JSON, con
+# índices de token en las hojas.
+INVALIDO, VALIDO, EXTENDIDO = 0, 1, 2
+
+# En un registro INVALIDO los campos guardan el error en lugar de hojas:
+# código (ver parser_natural.mensaje_error), lo que se esperaba (índice
+# en NOMBRES_ESPERADOS), token marcado y rango (desde, hasta) de tokens
+# del sintagma que no concuerda; -1 si no corresponde.
+CAMPOS_ERROR = ('codigo', 'esperado', 'indice', 'desde', 'hasta')
+NOMBRES_ESPERADOS = TIPOS + ('SUJETO', 'OBJETO', 'SN')
+ID_ESPERADO = {nombre: i for i, nombre in enumerate(NOMBRES_ESPERADOS)}
+
+# Registro de resultado: válido, palabra del error, un índice por campo
+FORMATO_RESULTADO = struct.Struct('<bxxxi' + 'i' * len(CAMPOS_ARBOL))
+ENCABEZADO = struct.Struct('<qq')  # cantidad de textos, caracteres en total
+
+
+def _alinear(n):
+    return (n + 7) & ~7
+
+
+def _conectar(nombre):
+    """
+    Abre un bloque existente sin anotarlo en el resource_tracker: lo
+    libera el proceso que lo creó. Si un worker lo anotara en su propio
+    tracker, al terminar lo daría por perdido (track=False existe desde
+    Python 3.13; antes se evita el registro durante la apertura).
+    """
+    try:
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    except TypeError:
+        pass
+    registrar = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=nombre)
+    finally:
+        resource_tracker.register = registrar
+
+
+class LoteCompartido:
+    """
+    Textos, tokens y resultados de un lote en memoria compartida.
+
+    Secciones del bloque (n textos, c caracteres en total):
+        encabezado  n y c
+        offsets     int64[n + 1]   inicio de cada texto en `texto`
+        cantidades  int32[n]       tokens de cada texto
+        resultados  n registros FORMATO_RESULTADO
+        texto       UTF-32-LE (4 bytes por carácter, offsets directos)
+        tipos       int8[c + n]    id de tipo
+        rasgos      int8[c + n]    máscara de género y número
+        inicios     int32[c + n]   inicio del token dentro de su texto
+        longitudes  int32[c + n]   largo del token en caracteres
+
+    Una palabra da a lo sumo dos tokens y ocupa al menos un carácter
+    más el espacio que la separa, así que el texto i nunca tiene más de
+    len(texto) + 1 tokens: los suyos empiezan en offsets[i] + i.
+    """
+
+    def __init__(self, memoria, propietario):
+        self.memoria = memoria
+        self.propietario = propietario
+        self.nombre = memoria.name
+        self.n, self.c = ENCABEZADO.unpack_from(memoria.buf, 0)
+        self._vistas = []
+        # Árboles EXTENDIDO que devolvió parsear_rango: índice -> JSON
+        self.extendidos = {}
+
+        n, c = self.n, self.c
+        pos = ENCABEZADO.size
+        self.offsets = self._vista(pos, (n + 1) * 8, 'q')
+        pos = _alinear(pos + (n + 1) * 8)
+        self.cantidades = self._vista(pos, n * 4, 'i')
+        pos = _alinear(pos + n * 4)
+        self._pos_resultados = pos
+        pos = _alinear(pos + n * FORMATO_RESULTADO.size)
+        self._pos_texto = pos
+        pos = _alinear(pos + c * 4)
+        self.tipos = self._vista(pos, c + n, 'b')
+        pos = _alinear(pos + c + n)
+        self.rasgos = self._vista(pos, c + n, 'b')
+        pos = _alinear(pos + c + n)
+        self.inicios = self._vista(pos, (c + n) * 4, 'i')
+        pos = _alinear(pos + (c + n) * 4)
+        self.longitudes = self._vista(pos, (c + n) * 4, 'i')
+
+    @staticmethod
+    def tamano(n, c):
+        """Bytes que ocupa un lote de n textos y c caracteres"""
+        return (_alinear(ENCABEZADO.size + (n + 1) * 8) + _alinear(n * 4)
+                + _alinear(n * FORMATO_RESULTADO.size) + _alinear(c * 4)
+                + 2 * _alinear(c + n) + 2 * _alinear((c + n) * 4))
+
+    @classmethod
+    def crear(cls, textos):
+        """Crea el bloque y copia los textos (única copia de los datos)"""
+        c = sum(len(t) for t in textos)
+        memoria = shared_memory.SharedMemory(create=True, size=max(1, cls.tamano(len(textos), c)))
+        ENCABEZADO.pack_into(memoria.buf, 0, len(textos), c)
+        lote = cls(memoria, propietario=True)
+        acumulado = 0
+        for i, texto in enumerate(textos):
+            lote.offsets[i] = acumulado
+            acumulado += len(texto)
+        lote.offsets[len(textos)] = acumulado
+        codificado = ''.join(textos).encode('utf-32-le')
+        memoria.buf[lote._pos_texto:lote._pos_texto + len(codificado)] = codificado
+        return lote
+
+    @classmethod
+    def abrir(cls, nombre):
+        """Se conecta a un bloque creado por otro proceso"""
+        return cls(_conectar(nombre), propietario=False)
+
+    def _vista(self, pos, largo, formato):
+        vista = self.memoria.buf[pos:pos + largo].cast(formato)
+        self._vistas.append(vista)
+        return vista
+
+    def texto(self, i):
+        inicio, fin = self.offsets[i], self.offsets[i + 1]
+        return bytes(self.memoria.buf[self._pos_texto + inicio * 4:self._pos_texto + fin * 4]).decode('utf-32-le')
+
+    def escribir_tokens(self, i, tokens):
+        base = self.offsets[i] + i
+        for k, token in enumerate(tokens, base):
+            self.tipos[k] = ID_TIPO[token.tipo]
+            self.rasgos[k] = token.rasgos
+            self.inicios[k] = token.inicio
+            self.longitudes[k] = token.longitud
+        self.cantidades[i] = len(tokens)
+
+    def tokens(self, i):
+        """Tokens del texto i como tuplas (id de tipo, inicio, longitud, rasgos)"""
+        base = self.offsets[i] + i
+        fin = base + self.cantidades[i]
+        return list(zip(self.tipos[base:fin], self.inicios[base:fin], self.longitudes[base:fin],
+                        self.rasgos[base:fin]))
+
+    def escribir_resultado(self, i, valido, posicion_error, indices):
+        FORMATO_RESULTADO.pack_into(self.memoria.buf, self._pos_resultados + i * FORMATO_RESULTADO.size,
+                                    valido, posicion_error, *indices)
+
+    def registro(self, i):
+        """(estado, palabra del error o -1, índices de token de CAMPOS_ARBOL)"""
+        estado, posicion_error, *indices = FORMATO_RESULTADO.unpack_from(
+            self.memoria.buf, self._pos_resultados + i * FORMATO_RESULTADO.size)
+        return estado, posicion_error, indices
+
+    def resultado(self, i):
+        """
+        Resultado con el formato de evaluacion.evaluar_natural, armado
+        solo con el registro y los tokens: las hojas toman la forma
+        canónica del texto de cada token, el mensaje de error sale del
+        código guardado y los árboles EXTENDIDO del JSON del worker.
+        """
+        texto = self.texto(i)
+        estado, posicion_error, indices = self.registro(i)
+        tokens = self.tokens(i)
+
+        def valor(k):
+            _, inicio, longitud, _ = tokens[k]
+            entrada, normalizada = buscar_palabra(texto[inicio:inicio + longitud])
+            return entrada[0] if entrada is not None else normalizada
+
+        if estado == INVALIDO:
+            return self._resultado_error(texto, tokens, valor, posicion_error, indices)
+
+        if estado == EXTENDIDO:
+            arbol = _con_palabras(json.loads(self.extendidos[i]), valor)
+            return {'gramatica': 'natural', 'entrada': texto, 'valido': True, 'arbol': arbol, 'error': None}
+
+        arbol = {'tipo': 'ORACION'}
+        for componente, tipo in COMPONENTES:
+            hojas = {clave: valor(k) for (c, clave), k in zip(CAMPOS_ARBOL, indices)
+                     if c == componente and k >= 0}
+            arbol[componente] = {'tipo': tipo, **hojas} if hojas else None
+        k = indices[-1]
+        arbol['puntuacion'] = valor(k) if k >= 0 else None
+        return {'gramatica': 'natural', 'entrada': texto, 'valido': True, 'arbol': arbol, 'error': None}
+
+    @staticmethod
+    def _resultado_error(texto, tokens, valor, posicion_error, indices):
+        """Resultado de un registro INVALIDO (ver CAMPOS_ERROR)"""
+        codigo, esperado, indice, desde, hasta = indices[:len(CAMPOS_ERROR)]
+
+        def token(k):
+            tipo, inicio, longitud, rasgos = tokens[k]
+            return Token(TIPOS[tipo], valor(k), 0, inicio, longitud, rasgos)
+
+        marcado = token(indice) if indice >= 0 else None
+        frase = [token(k) for k in range(desde, hasta)] if desde >= 0 else ()
+        esperado = NOMBRES_ESPERADOS[esperado] if esperado >= 0 else None
+        if marcado is not None:
+            inicio, fin = marcado.inicio, marcado.fin
+        else:
+            # Se terminó la entrada: justo después del último token
+            _, ultimo, longitud, _ = tokens[-1] if tokens else (0, 0, 0, 0)
+            inicio = fin = ultimo + longitud
+        return {'gramatica': 'natural', 'entrada': texto, 'valido': False, 'arbol': None,
+                'error': mensaje_error(codigo, esperado, marcado, frase),
+                'posicion': posicion_error if posicion_error >= 0 else None,
+                'diagnostico': diagnostico(texto, inicio, fin)}
+
+    def cerrar(self):
+        for vista in self._vistas:
+            vista.release()
+        self._vistas.clear()
+        self.memoria.close()
+        if self.propietario:
+            self.memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def lexear_rango(trabajo):
+    """Etapa 1: tokeniza los textos [inicio, fin) y escribe los arreglos"""
+    nombre, inicio, fin = trabajo
+    with LoteCompartido.abrir(nombre) as lote:
+        total = 0
+        for i in range(inicio, fin):
+            tokens = tokenizar(lote.texto(i))
+            lote.escribir_tokens(i, tokens)
+            total += len(tokens)
+    return total
+
+
+def parsear_rango(trabajo):
+    """
+    Etapa 2: parsea los textos [inicio, fin) a partir de los arreglos.
+    Los tokens llevan como valor su índice + 1, así el árbol que arma
+    ParserNatural queda con índices en lugar de palabras. Devuelve
+    (válidas, {índice: JSON} de los árboles EXTENDIDO).
+    """
+    nombre, inicio, fin = trabajo
+    with LoteCompartido.abrir(nombre) as lote:
+        validas = 0
+        extendidos = {}
+        for i in range(inicio, fin):
+            tokens = []
+            palabra = -1
+            fin_anterior = -1
+            for k, (tipo, inicio_token, longitud, rasgos) in enumerate(lote.tokens(i)):
+                # La puntuación pegada a una palabra comparte su número
+                if inicio_token != fin_anterior:
+                    palabra += 1
+                tokens.append(Token(TIPOS[tipo], k + 1, palabra, inicio_token, longitud, rasgos))
+                fin_anterior = inicio_token + longitud
+            try:
+                arbol = ParserNatural(tokens).parse()
+            except ParseError as e:
+                posicion = e.posicion if e.posicion is not None else -1
+                desde, hasta = e.frase if e.frase else (-1, -1)
+                campos = [e.codigo, ID_ESPERADO[e.esperado] if e.esperado is not None else -1,
+                          e.indice if e.indice is not None else -1, desde, hasta]
+                lote.escribir_resultado(i, INVALIDO, posicion,
+                                        campos + [-1] * (len(CAMPOS_ARBOL) - len(campos)))
+                continue
+            validas += 1
+            if not _cabe_en_registro(arbol):
+                extendidos[i] = json.dumps(arbol, ensure_ascii=False, separators=(',', ':'))
+                lote.escribir_resultado(i, EXTENDIDO, -1, [-1] * len(CAMPOS_ARBOL))
+                continue
+            indices = []
+            for componente, clave in CAMPOS_ARBOL:
+                nodo = arbol.get(componente) if componente else arbol
+                valor = nodo.get(clave) if nodo else None
+                indices.append(valor - 1 if valor else -1)
+            lote.escribir_resultado(i, VALIDO, -1, indices)
+    return validas, extendidos
+
+
+def _con_palabras(nodo, valor):
+    """Árbol con índices de token (valor - 1 = índice) pasado a palabras"""
+    if isinstance(nodo, dict):
+        return {clave: _con_palabras(hijo, valor) for clave, hijo in nodo.items()}
+    if isinstance(nodo, list):
+        return [_con_palabras(hijo, valor) for hijo in nodo]
+    if isinstance(nodo, int):
+        return valor(nodo - 1)
+    return nodo
+
+
+def _cabe_en_registro(arbol):
+    """True si todas las hojas del árbol tienen lugar en CAMPOS_ARBOL"""
+    if 'complementos' in arbol:
+        return False
+    for componente, _ in COMPONENTES:
+        nodo = arbol[componente]
+        if nodo and not nodo.keys() <= CLAVES_REGISTRO[componente]:
+            return False
+    return True
+
+
+def _rangos(nombre, n, tamano_bloque):
+    return [(nombre, i, min(i + tamano_bloque, n)) for i in range(0, n, tamano_bloque)]
+
+
+def analizar(textos, workers=None, tamano_bloque=2000, pool=None):
+    """
+    Tokeniza y parsea `textos` en dos etapas paralelas sobre el mismo
+    bloque compartido. Devuelve los resultados en el formato de
+    evaluacion.evaluar_natural, en el orden original.
+    """
+    with LoteCompartido.crear(textos) as lote:
+        rangos = _rangos(lote.nombre, len(textos), tamano_bloque)
+        if pool is None:
+            with multiprocessing.Pool(workers) as pool:
+                pool.map(lexear_rango, rangos)
+                parciales = pool.map(parsear_rango, rangos)
+        else:
+            pool.map(lexear_rango, rangos)
+            parciales = pool.map(parsear_rango, rangos)
+        for _, extendidos in parciales:
+            lote.extendidos.update(extendidos)
+        return [lote.resultado(i) for i in range(len(textos))]
+
+
+# ---------- Comparación con el envío por pickle ----------
+
+def _lexear_pickle(textos):
+    return [tokenizar(t) for t in textos]
+
+
+def _parsear_pickle(listas):
+    resultados = []
+    for tokens in listas:
+        try:
+            resultados.append({'valido': True, 'arbol': ParserNatural(tokens).parse()})
+        except ParseError as e:
+            resultados.append({'valido': False, 'error': e.mensaje, 'posicion': e.posicion})
+    return resultados
+
+
+def comparar(textos, workers, tamano_bloque=2000):
+    """Tiempos (s) de las dos etapas con pickle y con memoria compartida"""
+    bloques = [textos[i:i + tamano_bloque] for i in range(0, len(textos), tamano_bloque)]
+    with multiprocessing.Pool(workers) as pool:
+        pool.map(_lexear_pickle, bloques[:1])  # arrancar los procesos
+
+        inicio = time.perf_counter()
+        tokens = pool.map(_lexear_pickle, bloques)
+        pool.map(_parsear_pickle, tokens)
+        con_pickle = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with LoteCompartido.crear(textos) as lote:
+            rangos = _rangos(lote.nombre, len(textos), tamano_bloque)
+            pool.map(lexear_rango, rangos)
+            pool.map(parsear_rango, rangos)
+            registros = [lote.registro(i) for i in range(len(textos))]
+        compartida = time.perf_counter() - inicio
+    return {'pickle_s': con_pickle, 'memoria_compartida_s': compartida, 'validas': sum(1 for r in registros if r[0] != INVALIDO)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el envío de tokens por pickle y por memoria compartida")
+    parser.add_argument('--cantidad', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from generadores import generar_lote
+    mitad = args.cantidad // 2
+    textos = (generar_lote('natural', mitad, validas=True, semilla=args.semilla)
+              + generar_lote('natural', args.cantidad - mitad, validas=False, semilla=args.semilla + 1))
+    tiempos = comparar(textos, args.workers)
+    print(f"{len(textos)} oraciones ({tiempos['validas']} válidas)")
+    print(f"  pickle:              {tiempos['pickle_s']:.2f}s")
+    print(f"  memoria compartida:  {tiempos['memoria_compartida_s']:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
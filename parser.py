@@ -1,8 +1,16 @@
 # ------------------------------------------------------------
 # Lexer para C
 # ------------------------------------------------------------
+import collections
+import contextlib
+import io
+import sys
+import time
+
 import ply.lex as lex
 
+import instrumentacion
+
 S=0
 S2=1
 T=2
@@ -108,9 +116,16 @@ def t_comentario(t):
     r'\/\/.*'
     return t
 
+# Un comentario termina en el primer */ (antes llegaba hasta el último y
+# se comía el código entre dos comentarios). Si no se cierra, toma el
+# resto de la entrada y se devuelve como token, que ninguna regla acepta:
+# así el error queda en el /* y el resto se recorre una sola vez (antes
+# se volvía a recorrer desde cada /*, tiempo cuadrático)
 def t_comentario_bloque(t):
-    r'\/\*(.|\n)*\*\/'
-   
+    r'/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|/\*[\s\S]*'
+    t.lexer.lineno += t.value.count('\n')
+    if len(t.value) < 4 or not t.value.endswith('*/'):
+        return t
 
 def t_error(t):
     print("Illegal character '%s'" % t.value[0])
@@ -174,47 +189,158 @@ stack = ['eof', 'S']
 # Build the lexer
 lexer = lex.lex()
 
+# Lo mínimo de un LexToken de ply que usa _miParser, con el fin del
+# token ya calculado (ver lexear)
+TokenFormal = collections.namedtuple('TokenFormal', 'type value lexpos fin')
+
+
+def _rango_token(cadena, tok):
+    """Rango de caracteres que ocupa `tok` en la cadena"""
+    if isinstance(tok, TokenFormal):
+        return tok.lexpos, tok.fin
+    if tok.type == 'error':
+        # El valor de un token de error es todo el resto de la entrada
+        return tok.lexpos, tok.lexpos + 1
+    if isinstance(tok.value, str):
+        return tok.lexpos, tok.lexpos + len(tok.value)
+    fin = tok.lexpos
+    while fin < len(cadena) and cadena[fin].isdigit():
+        fin += 1
+    return tok.lexpos, fin
+
+
+def lexear(cadena):
+    """
+    Lee toda la cadena con el lexer en una sola pasada. Devuelve una
+    tupla (token, impreso) por cada llamada a lexer.token(), la última
+    con token None: `token` es (tipo, valor, inicio, fin), con el rango
+    de caracteres que ocupa, e `impreso` lo que el lexer imprimió en esa
+    llamada (caracteres ilegales), para que parsear_lexeado lo reproduzca
+    en el mismo punto del parseo.
+    """
+    llamadas = []
+    mensajes = io.StringIO()
+    with contextlib.redirect_stdout(mensajes):
+        lexer.input(cadena)
+        lexer.lineno = 1
+        while True:
+            tok = lexer.token()
+            impreso = mensajes.getvalue()
+            if impreso:
+                mensajes.seek(0)
+                mensajes.truncate()
+            if tok is None:
+                llamadas.append((None, impreso))
+                return llamadas
+            llamadas.append(((tok.type, tok.value) + _rango_token(cadena, tok), impreso))
+
+
+def parsear_lexeado(cadena, llamadas):
+    """
+    Como analizar_cadena, pero con los tokens que ya leyó lexear (no
+    vuelve a pasar la cadena por el lexer).
+    """
+    pendientes = iter(llamadas)
+
+    def siguiente_token():
+        tok, impreso = next(pendientes, (None, ''))
+        if impreso:
+            sys.stdout.write(impreso)
+        return TokenFormal(*tok) if tok is not None else None
+
+    return _miParser(cadena, siguiente_token, buscar_en_tabla, agregar_pila)
+
+
 def miParser(cadena):
+    return analizar_cadena(cadena)[0]
+
+
+def analizar_cadena(cadena):
+    """
+    Como miParser, pero devuelve (resultado, rango): `rango` es el rango
+    de caracteres [inicio, fin) donde se cortó el análisis, o None si la
+    cadena fue reconocida (diagnosticos.py lo pasa a línea y columna).
+    """
+    instr = instrumentacion.actual
+    if instr is None:
+        return _miParser(cadena, lexer.token, buscar_en_tabla, agregar_pila)
+    return _miParser_instrumentado(cadena, instr)
+
+
+def _miParser_instrumentado(cadena, instr):
+    """Ejecuta miParser midiendo lexico, tabla y pila"""
+    def siguiente_token():
+        inicio = time.perf_counter_ns()
+        tok = lexer.token()
+        instr.sumar_tiempo('formal_lexico', time.perf_counter_ns() - inicio)
+        if tok is not None:
+            instr.incrementar('formal_tokens')
+        return tok
+
+    def apilar(produccion):
+        inicio = time.perf_counter_ns()
+        agregar_pila(produccion)
+        instr.sumar_tiempo('formal_pila', time.perf_counter_ns() - inicio)
+        instr.registrar_maximo('formal_pila_max', len(stack))
+
+    buscar = instr.medir('formal_tabla', buscar_en_tabla)
+
+    inicio = time.perf_counter_ns()
+    resultado, rango = _miParser(cadena, siguiente_token, buscar, apilar)
+    instr.sumar_tiempo('formal_total', time.perf_counter_ns() - inicio)
+    instr.incrementar('formal_cadenas')
+    if resultado != 1:
+        instr.incrementar('formal_errores')
+    return resultado, rango
+
+
+def _miParser(cadena, siguiente_token, buscar, apilar):
+    """
+    Núcleo de miParser: devuelve (1 o 0, rango de caracteres del error o
+    None). El rango se devuelve en lugar de guardarse en el módulo, así
+    cada llamada tiene el suyo.
+    """
     global stack
     stack = ['eof', 'S']  # Reiniciar pila por cada parseo
 
     lexer.input(cadena)
+    lexer.lineno = 1
     
-    tok = lexer.token()
+    tok = siguiente_token()
     if not tok:
         print("Error: Cadena de entrada vacia o solo caracteres ignorados.")
-        return 0
+        return 0, (len(cadena), len(cadena))
 
     x = stack[-1]
     while True:
         if x == tok.type and x == 'eof':
             print("Cadena reconocida exitosamente")
-            return 1 
+            return 1, None
         else:
             if x == tok.type and x != 'eof':
                 stack.pop()
                 x = stack[-1]
-                tok = lexer.token()
+                tok = siguiente_token()
                 
                 if not tok:
                     print("Error: Se termino la entrada inesperadamente.")
                     print("Stack restante:", stack)
-                    return 0
+                    return 0, (len(cadena), len(cadena))
             
             if x in tokens and x != tok.type:
                 print(f"Error: Se esperaba '{x}' pero se encontro '{tok.type}' ('{tok.value}')")
-                return 0
+                return 0, _rango_token(cadena, tok)
             
             if x not in tokens: # no terminal
-                celda = buscar_en_tabla(x, tok.type)                                  
+                celda = buscar(x, tok.type)                                  
                 if celda is None:
                     print(f"Error: NO se esperaba '{tok.type}' ('{tok.value}')")
                     print("En posicion:", tok.lexpos)
                     print(f"El No-Terminal '{x}' no tiene regla para '{tok.type}'")
-                    return 0
+                    return 0, _rango_token(cadena, tok)
                 else:
                     stack.pop()
-                    agregar_pila(celda)
+                    apilar(celda)
                     x = stack[-1]             
 
         #if not tok:
@@ -2,26 +2,71 @@
 # Parser Descendente Recursivo para Español Simplificado
 # Fase 2 - Proyecto TLP
 # ------------------------------------------------------------
+import time
+import unicodedata
+
+import instrumentacion
+
 
 class Token:
-    """Representa un token del lenguaje natural"""
-    def __init__(self, tipo, valor, posicion=0):
+    """
+    Representa un token del lenguaje natural.
+    `posicion` es el número de palabra; `inicio` y `longitud` ubican el
+    texto del token (en caracteres) dentro de la entrada original.
+    `rasgos` es la máscara de género y número (ver RASGOS).
+    """
+    def __init__(self, tipo, valor, posicion=0, inicio=0, longitud=0, rasgos=None):
         self.tipo = tipo
         self.valor = valor
         self.posicion = posicion
+        self.inicio = inicio
+        self.longitud = longitud
+        self.rasgos = TODOS if rasgos is None else rasgos
+    
+    @property
+    def fin(self):
+        """Posición del carácter que sigue al token en la entrada"""
+        return self.inicio + self.longitud
     
     def __repr__(self):
         return f"Token({self.tipo}, '{self.valor}')"
 
 
 class ParseError(Exception):
-    """Excepción para errores de parsing"""
-    def __init__(self, mensaje, posicion=None):
+    """
+    Excepción para errores de parsing. `posicion` es el número de
+    palabra; `inicio` y `fin` son el rango de caracteres señalado en la
+    entrada (ver diagnosticos.py para pasarlo a línea y columna).
+    """
+    # Solo en los errores de ParserNatural (ver error_codificado)
+    codigo = None
+    esperado = None
+    indice = None
+    frase = None
+    
+    def __init__(self, mensaje, posicion=None, inicio=None, fin=None):
         self.mensaje = mensaje
         self.posicion = posicion
+        self.inicio = inicio
+        self.fin = fin
         super().__init__(self.mensaje)
 
 
+class ErrorConcordancia(ParseError):
+    """La estructura es correcta pero determinante, adjetivos y sustantivo no concuerdan"""
+
+
+def error_en_token(mensaje, token, clase=ParseError):
+    """Error ubicado en `token` (palabra y rango de caracteres)"""
+    return clase(mensaje, token.posicion, token.inicio, token.fin)
+
+
+def error_fin_entrada(mensaje, tokens):
+    """Error de entrada terminada antes de tiempo: apunta justo después del último token"""
+    fin = tokens[-1].fin if tokens else 0
+    return ParseError(mensaje, None, fin, fin)
+
+
 # Vocabulario limitado para el subconjunto de español
 VOCABULARIO = {
     # Determinantes
@@ -43,6 +88,16 @@ VOCABULARIO = {
     'libro': 'SUSTANTIVO',
     'mesa': 'SUSTANTIVO',
     'coche': 'SUSTANTIVO',
+    'perros': 'SUSTANTIVO',
+    'gatos': 'SUSTANTIVO',
+    'casas': 'SUSTANTIVO',
+    'carnes': 'SUSTANTIVO',
+    'aguas': 'SUSTANTIVO',
+    'niños': 'SUSTANTIVO',
+    'niñas': 'SUSTANTIVO',
+    'libros': 'SUSTANTIVO',
+    'mesas': 'SUSTANTIVO',
+    'coches': 'SUSTANTIVO',
     
     # Verbos
     'come': 'VERBO',
@@ -64,6 +119,60 @@ VOCABULARIO = {
     'lento': 'ADJETIVO',
     'nuevo': 'ADJETIVO',
     'viejo': 'ADJETIVO',
+    'grandes': 'ADJETIVO',
+    'pequeña': 'ADJETIVO',
+    'pequeños': 'ADJETIVO',
+    'pequeñas': 'ADJETIVO',
+    'roja': 'ADJETIVO',
+    'rojos': 'ADJETIVO',
+    'rojas': 'ADJETIVO',
+    'azules': 'ADJETIVO',
+    'bonita': 'ADJETIVO',
+    'bonitos': 'ADJETIVO',
+    'bonitas': 'ADJETIVO',
+    'rápida': 'ADJETIVO',
+    'rápidos': 'ADJETIVO',
+    'rápidas': 'ADJETIVO',
+    'lenta': 'ADJETIVO',
+    'lentos': 'ADJETIVO',
+    'lentas': 'ADJETIVO',
+    'nueva': 'ADJETIVO',
+    'nuevos': 'ADJETIVO',
+    'nuevas': 'ADJETIVO',
+    'vieja': 'ADJETIVO',
+    'viejos': 'ADJETIVO',
+    'viejas': 'ADJETIVO',
+    
+    # Adverbios
+    'bien': 'ADVERBIO',
+    'mal': 'ADVERBIO',
+    'mucho': 'ADVERBIO',
+    'poco': 'ADVERBIO',
+    'siempre': 'ADVERBIO',
+    'hoy': 'ADVERBIO',
+    'ahora': 'ADVERBIO',
+    'aquí': 'ADVERBIO',
+    'despacio': 'ADVERBIO',
+    'también': 'ADVERBIO',
+    
+    # Negación
+    'no': 'NEGACION',
+    'nunca': 'NEGACION',
+    'jamás': 'NEGACION',
+    
+    # Preposiciones y conjunciones
+    'en': 'PREPOSICION',
+    'con': 'PREPOSICION',
+    'de': 'PREPOSICION',
+    'sobre': 'PREPOSICION',
+    'para': 'PREPOSICION',
+    'sin': 'PREPOSICION',
+    'y': 'CONJUNCION',
+    'o': 'CONJUNCION',
+    'pero': 'CONJUNCION',
+    
+    # Relativos (solo la gramática extendida de earley.py)
+    'que': 'RELATIVO',
     
     # Puntuación
     '.': 'PUNTO',
@@ -71,32 +180,318 @@ VOCABULARIO = {
     '!': 'EXCLAMACION',
 }
 
+# Rasgos de género y número como bits: una palabra tiene prendidos los
+# valores con los que puede concordar. Un sintagma concuerda si el AND
+# de las máscaras de sus palabras conserva un bit de GENERO y uno de
+# NUMERO. Las palabras que no están en RASGOS no restringen nada.
+MASC = 1
+FEM = 2
+SING = 4
+PLUR = 8
+GENERO = MASC | FEM
+NUMERO = SING | PLUR
+TODOS = GENERO | NUMERO
+
+RASGOS = {
+    # Determinantes
+    'el': MASC | SING,
+    'la': FEM | SING,
+    'los': MASC | PLUR,
+    'las': FEM | PLUR,
+    'un': MASC | SING,
+    'una': FEM | SING,
+    
+    # Sustantivos ('agua' es femenino pero lleva 'el': se admiten ambos)
+    'perro': MASC | SING,
+    'gato': MASC | SING,
+    'casa': FEM | SING,
+    'carne': FEM | SING,
+    'agua': GENERO | SING,
+    'niño': MASC | SING,
+    'niña': FEM | SING,
+    'libro': MASC | SING,
+    'mesa': FEM | SING,
+    'coche': MASC | SING,
+    'perros': MASC | PLUR,
+    'gatos': MASC | PLUR,
+    'casas': FEM | PLUR,
+    'carnes': FEM | PLUR,
+    'aguas': FEM | PLUR,
+    'niños': MASC | PLUR,
+    'niñas': FEM | PLUR,
+    'libros': MASC | PLUR,
+    'mesas': FEM | PLUR,
+    'coches': MASC | PLUR,
+    
+    # Adjetivos
+    'grande': GENERO | SING,
+    'grandes': GENERO | PLUR,
+    'pequeño': MASC | SING,
+    'pequeña': FEM | SING,
+    'pequeños': MASC | PLUR,
+    'pequeñas': FEM | PLUR,
+    'rojo': MASC | SING,
+    'roja': FEM | SING,
+    'rojos': MASC | PLUR,
+    'rojas': FEM | PLUR,
+    'azul': GENERO | SING,
+    'azules': GENERO | PLUR,
+    'bonito': MASC | SING,
+    'bonita': FEM | SING,
+    'bonitos': MASC | PLUR,
+    'bonitas': FEM | PLUR,
+    'rápido': MASC | SING,
+    'rápida': FEM | SING,
+    'rápidos': MASC | PLUR,
+    'rápidas': FEM | PLUR,
+    'lento': MASC | SING,
+    'lenta': FEM | SING,
+    'lentos': MASC | PLUR,
+    'lentas': FEM | PLUR,
+    'nuevo': MASC | SING,
+    'nueva': FEM | SING,
+    'nuevos': MASC | PLUR,
+    'nuevas': FEM | PLUR,
+    'viejo': MASC | SING,
+    'vieja': FEM | SING,
+    'viejos': MASC | PLUR,
+    'viejas': FEM | PLUR,
+}
+
+# Tipos con los que puede empezar un sintagma nominal y los que cierran
+# la oración
+TIPOS_INICIO_SN = frozenset(('DETERMINANTE', 'ADJETIVO', 'SUSTANTIVO'))
+TIPOS_PUNTUACION = frozenset(('PUNTO', 'INTERROGACION', 'EXCLAMACION'))
+
+
+def concuerdan(mascara):
+    """True si el AND de rasgos de un sintagma conserva género y número"""
+    return bool(mascara & GENERO and mascara & NUMERO)
+
+
+def falla_concordancia(frase):
+    """
+    (índice dentro de `frase`, rasgo) de la primera palabra que deja al
+    sintagma sin género o sin número, o None si concuerda.
+    """
+    mascara = TODOS
+    for j, token in enumerate(frase):
+        mascara &= token.rasgos
+        if not concuerdan(mascara):
+            return j, 'género' if not mascara & GENERO else 'número'
+    return None
+
+
+# Códigos de los errores de ParserNatural. El mensaje sale del código,
+# lo que se esperaba y los tokens señalados (mensaje_error), así que se
+# puede rehacer sin volver a parsear (ver memoria_compartida.py).
+ERROR_FIN = 1             # Se esperaba un tipo de token y se terminó la entrada
+ERROR_TOKEN = 2           # Se esperaba un tipo de token y vino otro
+ERROR_SN_FIN = 3          # Se esperaba un sintagma nominal y se terminó la entrada
+ERROR_SN_TOKEN = 4        # Se esperaba un sintagma nominal y vino otro token
+ERROR_ADICIONAL = 5       # Sobran tokens después de la oración
+ERROR_CONCORDANCIA = 6    # El sintagma `frase` no concuerda en género o número
+
+
+def mensaje_error(codigo, esperado, token=None, frase=()):
+    """Mensaje de un error de ParserNatural a partir de su código"""
+    if codigo == ERROR_FIN:
+        return f"Se esperaba {esperado} pero se terminó la entrada"
+    if codigo == ERROR_TOKEN:
+        return f"Se esperaba {esperado} pero se encontró {token.tipo} ('{token.valor}')"
+    if codigo == ERROR_SN_FIN:
+        return f"Se esperaba {esperado} (DETERMINANTE, ADJETIVO o SUSTANTIVO) pero se terminó la entrada"
+    if codigo == ERROR_SN_TOKEN:
+        return f"Se esperaba {esperado} (DETERMINANTE, ADJETIVO o SUSTANTIVO) pero se encontró {token.tipo}"
+    if codigo == ERROR_ADICIONAL:
+        return f"Tokens adicionales encontrados: '{token.valor}' (tipo: {token.tipo})"
+    if codigo == ERROR_CONCORDANCIA:
+        _, rasgo = falla_concordancia(frase)
+        palabras = ' '.join(str(t.valor) for t in frase)
+        return f"Falta concordancia de {rasgo} en {esperado}: '{palabras}'"
+    raise ValueError(f"Código de error desconocido: {codigo}")
+
+
+def error_codificado(codigo, esperado, tokens, indice=None, frase=None):
+    """
+    ParseError con código: `indice` es el token señalado (None si se
+    terminó la entrada) y `frase` el rango (desde, hasta) de tokens del
+    sintagma en los errores de concordancia.
+    """
+    sintagma = tokens[frase[0]:frase[1]] if frase else ()
+    if codigo == ERROR_CONCORDANCIA:
+        indice = frase[0] + falla_concordancia(sintagma)[0]
+    token = tokens[indice] if indice is not None else None
+    mensaje = mensaje_error(codigo, esperado, token, sintagma)
+    if token is None:
+        error = error_fin_entrada(mensaje, tokens)
+    else:
+        clase = ErrorConcordancia if codigo == ERROR_CONCORDANCIA else ParseError
+        error = error_en_token(mensaje, token, clase)
+    error.codigo = codigo
+    error.esperado = esperado
+    error.indice = indice
+    error.frase = frase
+    return error
+
+
+def error_concordancia(tokens, desde, hasta, tipo):
+    """
+    ErrorConcordancia para el sintagma tokens[desde:hasta], ubicado en
+    la primera palabra que lo deja sin género o sin número.
+    """
+    return error_codificado(ERROR_CONCORDANCIA, tipo, tokens, frase=(desde, hasta))
+
+
+def verificar_concordancia(tokens, tipo='SN'):
+    """
+    Verifica la concordancia sin usar el árbol, para analizadores que no
+    arman los sintagmas (earley.py): cada tira de determinantes,
+    adjetivos y sustantivos seguidos es un sintagma simple, porque las
+    gramáticas nunca ponen dos sintagmas nominales pegados.
+    """
+    mascara = TODOS
+    inicio = 0
+    for i, token in enumerate(tokens):
+        if token.tipo in TIPOS_INICIO_SN:
+            mascara &= token.rasgos
+            continue
+        if not concuerdan(mascara):
+            raise error_concordancia(tokens, inicio, i, tipo)
+        mascara = TODOS
+        inicio = i + 1
+    if not concuerdan(mascara):
+        raise error_concordancia(tokens, inicio, len(tokens), tipo)
+
+
+def sin_acentos(palabra):
+    """Quita tildes y diéresis, también la de la ñ: 'Niño' -> 'Nino'"""
+    return ''.join(c for c in unicodedata.normalize('NFD', palabra) if not unicodedata.combining(c))
+
+
+def construir_indice_lexico(vocabulario):
+    """
+    Índice palabra escrita -> (palabra canónica, categoría, rasgos).
+    Cada palabra entra en minúsculas, con mayúscula inicial y toda en
+    mayúsculas, y cada una de esas formas también sin tildes, así el
+    caso común se resuelve con un solo acceso al diccionario. Una forma
+    sin tildes nunca reemplaza a una palabra del vocabulario y si dos
+    palabras comparten la misma forma sin tildes, esa forma no se indexa.
+    """
+    indice = {}
+    for palabra, categoria in vocabulario.items():
+        entrada = (palabra, categoria, RASGOS.get(palabra, TODOS))
+        for forma in (palabra, palabra.capitalize(), palabra.upper()):
+            indice[forma] = entrada
+    
+    sin_tilde = {}
+    for palabra, categoria in vocabulario.items():
+        for forma in (palabra, palabra.capitalize(), palabra.upper()):
+            clave = sin_acentos(forma)
+            if clave not in sin_tilde and clave in indice:
+                continue
+            sin_tilde.setdefault(clave, set()).add(palabra)
+            indice[clave] = indice[forma]
+    for clave, palabras in sin_tilde.items():
+        if len(palabras) > 1:
+            del indice[clave]
+    return indice
+
+
+INDICE_LEXICO = construir_indice_lexico(VOCABULARIO)
+
+
+def buscar_palabra(palabra):
+    """
+    Busca una palabra escrita de cualquier forma: tal cual, después en
+    NFKC y casefold (tildes combinadas, mayúsculas) y por último sin
+    tildes. Devuelve (entrada de INDICE_LEXICO o None, forma normalizada).
+    """
+    entrada = INDICE_LEXICO.get(palabra)
+    if entrada is not None:
+        return entrada, entrada[0]
+    normalizada = unicodedata.normalize('NFKC', palabra).casefold()
+    entrada = INDICE_LEXICO.get(normalizada)
+    if entrada is None:
+        entrada = INDICE_LEXICO.get(sin_acentos(normalizada))
+    return entrada, normalizada
+
+
+def _largo_sin_signos(palabra):
+    """Largo de `palabra` sin los signos de puntuación del final"""
+    fin = len(palabra)
+    while fin and unicodedata.category(palabra[fin - 1])[0] == 'P':
+        fin -= 1
+    return fin
+
+
+def _tokens_signos(signos, numero, inicio):
+    """Un token por signo de `signos`; DESCONOCIDO si no está en el vocabulario"""
+    tokens = []
+    for desplazamiento, signo in enumerate(signos, inicio):
+        normalizado = unicodedata.normalize('NFKC', signo)
+        if normalizado in VOCABULARIO:
+            tokens.append(Token(VOCABULARIO[normalizado], normalizado, numero, desplazamiento, 1))
+        else:
+            tokens.append(Token('DESCONOCIDO', signo, numero, desplazamiento, 1))
+    return tokens
+
 
-def tokenizar(texto):
+def tokenizar(texto, corrector=None):
     """
     Tokeniza un texto en español simplificado.
-    Convierte el texto a tokens según el vocabulario definido.
+    Convierte el texto a tokens según el vocabulario definido; el valor
+    de cada token es la palabra canónica ("RÁPIDO", "rapido" -> "rápido")
+    y `inicio`/`longitud` siguen ubicándola en el texto original.
+    Con un `corrector` (correccion.CorrectorOrtografico) cada palabra
+    fuera del vocabulario se reemplaza por la conocida más cercana; si
+    no hay ninguna dentro del límite queda como DESCONOCIDO.
     """
     tokens = []
-    palabras = texto.lower().split()
+    palabras = texto.split()
+    inicio = 0
+    numero = 0
     
-    for i, palabra in enumerate(palabras):
-        # Limpiar puntuación al final
-        palabra_limpia = palabra.rstrip('.,!?')
-        puntuacion = palabra[len(palabra_limpia):] if len(palabra_limpia) < len(palabra) else None
+    for palabra in palabras:
+        # Posición de la palabra en el texto original
+        inicio = texto.find(palabra, inicio)
         
-        # Buscar en vocabulario
-        if palabra_limpia in VOCABULARIO:
-            tokens.append(Token(VOCABULARIO[palabra_limpia], palabra_limpia, i))
-        else:
+        # Los signos de apertura (¿ ¡) no forman tokens
+        recortada = palabra.lstrip('¿¡')
+        if not recortada:
+            inicio += len(palabra)
+            continue
+        comienzo = inicio + len(palabra) - len(recortada)
+        
+        # Separar los signos de puntuación del final (conocidos o no)
+        longitud = len(recortada) if recortada[-1].isalnum() else _largo_sin_signos(recortada)
+        palabra_limpia = recortada[:longitud]
+        puntuacion = recortada[longitud:]
+        
+        # Buscar en el índice (un acceso si está escrita en una forma conocida)
+        entrada = INDICE_LEXICO.get(palabra_limpia)
+        if entrada is None and palabra_limpia:
+            entrada, palabra_limpia = buscar_palabra(palabra_limpia)
+            # Palabra mal escrita: usar la conocida más cercana
+            if entrada is None and corrector is not None:
+                entrada = INDICE_LEXICO.get(corrector.corregir(palabra_limpia))
+        
+        # Una "palabra" que es solo signos ("!", "¿?") da solo los signos
+        if entrada is not None:
+            tokens.append(Token(entrada[1], entrada[0], numero, comienzo, longitud, entrada[2]))
+        elif palabra_limpia:
             # Si no está en el vocabulario, intentar como sustantivo genérico
             # (esto permite flexibilidad pero marca la limitación del parser)
-            tokens.append(Token('DESCONOCIDO', palabra_limpia, i))
+            tokens.append(Token('DESCONOCIDO', palabra_limpia, numero, comienzo, longitud))
         
-        # Agregar puntuación si existe
+        # Un token por signo: "?!" o ".." no se descartan ni se aceptan
+        # como un solo signo, y los que no están en el vocabulario (",",
+        # ";") quedan como DESCONOCIDO
         if puntuacion:
-            if puntuacion in VOCABULARIO:
-                tokens.append(Token(VOCABULARIO[puntuacion], puntuacion, i))
+            tokens.extend(_tokens_signos(puntuacion, numero, comienzo + longitud))
+        
+        inicio += len(palabra)
+        numero += 1
     
     return tokens
 
@@ -104,10 +499,22 @@ def tokenizar(texto):
 # ============================================================
 # GRAMÁTICA LIBRE DE CONTEXTO
 # ============================================================
-# ORACION -> SUJETO VERBO OBJETO [PUNTO]
-# SUJETO -> DETERMINANTE SUSTANTIVO [ADJETIVO] | SUSTANTIVO [ADJETIVO] | ADJETIVO SUSTANTIVO
-# OBJETO -> DETERMINANTE SUSTANTIVO [ADJETIVO] | SUSTANTIVO [ADJETIVO] | ADJETIVO SUSTANTIVO | vacío
-# Nota: [ADJETIVO] significa adjetivo opcional después del sustantivo
+# ORACION -> SUJETO PREDICADO [PUNTO]
+# SUJETO -> SN
+# PREDICADO -> VERBO {ADVERBIO} OBJETO {ADVERBIO | PREPOSICION SN}
+# VERBO -> [NEGACION] VERBO
+# OBJETO -> SN | vacío
+# SN -> NOMINAL {CONJUNCION NOMINAL}
+# NOMINAL -> SIMPLE {PREPOSICION SIMPLE}
+# SIMPLE -> [DETERMINANTE] {ADJETIVO} SUSTANTIVO {ADJETIVO}
+# Nota: [X] significa X opcional y {X} cero o más X. Cada decisión se
+# toma mirando solo el token actual (LL(1)) y las repeticiones son
+# ciclos, así que el análisis es lineal en la cantidad de tokens.
+# Un complemento con preposición que sigue a un sustantivo se le asigna
+# a ese sustantivo; los de la oración son los que siguen al verbo o a
+# un adverbio.
+# En cada SIMPLE determinante, adjetivos y sustantivo concuerdan en
+# género y número (RASGOS); si no, se lanza ErrorConcordancia.
 # ============================================================
 
 
@@ -116,6 +523,10 @@ class ParserNatural:
     
     def __init__(self, tokens):
         self.tokens = tokens
+        # Tipos de los tokens con un None al final: mirar el token actual
+        # es un acceso a la lista, sin comparar con len(tokens)
+        self.tipos = [token.tipo for token in tokens]
+        self.tipos.append(None)
         self.posicion = 0
         self.errores = []
     
@@ -125,26 +536,32 @@ class ParserNatural:
             return self.tokens[self.posicion]
         return None
     
+    def tipo_actual(self):
+        """Tipo del token actual, o None si se terminó la entrada"""
+        return self.tipos[self.posicion]
+    
     def consumir(self, tipo_esperado=None):
         """Consume el token actual si coincide con el tipo esperado"""
         if self.posicion >= len(self.tokens):
-            raise ParseError(f"Se esperaba {tipo_esperado} pero se terminó la entrada")
+            raise error_codificado(ERROR_FIN, tipo_esperado, self.tokens)
         
         token = self.tokens[self.posicion]
         
         if tipo_esperado and token.tipo != tipo_esperado:
-            raise ParseError(
-                f"Se esperaba {tipo_esperado} pero se encontró {token.tipo} ('{token.valor}')",
-                token.posicion
-            )
+            raise error_codificado(ERROR_TOKEN, tipo_esperado, self.tokens, self.posicion)
         
         self.posicion += 1
         return token
     
+    def avanzar(self):
+        """Consume el token actual sin verificar (el tipo ya se miró)"""
+        token = self.tokens[self.posicion]
+        self.posicion += 1
+        return token
+    
     def es_tipo(self, tipo):
         """Verifica si el token actual es de un tipo específico"""
-        token = self.token_actual()
-        return token and token.tipo == tipo
+        return self.tipos[self.posicion] == tipo
     
     def parse(self):
         """Método principal: parsea una oración completa"""
@@ -153,11 +570,7 @@ class ParserNatural:
             
             # Verificar que no queden tokens sin procesar
             if self.posicion < len(self.tokens):
-                token_restante = self.token_actual()
-                raise ParseError(
-                    f"Tokens adicionales encontrados: '{token_restante.valor}' (tipo: {token_restante.tipo})",
-                    token_restante.posicion
-                )
+                raise error_codificado(ERROR_ADICIONAL, None, self.tokens, self.posicion)
             
             return resultado
         except ParseError as e:
@@ -165,152 +578,186 @@ class ParserNatural:
             raise
     
     def parse_oracion(self):
-        """ORACION -> SUJETO VERBO OBJETO [PUNTO]"""
+        """ORACION -> SUJETO VERBO {ADVERBIO} OBJETO {ADVERBIO | PREPOSICION SN} [PUNTO]"""
         sujeto = self.parse_sujeto()
         verbo = self.parse_verbo()
+        complementos = self.parse_complementos(con_preposicion=False)
         objeto = self.parse_objeto()
+        complementos += self.parse_complementos()
         
         # Punto opcional
-        if self.es_tipo('PUNTO') or self.es_tipo('INTERROGACION') or self.es_tipo('EXCLAMACION'):
-            puntuacion = self.consumir()
+        if self.tipo_actual() in TIPOS_PUNTUACION:
+            puntuacion = self.avanzar().valor
         else:
             puntuacion = None
         
-        return {
+        resultado = {
             'tipo': 'ORACION',
             'sujeto': sujeto,
             'verbo': verbo,
             'objeto': objeto,
-            'puntuacion': puntuacion.valor if puntuacion else None
+            'puntuacion': puntuacion
         }
+        if complementos:
+            resultado['complementos'] = complementos
+        return resultado
     
     def parse_sujeto(self):
-        """SUJETO -> DETERMINANTE SUSTANTIVO [ADJETIVO] | SUSTANTIVO [ADJETIVO] | ADJETIVO SUSTANTIVO"""
-        adjetivo_antes = None
-        adjetivo_despues = None
-        
-        if self.es_tipo('DETERMINANTE'):
-            determinante = self.consumir('DETERMINANTE')
-            sustantivo = self.consumir('SUSTANTIVO')
-            # Adjetivo opcional después del sustantivo
-            if self.es_tipo('ADJETIVO'):
-                adjetivo_despues = self.consumir('ADJETIVO').valor
-            
-            resultado = {
-                'tipo': 'SUJETO',
-                'determinante': determinante.valor,
-                'sustantivo': sustantivo.valor
-            }
-            if adjetivo_despues:
-                resultado['adjetivo'] = adjetivo_despues
+        """SUJETO -> SN"""
+        return self.parse_sintagma('SUJETO')
+    
+    def parse_sintagma(self, tipo):
+        """SN -> NOMINAL {CONJUNCION NOMINAL}"""
+        resultado = self.parse_nominal(tipo)
+        if self.tipos[self.posicion] != 'CONJUNCION':
             return resultado
-            
-        elif self.es_tipo('ADJETIVO'):
-            # Adjetivo antes del sustantivo
-            adjetivo_antes = self.consumir('ADJETIVO')
-            sustantivo = self.consumir('SUSTANTIVO')
-            return {
-                'tipo': 'SUJETO',
-                'adjetivo': adjetivo_antes.valor,
-                'sustantivo': sustantivo.valor
-            }
-        elif self.es_tipo('SUSTANTIVO'):
-            sustantivo = self.consumir('SUSTANTIVO')
-            # Adjetivo opcional después del sustantivo
-            if self.es_tipo('ADJETIVO'):
-                adjetivo_despues = self.consumir('ADJETIVO').valor
-            
-            resultado = {
-                'tipo': 'SUJETO',
-                'sustantivo': sustantivo.valor
-            }
-            if adjetivo_despues:
-                resultado['adjetivo'] = adjetivo_despues
+        coordinados = []
+        while self.tipos[self.posicion] == 'CONJUNCION':
+            conjuncion = self.avanzar()
+            coordinado = self.parse_nominal(tipo)
+            coordinado['conjuncion'] = conjuncion.valor
+            coordinados.append(coordinado)
+        resultado['coordinados'] = coordinados
+        return resultado
+    
+    def parse_nominal(self, tipo):
+        """NOMINAL -> SIMPLE {PREPOSICION SIMPLE}"""
+        resultado = self.parse_simple(tipo)
+        if self.tipos[self.posicion] != 'PREPOSICION':
             return resultado
-        else:
-            raise ParseError(
-                f"Se esperaba SUJETO (DETERMINANTE, ADJETIVO o SUSTANTIVO) pero se encontró {self.token_actual().tipo}",
-                self.token_actual().posicion if self.token_actual() else None
-            )
+        complementos = []
+        while self.tipos[self.posicion] == 'PREPOSICION':
+            preposicion = self.avanzar()
+            complementos.append({
+                'tipo': 'COMPLEMENTO',
+                'preposicion': preposicion.valor,
+                'termino': self.parse_simple('SN')
+            })
+        resultado['complementos'] = complementos
+        return resultado
+    
+    def parse_simple(self, tipo):
+        """SIMPLE -> [DETERMINANTE] {ADJETIVO} SUSTANTIVO {ADJETIVO}"""
+        tipos = self.tipos
+        actual = tipos[self.posicion]
+        if actual not in TIPOS_INICIO_SN:
+            if actual is None:
+                raise error_codificado(ERROR_SN_FIN, tipo, self.tokens)
+            raise error_codificado(ERROR_SN_TOKEN, tipo, self.tokens, self.posicion)
+        
+        resultado = {'tipo': tipo}
+        inicio = self.posicion
+        mascara = TODOS
+        if actual == 'DETERMINANTE':
+            token = self.avanzar()
+            mascara &= token.rasgos
+            resultado['determinante'] = token.valor
+        
+        # Adjetivos antes y después del sustantivo
+        adjetivos = []
+        while tipos[self.posicion] == 'ADJETIVO':
+            token = self.avanzar()
+            mascara &= token.rasgos
+            adjetivos.append(token.valor)
+        if adjetivos:
+            resultado['adjetivo'] = adjetivos[0]
+        token = self.consumir('SUSTANTIVO')
+        mascara &= token.rasgos
+        resultado['sustantivo'] = token.valor
+        while tipos[self.posicion] == 'ADJETIVO':
+            token = self.avanzar()
+            mascara &= token.rasgos
+            adjetivos.append(token.valor)
+        
+        if not concuerdan(mascara):
+            raise error_concordancia(self.tokens, inicio, self.posicion, tipo)
+        
+        # 'adjetivo' es el primero; 'adjetivos' solo aparece si hay varios
+        if adjetivos and 'adjetivo' not in resultado:
+            resultado['adjetivo'] = adjetivos[0]
+        if len(adjetivos) > 1:
+            resultado['adjetivos'] = adjetivos
+        return resultado
     
     def parse_verbo(self):
-        """VERBO -> VERBO"""
+        """VERBO -> [NEGACION] VERBO"""
+        negacion = self.avanzar() if self.tipos[self.posicion] == 'NEGACION' else None
         verbo = self.consumir('VERBO')
-        return {
+        resultado = {
             'tipo': 'VERBO',
             'valor': verbo.valor
         }
+        if negacion:
+            resultado['negacion'] = negacion.valor
+        return resultado
     
     def parse_objeto(self):
-        """OBJETO -> DETERMINANTE SUSTANTIVO [ADJETIVO] | SUSTANTIVO [ADJETIVO] | ADJETIVO SUSTANTIVO | vacío"""
-        # Objeto es opcional, puede ser vacío
-        if not self.token_actual():
-            return None
-        
-        # Si el siguiente token es puntuación, el objeto es vacío
-        if self.es_tipo('PUNTO') or self.es_tipo('INTERROGACION') or self.es_tipo('EXCLAMACION'):
-            return None
-        
-        adjetivo_despues = None
-        
-        if self.es_tipo('DETERMINANTE'):
-            determinante = self.consumir('DETERMINANTE')
-            sustantivo = self.consumir('SUSTANTIVO')
-            # Adjetivo opcional después del sustantivo
-            if self.es_tipo('ADJETIVO'):
-                adjetivo_despues = self.consumir('ADJETIVO').valor
-            
-            resultado = {
-                'tipo': 'OBJETO',
-                'determinante': determinante.valor,
-                'sustantivo': sustantivo.valor
-            }
-            if adjetivo_despues:
-                resultado['adjetivo'] = adjetivo_despues
-            return resultado
-            
-        elif self.es_tipo('ADJETIVO'):
-            # Adjetivo antes del sustantivo
-            adjetivo = self.consumir('ADJETIVO')
-            sustantivo = self.consumir('SUSTANTIVO')
-            return {
-                'tipo': 'OBJETO',
-                'adjetivo': adjetivo.valor,
-                'sustantivo': sustantivo.valor
-            }
-        elif self.es_tipo('SUSTANTIVO'):
-            sustantivo = self.consumir('SUSTANTIVO')
-            # Adjetivo opcional después del sustantivo
-            if self.es_tipo('ADJETIVO'):
-                adjetivo_despues = self.consumir('ADJETIVO').valor
-            
-            resultado = {
-                'tipo': 'OBJETO',
-                'sustantivo': sustantivo.valor
-            }
-            if adjetivo_despues:
-                resultado['adjetivo'] = adjetivo_despues
-            return resultado
-        else:
-            # Objeto vacío es válido
-            return None
-
+        """OBJETO -> SN | vacío"""
+        # Objeto es opcional: solo hay objeto si empieza un sintagma nominal
+        if self.tipos[self.posicion] in TIPOS_INICIO_SN:
+            return self.parse_sintagma('OBJETO')
+        return None
+    
+    def parse_complementos(self, con_preposicion=True):
+        """{ADVERBIO | PREPOSICION SN} (antes del objeto solo adverbios)"""
+        complementos = []
+        tipos = self.tipos
+        while True:
+            actual = tipos[self.posicion]
+            if actual == 'ADVERBIO':
+                complementos.append({'tipo': 'ADVERBIO', 'valor': self.avanzar().valor})
+            elif con_preposicion and actual == 'PREPOSICION':
+                preposicion = self.avanzar()
+                complementos.append({
+                    'tipo': 'COMPLEMENTO',
+                    'preposicion': preposicion.valor,
+                    'termino': self.parse_sintagma('SN')
+                })
+            else:
+                return complementos
 
-def parsear_oracion(texto):
+def parsear_oracion(texto, corrector=None):
     """
     Función principal para parsear una oración en español simplificado.
     
     Args:
         texto: String con la oración a parsear
+        corrector: CorrectorOrtografico opcional para palabras mal escritas
     
     Returns:
         dict: Estructura parseada de la oración
     """
-    tokens = tokenizar(texto)
+    instr = instrumentacion.actual
+    if instr is not None:
+        return _parsear_oracion_instrumentado(texto, instr, corrector)
+
+    tokens = tokenizar(texto, corrector)
     parser = ParserNatural(tokens)
     return parser.parse()
 
 
+def _parsear_oracion_instrumentado(texto, instr, corrector=None):
+    """Ejecuta parsear_oracion midiendo tokenizar y ParserNatural.parse"""
+    inicio = time.perf_counter_ns()
+    tokens = tokenizar(texto, corrector)
+    fin_lexico = time.perf_counter_ns()
+    instr.sumar_tiempo('natural_tokenizar', fin_lexico - inicio)
+    instr.incrementar('natural_tokens', len(tokens))
+    instr.incrementar('natural_oraciones')
+
+    parser = ParserNatural(tokens)
+    try:
+        return parser.parse()
+    except ParseError:
+        instr.incrementar('natural_errores')
+        raise
+    finally:
+        fin = time.perf_counter_ns()
+        instr.sumar_tiempo('natural_parse', fin - fin_lexico)
+        instr.sumar_tiempo('natural_total', fin - inicio)
+        instr.registrar_maximo('natural_tokens_max', len(tokens))
+
+
 def mostrar_estructura(estructura, nivel=0):
     """Muestra la estructura parseada de forma legible"""
     indent = "  " * nivel
@@ -326,6 +773,8 @@ def mostrar_estructura(estructura, nivel=0):
                 print(f"{indent}  Objeto: (vacío)")
             if estructura['puntuacion']:
                 print(f"{indent}  Puntuación: {estructura['puntuacion']}")
+            for complemento in estructura.get('complementos', []):
+                print(f"{indent}  Complemento: {complemento}")
         else:
             for key, value in estructura.items():
                 if isinstance(value, dict):
@@ -177,6 +177,14 @@ ejecutar_prueba_fase2(
     usar_spacy=False
 )
 
+# Prueba 12: Falta de concordancia entre determinante y sustantivo
+ejecutar_prueba_fase2(
+    "Falta de concordancia de género",
+    "La perro come carne.",
+    esperado_valido=False,
+    usar_spacy=False
+)
+
 # ============================================================
 # COMPARACIÓN FINAL
 # ============================================================
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Servicio asyncio de parseo por lotes para ambos parsers
+# ------------------------------------------------------------
+"""
+Atiende solicitudes JSON de a una por línea (NDJSON) en un socket
+local, unix o TCP.
+
+    {"id": 1, "gramatica": "natural", "entrada": "El perro come."}
+    -> {"id": 1, "gramatica": "natural", "entrada": "...", "valido": true, "arbol": {...}, "error": null}
+
+    {"tipo": "metricas"}                           -> {"metricas": {...}}
+    {"tipo": "metricas", "formato": "prometheus"}  -> {"prometheus": "..."}
+
+Las entradas que llegan dentro de una ventana de tiempo se juntan en un
+lote que se evalúa en un pool de procesos, así que el event loop nunca
+se bloquea dentro de un parser. Las respuestas llevan el mismo `id` y
+pueden llegar en otro orden. La cola de pendientes es acotada: cuando
+se llena, el servidor deja de leer de los sockets (back-pressure).
+
+Uso:
+    python servidor.py --unix /tmp/tlp.sock
+    python servidor.py --host 127.0.0.1 --puerto 8765 --ventana-ms 5 --workers 4
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from evaluacion import GRAMATICAS, evaluar
+from instrumentacion import Instrumentacion
+
+# Largo máximo de una línea de solicitud
+LIMITE_LINEA = 1 << 20
+# Bytes sin enviar a partir de los cuales se espera al cliente
+LIMITE_ESCRITURA = 1 << 16
+
+
+def evaluar_lote(pares):
+    """Trabajo de un proceso del pool: evalúa un lote de (gramática, entrada)"""
+    return [evaluar(gramatica, entrada) for gramatica, entrada in pares]
+
+
+class ProcesadorLotes:
+    """
+    Junta las entradas en lotes y los ejecuta en un pool de procesos.
+    `ventana` es cuánto se espera (en segundos) a que lleguen más
+    entradas antes de despachar un lote incompleto.
+    """
+
+    def __init__(self, ventana=0.005, tamano_lote=256, max_pendientes=10000, workers=None):
+        self.ventana = ventana
+        self.tamano_lote = tamano_lote
+        self.workers = workers or os.cpu_count() or 1
+        self.max_en_vuelo = self.workers * 2  # lotes ejecutándose a la vez
+        self.cola = asyncio.Queue(max_pendientes)
+        self.metricas = Instrumentacion()
+        self.en_vuelo = 0
+        self._cupo = asyncio.Semaphore(self.max_en_vuelo)
+        self._pool = None
+        self._tarea = None
+        # Lotes en ejecución: el loop solo guarda referencias débiles a
+        # las tareas, sin este conjunto un lote podría ser recolectado
+        # antes de resolver sus futures
+        self._lotes = set()
+
+    async def iniciar(self):
+        self._pool = ProcessPoolExecutor(self.workers)
+        self._tarea = asyncio.create_task(self._despachar())
+
+    async def cerrar(self):
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+        if self._lotes:
+            await asyncio.gather(*self._lotes, return_exceptions=True)
+        if self._pool:
+            self._pool.shutdown()
+
+    async def enviar(self, gramatica, entrada):
+        """
+        Encola una entrada y devuelve el future de su resultado.
+        Si la cola está llena espera a que se libere lugar.
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((gramatica, entrada, futuro, time.perf_counter_ns()))
+        self.metricas.incrementar('servidor_solicitudes')
+        self.metricas.registrar_maximo('servidor_cola', self.cola.qsize())
+        return futuro
+
+    def _tomar_disponibles(self, lote):
+        while len(lote) < self.tamano_lote and not self.cola.empty():
+            lote.append(self.cola.get_nowait())
+
+    async def _despachar(self):
+        """Tarea de fondo: arma lotes y los manda al pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            limite = loop.time() + self.ventana
+            self._tomar_disponibles(lote)
+            restante = limite - loop.time()
+            if len(lote) < self.tamano_lote and restante > 0:
+                await asyncio.sleep(restante)
+                self._tomar_disponibles(lote)
+
+            await self._cupo.acquire()
+            self.en_vuelo += 1
+            tarea = asyncio.create_task(self._ejecutar(lote))
+            self._lotes.add(tarea)
+            tarea.add_done_callback(self._lotes.discard)
+
+    async def _ejecutar(self, lote):
+        loop = asyncio.get_running_loop()
+        inicio = time.perf_counter_ns()
+        try:
+            resultados = await loop.run_in_executor(
+                self._pool, evaluar_lote, [(g, e) for g, e, _, _ in lote]
+            )
+        except Exception as e:
+            for _, _, futuro, _ in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            self.metricas.incrementar('servidor_lotes_fallidos')
+            return
+        finally:
+            self.en_vuelo -= 1
+            self._cupo.release()
+
+        fin = time.perf_counter_ns()
+        self.metricas.sumar_tiempo('servidor_lote', fin - inicio)
+        self.metricas.incrementar('servidor_lotes')
+        self.metricas.registrar_maximo('servidor_tamano_lote', len(lote))
+        for (_, _, futuro, llegada), resultado in zip(lote, resultados):
+            self.metricas.sumar_tiempo('servidor_latencia', fin - llegada)
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def estado(self):
+        """Métricas acumuladas más el estado actual de la cola"""
+        datos = self.metricas.a_dict()
+        datos['cola_actual'] = self.cola.qsize()
+        datos['cola_capacidad'] = self.cola.maxsize
+        datos['lotes_en_vuelo'] = self.en_vuelo
+        return datos
+
+
+async def leer_lineas(reader):
+    """
+    Líneas de la conexión, como `async for linea in reader`, pero una
+    línea de más de LIMITE_LINEA bytes no corta la conexión: se descarta
+    hasta su salto de línea y en su lugar se produce None.
+    """
+    while True:
+        try:
+            linea = await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            # Última línea sin salto de línea (o fin de la conexión)
+            if e.partial:
+                yield e.partial
+            return
+        except asyncio.LimitOverrunError as e:
+            await _descartar_linea(reader, e.consumed)
+            yield None
+            continue
+        yield linea
+
+
+async def _descartar_linea(reader, consumidos):
+    """Descarta el resto de una línea demasiado larga, hasta su salto de línea inclusive"""
+    try:
+        while True:
+            # Lo que ya está en el buffer y no contiene el fin de la línea
+            await reader.readexactly(max(1, consumidos))
+            try:
+                await reader.readuntil(b'\n')
+                return
+            except asyncio.LimitOverrunError as e:
+                consumidos = e.consumed
+    except asyncio.IncompleteReadError:
+        pass
+
+
+async def atender(procesador, reader, writer):
+    """Atiende una conexión: una solicitud por línea, respuestas al terminar"""
+    pendientes = set()
+
+    def escribir(respuesta):
+        writer.write((json.dumps(respuesta, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    async def responder(id_solicitud, futuro):
+        try:
+            resultado = await futuro
+        except Exception as e:
+            resultado = {'error': f"{type(e).__name__}: {e}"}
+        escribir({'id': id_solicitud, **resultado})
+
+    try:
+        async for linea in leer_lineas(reader):
+            if linea is None:
+                escribir({'error': f"Solicitud de más de {LIMITE_LINEA} bytes"})
+                continue
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                solicitud = json.loads(linea)
+            except ValueError as e:
+                escribir({'error': f"JSON inválido: {e}"})
+                continue
+            if not isinstance(solicitud, dict):
+                escribir({'error': "La solicitud debe ser un objeto JSON"})
+                continue
+
+            if solicitud.get('tipo') == 'metricas':
+                if solicitud.get('formato') == 'prometheus':
+                    escribir({'prometheus': procesador.metricas.a_prometheus()})
+                else:
+                    escribir({'metricas': procesador.estado()})
+                continue
+
+            id_solicitud = solicitud.get('id')
+            gramatica = solicitud.get('gramatica')
+            entrada = solicitud.get('entrada')
+            if gramatica not in GRAMATICAS or not isinstance(entrada, str):
+                escribir({'id': id_solicitud,
+                          'error': f"Se esperaba 'gramatica' ({'/'.join(GRAMATICAS)}) y 'entrada'"})
+                continue
+
+            # Si la cola está llena esto espera y el socket deja de leerse
+            futuro = await procesador.enviar(gramatica, entrada)
+            tarea = asyncio.create_task(responder(id_solicitud, futuro))
+            pendientes.add(tarea)
+            tarea.add_done_callback(pendientes.discard)
+
+            if writer.transport.get_write_buffer_size() > LIMITE_ESCRITURA:
+                await writer.drain()
+
+        if pendientes:
+            await asyncio.gather(*pendientes)
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def servir(procesador, unix=None, host='127.0.0.1', puerto=8765):
+    """Levanta el servidor y atiende hasta que se cancele"""
+    await procesador.iniciar()
+    manejador = functools.partial(atender, procesador)
+    if unix:
+        servidor = await asyncio.start_unix_server(manejador, path=unix, limit=LIMITE_LINEA)
+        direccion = unix
+    else:
+        servidor = await asyncio.start_server(manejador, host, puerto, limit=LIMITE_LINEA)
+        direccion = f"{host}:{puerto}"
+    print(f"Servidor escuchando en {direccion}", flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await procesador.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio NDJSON de parseo por lotes")
+    parser.add_argument('--unix', metavar='RUTA', help="socket unix (si no, TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--ventana-ms', type=float, default=5.0, help="espera para juntar un lote")
+    parser.add_argument('--tamano-lote', type=int, default=256)
+    parser.add_argument('--max-pendientes', type=int, default=10000, help="capacidad de la cola")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    async def arrancar():
+        procesador = ProcesadorLotes(args.ventana_ms / 1000, args.tamano_lote,
+                                     args.max_pendientes, args.workers)
+        await servir(procesador, args.unix, args.host, args.puerto)
+
+    try:
+        asyncio.run(arrancar())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Línea de comandos del proyecto: validación masiva de corpus
+# ------------------------------------------------------------
+"""
+Valida un corpus con cualquiera de los dos parsers y escribe un
+veredicto NDJSON por línea de entrada.
+
+La entrada puede ser texto plano (una cadena por línea) o NDJSON con
+objetos {"entrada": ..., "id": ..., "gramatica": ...}; `id` y
+`gramatica` son opcionales. Se lee de a bloques, los bloques se
+reparten entre varios procesos y cada proceso devuelve sus líneas de
+salida ya serializadas. Nunca hay más de unos pocos bloques en vuelo,
+así que la memoria no crece con el tamaño del corpus.
+
+Uso:
+    python -m tlp validar --gramatica natural oraciones.txt > veredictos.ndjson
+    cat corpus.ndjson | python -m tlp validar --gramatica formal --workers 8 --orden libre
+"""
+
+import argparse
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from evaluacion import GRAMATICAS, evaluar
+
+TAMANO_BUFFER = 1 << 20
+FORMATOS = ('auto', 'ndjson', 'texto')
+
+
+def _leer_linea(linea, formato, gramatica):
+    """Devuelve (id, gramática, entrada) de una línea, o lanza ValueError"""
+    if formato == 'texto' or (formato == 'auto' and not linea.startswith('{')):
+        return None, gramatica, linea
+    objeto = json.loads(linea)
+    if isinstance(objeto, str):
+        return None, gramatica, objeto
+    if not isinstance(objeto, dict) or not isinstance(objeto.get('entrada'), str):
+        raise ValueError("se esperaba un objeto con 'entrada'")
+    return objeto.get('id'), objeto.get('gramatica', gramatica), objeto['entrada']
+
+
+def procesar_bloque(trabajo):
+    """
+    Trabajo de un proceso: evalúa un bloque de (número, línea).
+    Devuelve (texto NDJSON del bloque, válidas, inválidas, errores).
+    """
+    gramatica, formato, bloque = trabajo
+    salida = []
+    validas = invalidas = errores = 0
+    for numero, linea in bloque:
+        try:
+            id_entrada, gramatica_linea, entrada = _leer_linea(linea, formato, gramatica)
+            if gramatica_linea not in GRAMATICAS:
+                raise ValueError(f"gramática desconocida: {gramatica_linea}")
+        except ValueError as e:
+            errores += 1
+            salida.append(json.dumps({'linea': numero, 'error': f"Entrada inválida: {e}"},
+                                     ensure_ascii=False))
+            continue
+        resultado = evaluar(gramatica_linea, entrada)
+        if resultado['valido']:
+            validas += 1
+        else:
+            invalidas += 1
+        registro = {'linea': numero}
+        if id_entrada is not None:
+            registro['id'] = id_entrada
+        registro.update(resultado)
+        salida.append(json.dumps(registro, ensure_ascii=False))
+    salida.append('')
+    return '\n'.join(salida), validas, invalidas, errores
+
+
+def leer_bloques(archivo, gramatica, formato, tamano_bloque, cupo=None):
+    """
+    Genera los trabajos de a `tamano_bloque` líneas no vacías, cada una
+    con su número de línea. Si se pasa `cupo` (un semáforo) espera lugar
+    antes de cada bloque, así el pool no lee todo el archivo por adelantado.
+    """
+    numeradas = ((numero, linea.rstrip('\r\n')) for numero, linea in enumerate(archivo, 1))
+    no_vacias = ((numero, linea) for numero, linea in numeradas if linea.strip())
+    while True:
+        bloque = list(itertools.islice(no_vacias, tamano_bloque))
+        if not bloque:
+            return
+        if cupo is not None:
+            cupo.acquire()
+        yield gramatica, formato, bloque
+
+
+def validar(entrada, salida, gramatica, workers=None, ordenado=True, tamano_bloque=512,
+            formato='auto'):
+    """
+    Valida todas las líneas de `entrada` (archivo de texto) y escribe
+    el NDJSON en `salida` (archivo de texto). Devuelve los totales.
+    """
+    totales = {'validas': 0, 'invalidas': 0, 'errores': 0}
+
+    def escribir(parcial):
+        texto, validas, invalidas, errores = parcial
+        salida.write(texto)
+        totales['validas'] += validas
+        totales['invalidas'] += invalidas
+        totales['errores'] += errores
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for trabajo in leer_bloques(entrada, gramatica, formato, tamano_bloque):
+            escribir(procesar_bloque(trabajo))
+        return totales
+
+    # Como mucho 4 bloques por proceso entre leídos y sin escribir
+    cupo = threading.Semaphore(workers * 4)
+    trabajos = leer_bloques(entrada, gramatica, formato, tamano_bloque, cupo)
+    with multiprocessing.Pool(workers) as pool:
+        mapear = pool.imap if ordenado else pool.imap_unordered
+        for parcial in mapear(procesar_bloque, trabajos):
+            escribir(parcial)
+            cupo.release()
+    return totales
+
+
+def _abrir_entrada(ruta):
+    if ruta in (None, '-'):
+        return io.TextIOWrapper(io.BufferedReader(sys.stdin.buffer, TAMANO_BUFFER),
+                                encoding='utf-8', errors='replace')
+    return open(ruta, 'r', encoding='utf-8', errors='replace', buffering=TAMANO_BUFFER)
+
+
+def _abrir_salida():
+    return io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, TAMANO_BUFFER),
+                            encoding='utf-8', newline='\n')
+
+
+def comando_validar(args):
+    inicio = time.perf_counter()
+    with _abrir_entrada(args.archivo) as entrada:
+        salida = _abrir_salida()
+        try:
+            totales = validar(entrada, salida, args.gramatica, args.workers,
+                              args.orden == 'original', args.tamano_bloque, args.formato)
+        finally:
+            salida.flush()
+    duracion = time.perf_counter() - inicio
+    total = sum(totales.values())
+    print(
+        f"{total} entradas: {totales['validas']} válidas, {totales['invalidas']} inválidas, "
+        f"{totales['errores']} con errores ({total / duracion if duracion else 0:.0f}/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='tlp', description="Herramientas de los parsers TLP")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    validar_parser = subparsers.add_parser('validar', help="validar un corpus y escribir NDJSON")
+    validar_parser.add_argument('archivo', nargs='?', default='-', help="archivo de entrada (- = stdin)")
+    validar_parser.add_argument('--gramatica', required=True, choices=GRAMATICAS)
+    validar_parser.add_argument('--formato', choices=FORMATOS, default='auto',
+                                help="auto: líneas que empiezan con { son NDJSON")
+    validar_parser.add_argument('--workers', type=int, default=None)
+    validar_parser.add_argument('--orden', choices=('original', 'libre'), default='original',
+                                help="libre: escribir cada bloque apenas termina")
+    validar_parser.add_argument('--tamano-bloque', type=int, default=512)
+    validar_parser.set_defaults(funcion=comando_validar)
+
+    args = parser.parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# ------------------------------------------------------------
+# Tubería por etapas: lector -> lexer -> parser -> escritor
+# ------------------------------------------------------------
+"""
+Valida un flujo de cadenas (una por línea) con las etapas del parseo
+separadas: el lexer y el parser corren cada uno en su propio proceso y
+el lector y el escritor en el proceso principal, conectados por colas
+acotadas de lotes. Mientras el parser trabaja un lote, el lexer ya
+tokeniza el siguiente y el lector lee el que sigue; si una etapa es más
+lenta, las colas anteriores se llenan y las demás esperan en lugar de
+acumular memoria.
+
+Cada etapa mide cuánto tiempo estuvo ocupada (reloj y CPU propia) y
+cuánto esperó a la anterior (entrada) o a la siguiente (salida). La
+etapa con más CPU es la que limita el rendimiento de toda la tubería;
+con menos núcleos que etapas el tiempo ocupado de reloj también cuenta
+los momentos en que el sistema le quitó el procesador.
+
+La salida es el mismo NDJSON que `python -m tlp validar`.
+
+Uso:
+    python tuberia.py --gramatica natural oraciones.txt > veredictos.ndjson
+    cat programas.txt | python tuberia.py --gramatica formal --metricas etapas.json
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import traceback
+
+from diagnosticos import diagnostico
+from evaluacion import evaluar_formal
+from parser import lexear
+from parser_natural import ParseError, ParserNatural, Token, tokenizar
+
+TAMANO_BUFFER = 1 << 20
+
+# Marca de fin de flujo en las colas
+FIN = None
+
+
+class FallaEtapa(Exception):
+    """Una etapa terminó con una excepción; viaja por las colas hasta el escritor"""
+
+    def __init__(self, etapa, detalle):
+        super().__init__(etapa, detalle)
+        self.etapa = etapa
+        self.detalle = detalle
+
+    def __str__(self):
+        return f"Falló la etapa '{self.etapa}':\n{self.detalle}"
+
+
+# ---------- Etapas de la gramática formal ----------
+
+def lexear_formal(lote):
+    """
+    Tokeniza un lote de (número, cadena) con parser.lexear: por cada
+    llamada a lexer.token() queda el token como tupla y lo que el lexer
+    imprimió en esa llamada (caracteres ilegales), para que el parser lo
+    reproduzca en el mismo punto del parseo.
+    """
+    return [(numero, cadena, lexear(cadena)) for numero, cadena in lote]
+
+
+def _parsear_formal(cadena, llamadas):
+    """Mismo resultado que evaluacion.evaluar_formal, con los tokens ya leídos"""
+    return evaluar_formal(cadena, llamadas)
+
+
+# ---------- Etapas de la gramática natural ----------
+
+def lexear_natural(lote):
+    """Tokeniza un lote de (número, texto); los Token viajan como tuplas"""
+    return [
+        (numero, texto,
+         [(t.tipo, t.valor, t.posicion, t.inicio, t.longitud, t.rasgos) for t in tokenizar(texto)])
+        for numero, texto in lote
+    ]
+
+
+def _parsear_natural(texto, tuplas):
+    """Mismo resultado que evaluacion.evaluar_natural, con los tokens ya leídos"""
+    try:
+        arbol = ParserNatural([Token(*t) for t in tuplas]).parse()
+    except ParseError as e:
+        return {'gramatica': 'natural', 'entrada': texto, 'valido': False,
+                'arbol': None, 'error': e.mensaje, 'posicion': e.posicion,
+                'diagnostico': diagnostico(texto, e.inicio, e.fin)}
+    return {'gramatica': 'natural', 'entrada': texto, 'valido': True, 'arbol': arbol, 'error': None}
+
+
+PARSERS = {'formal': _parsear_formal, 'natural': _parsear_natural}
+LEXERS = {'formal': lexear_formal, 'natural': lexear_natural}
+
+
+def parsear_lote(gramatica, lote):
+    """
+    Parsea un lote ya tokenizado y lo serializa.
+    Devuelve (texto NDJSON del lote, válidas, inválidas).
+    """
+    parsear = PARSERS[gramatica]
+    lineas = []
+    validas = 0
+    for numero, entrada, tokens in lote:
+        resultado = parsear(entrada, tokens)
+        validas += resultado['valido']
+        lineas.append(json.dumps({'linea': numero, **resultado}, ensure_ascii=False))
+    lineas.append('')
+    return '\n'.join(lineas), validas, len(lote) - validas
+
+
+# ---------- Ejecución de las etapas ----------
+
+def _nuevas_metricas(etapa):
+    return {'etapa': etapa, 'elementos': 0, 'lotes': 0, 'ocupado_s': 0.0, 'cpu_s': 0.0,
+            'espera_entrada_s': 0.0, 'espera_salida_s': 0.0}
+
+
+def ejecutar_etapa(etapa, gramatica, entrada, salida, metricas):
+    """
+    Cuerpo del proceso de una etapa intermedia ('lexer' o 'parser'):
+    toma lotes de `entrada`, los transforma y los pone en `salida` hasta
+    recibir FIN. Al terminar manda sus métricas por la cola `metricas`.
+    """
+    if etapa == 'lexer':
+        funcion = LEXERS[gramatica]
+    else:
+        def funcion(lote):
+            return parsear_lote(gramatica, lote)
+
+    m = _nuevas_metricas(etapa)
+    try:
+        while True:
+            inicio = time.perf_counter()
+            lote = entrada.get()
+            listo = time.perf_counter()
+            m['espera_entrada_s'] += listo - inicio
+            if lote is FIN or isinstance(lote, FallaEtapa):
+                salida.put(lote)
+                break
+            cpu = time.thread_time()
+            resultado = funcion(lote)
+            m['cpu_s'] += time.thread_time() - cpu
+            procesado = time.perf_counter()
+            m['ocupado_s'] += procesado - listo
+            m['elementos'] += len(lote)
+            m['lotes'] += 1
+            salida.put(resultado)
+            m['espera_salida_s'] += time.perf_counter() - procesado
+    except Exception:
+        salida.put(FallaEtapa(etapa, traceback.format_exc()))
+    metricas.put(m)
+
+
+def leer_lotes(archivo, cola, tamano_lote, metricas):
+    """Etapa lectora (hilo): lotes de (número, línea) sin las líneas vacías"""
+    m = _nuevas_metricas('lector')
+    lote = []
+    cpu = time.thread_time()
+    inicio = time.perf_counter()
+    try:
+        for numero, linea in enumerate(archivo, 1):
+            linea = linea.rstrip('\r\n')
+            if not linea.strip():
+                continue
+            lote.append((numero, linea))
+            if len(lote) == tamano_lote:
+                listo = time.perf_counter()
+                m['ocupado_s'] += listo - inicio
+                m['elementos'] += len(lote)
+                m['lotes'] += 1
+                cola.put(lote)
+                lote = []
+                inicio = time.perf_counter()
+                m['espera_salida_s'] += inicio - listo
+        m['ocupado_s'] += time.perf_counter() - inicio
+        m['cpu_s'] = time.thread_time() - cpu
+        if lote:
+            m['elementos'] += len(lote)
+            m['lotes'] += 1
+            cola.put(lote)
+        cola.put(FIN)
+    except Exception:
+        cola.put(FallaEtapa('lector', traceback.format_exc()))
+    metricas.update(m)
+
+
+def escribir_lotes(cola, salida):
+    """Etapa escritora: escribe los lotes serializados y cuenta veredictos"""
+    m = _nuevas_metricas('escritor')
+    totales = {'validas': 0, 'invalidas': 0}
+    while True:
+        inicio = time.perf_counter()
+        lote = cola.get()
+        listo = time.perf_counter()
+        m['espera_entrada_s'] += listo - inicio
+        if lote is FIN:
+            break
+        if isinstance(lote, FallaEtapa):
+            raise lote
+        cpu = time.thread_time()
+        texto, validas, invalidas = lote
+        salida.write(texto)
+        totales['validas'] += validas
+        totales['invalidas'] += invalidas
+        m['cpu_s'] += time.thread_time() - cpu
+        m['ocupado_s'] += time.perf_counter() - listo
+        m['elementos'] += validas + invalidas
+        m['lotes'] += 1
+    return totales, m
+
+
+def procesar(entrada, salida, gramatica, tamano_lote=256, capacidad=8):
+    """
+    Valida todas las líneas de `entrada` con la tubería de etapas y
+    escribe el NDJSON en `salida`. `capacidad` es la cantidad de lotes
+    que entra en cada cola.
+
+    Devuelve {'totales': ..., 'etapas': [métricas por etapa], 'mas_lenta': nombre}.
+    """
+    if gramatica not in LEXERS:
+        raise ValueError(f"Gramática desconocida: {gramatica}")
+
+    leidos = multiprocessing.Queue(capacidad)
+    tokenizados = multiprocessing.Queue(capacidad)
+    parseados = multiprocessing.Queue(capacidad)
+    cola_metricas = multiprocessing.Queue()
+
+    procesos = [
+        multiprocessing.Process(target=ejecutar_etapa, name='lexer', daemon=True,
+                                args=('lexer', gramatica, leidos, tokenizados, cola_metricas)),
+        multiprocessing.Process(target=ejecutar_etapa, name='parser', daemon=True,
+                                args=('parser', gramatica, tokenizados, parseados, cola_metricas)),
+    ]
+    for proceso in procesos:
+        proceso.start()
+
+    metricas_lector = {}
+    lector = threading.Thread(target=leer_lotes, daemon=True,
+                              args=(entrada, leidos, tamano_lote, metricas_lector))
+    lector.start()
+
+    try:
+        totales, metricas_escritor = escribir_lotes(parseados, salida)
+    except BaseException:
+        # Una etapa falló o se interrumpió: las demás pueden estar
+        # bloqueadas en una cola llena y no van a terminar solas
+        for proceso in procesos:
+            proceso.terminate()
+        raise
+
+    lector.join()
+    por_etapa = {}
+    for _ in procesos:
+        m = cola_metricas.get()
+        por_etapa[m['etapa']] = m
+    for proceso in procesos:
+        proceso.join()
+
+    etapas = [metricas_lector, por_etapa['lexer'], por_etapa['parser'], metricas_escritor]
+    for m in etapas:
+        m['por_segundo'] = m['elementos'] / m['ocupado_s'] if m['ocupado_s'] else 0.0
+    mas_lenta = max(etapas, key=lambda m: m['cpu_s'])['etapa']
+    return {'totales': totales, 'etapas': etapas, 'mas_lenta': mas_lenta}
+
+
+def tabla_metricas(resultado):
+    """Texto con una fila de métricas por etapa, marcando la más lenta"""
+    filas = [f"{'etapa':<9}{'elementos':>11}{'lotes':>8}{'ocupado s':>11}{'cpu s':>9}"
+             f"{'espera ent. s':>15}{'espera sal. s':>15}{'elem/s':>11}"]
+    for m in resultado['etapas']:
+        marca = '  <- más lenta' if m['etapa'] == resultado['mas_lenta'] else ''
+        filas.append(f"{m['etapa']:<9}{m['elementos']:>11}{m['lotes']:>8}{m['ocupado_s']:>11.3f}{m['cpu_s']:>9.3f}"
+                     f"{m['espera_entrada_s']:>15.3f}{m['espera_salida_s']:>15.3f}"
+                     f"{m['por_segundo']:>11.0f}{marca}")
+    return '\n'.join(filas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida un flujo de cadenas con etapas en paralelo")
+    parser.add_argument('archivo', nargs='?', default='-', help="una cadena por línea (- = stdin)")
+    parser.add_argument('--gramatica', required=True, choices=tuple(LEXERS))
+    parser.add_argument('--tamano-lote', type=int, default=256)
+    parser.add_argument('--capacidad', type=int, default=8, help="lotes por cola entre etapas")
+    parser.add_argument('--metricas', metavar='ARCHIVO', help="guardar las métricas por etapa en JSON")
+    args = parser.parse_args(argv)
+
+    if args.archivo == '-':
+        entrada = io.TextIOWrapper(io.BufferedReader(sys.stdin.buffer, TAMANO_BUFFER),
+                                   encoding='utf-8', errors='replace')
+    else:
+        entrada = open(args.archivo, 'r', encoding='utf-8', errors='replace', buffering=TAMANO_BUFFER)
+    salida = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, TAMANO_BUFFER),
+                              encoding='utf-8', newline='\n')
+    try:
+        with entrada:
+            resultado = procesar(entrada, salida, args.gramatica, args.tamano_lote, args.capacidad)
+    except FallaEtapa as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        salida.flush()
+
+    print(tabla_metricas(resultado), file=sys.stderr)
+    if args.metricas:
+        with open(args.metricas, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())